@@ -1,52 +1,306 @@
-from fastapi import APIRouter, HTTPException
-from fastapi.responses import JSONResponse, StreamingResponse
+import asyncio
+import json
+import os
+import uuid
+from dataclasses import dataclass
+from typing import BinaryIO, Optional
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import JSONResponse, FileResponse, StreamingResponse
 from pydantic import BaseModel
-from models.image_generator import generate_image_with_api
-from models.prompt_summarizer import summarize_prompt
-import openai  # OpenAI GPT API 사용
-import requests
-from io import BytesIO
+from models.image_generator import generate_image_with_api, open_image_stream
+from service.image_jobs import JOB_FAILED_MESSAGE, get_image_job_queue, render_to_store, resolve_image
+from models.image_store import get_image_store, game_alias, prompt_alias, StoredImage
+from models.prompt_summarizer import summarize_prompt, summarize_prompts
+from core.config import config
+from core.log import get_logger
 
 
 # image_class.py에서 ImageRequest 클래스를 임포트
-from schemas.image_class import ImageRequest  # 스키마 임포트
+from schemas.image_class import ImageRequest, ImageBatchRequest  # 스키마 임포트
 
 # 라우터 인스턴스 생성
 router = APIRouter()
 
+log = get_logger("image_routes")
+
+
+async def _proxy_image(upstream, aliases):
+    """업스트림 청크를 클라이언트로 보내면서 저장소에 기록 (끝까지 받은 경우에만 저장)"""
+    writer = get_image_store().open_writer(upstream.media_type)
+    completed = False
+    try:
+        async for chunk in upstream.iter_chunks():
+            await writer.write(chunk)
+            yield chunk
+        completed = True
+    finally:
+        upstream.close()
+        if not completed:
+            await writer.abort()
+    try:
+        await writer.commit(aliases)
+    except OSError as e:
+        log.warning("Failed to store image", error=str(e))
+
+
+def _open_image(path: str) -> Optional[BinaryIO]:
+    try:
+        return open(path, "rb")
+    except OSError:
+        return None
+
+
+async def _iter_file(f: BinaryIO):
+    with f:
+        while chunk := await asyncio.to_thread(f.read, config.IMAGE_STREAM_CHUNK_BYTES):
+            yield chunk
+
+
+async def _stored_response(image: StoredImage) -> Optional[FileResponse]:
+    """저장된 이미지 응답 (조회 후 본문이 삭제돼 stat에 실패하면 None으로 캐시 미스 처리)
+
+    lookup이 갱신한 mtime 기준 유예 시간 동안은 저장소가 본문을 삭제하지 않으므로 FileResponse로 그대로 전송합니다.
+    """
+    try:
+        stat = await asyncio.to_thread(os.stat, image.path)
+    except OSError:
+        return None
+    return FileResponse(image.path, media_type=image.media_type, stat_result=stat)
+
 
 @router.post("/generate-image")
 async def generate_image(request: ImageRequest):
     """
     이미지 생성 엔드포인트
     :param request: 사용자로부터 입력받은 프롬프트와 옵션
-    :return: 생성된 이미지의 URL을 JSON 형식으로 반환
+    :return: 생성된 이미지 파일 (디스크 저장소에서 전송)
     """
     try:
-        
+        store = get_image_store()
+        game_key = game_alias(request.gameId, request.stageNumber)
+
+        # 같은 게임/스테이지 재요청은 저장된 이미지를 그대로 반환 (그 사이 정리됐으면 새로 생성)
+        cached = await store.lookup(game_key)
+        if cached is not None:
+            response = await _stored_response(cached)
+            if response is not None:
+                return response
+
         # 프롬프트 요약 후 번역
         summarized_prompt = await summarize_prompt(request.prompt, genre=request.genre)
 
-        # DALL·E API 호출
-        image_url = generate_image_with_api(
+        # 같은 요약 프롬프트로 이미 생성한 이미지가 있으면 재사용
+        prompt_key = prompt_alias(summarized_prompt, request.size)
+        cached = await store.lookup(prompt_key)
+        if cached is not None:
+            response = await _stored_response(cached)
+            if response is not None:
+                await store.link(cached, game_key)
+                return response
+
+        # Replicate API 호출 (비동기)
+        image_url = await generate_image_with_api(
             prompt=summarized_prompt, size=request.size
         )
 
-        # URL에서 이미지 다운로드
-        image_response = requests.get(image_url)
-        
-        if image_response.status_code != 200:
-            raise HTTPException(status_code=500, detail="이미지 다운로드에 실패했습니다.")
-
-        # 이미지 데이터를 byte[] 형태로 변환
-        image_bytes = BytesIO(image_response.content)
-        print(image_bytes)
-
-        #return image_bytes
-        
-        # StreamingResponse로 이미지를 반환
-        return StreamingResponse(image_bytes, media_type="image/jpeg")
-    
+        # 업스트림 이미지를 청크 단위로 그대로 전달하면서 디스크 저장소에도 기록
+        upstream = await open_image_stream(image_url)
+        headers = {}
+        if upstream.content_length is not None:
+            headers["Content-Length"] = str(upstream.content_length)
+        return StreamingResponse(
+            _proxy_image(upstream, [game_key, prompt_key]),
+            media_type=upstream.media_type,
+            headers=headers
+        )
+
     # 상태 코드 : 서버 오류
     except RuntimeError as e:
-        raise HTTPException(status_code=500, detail=f"서버 오류입니다: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"서버 오류입니다: {str(e)}")
+
+
+@dataclass
+class _BatchUnit:
+    """배치 요청 안의 이미지 한 장 (항목 × n)"""
+    item: ImageRequest
+    variant: int
+    image: Optional[StoredImage] = None
+    summarized_prompt: Optional[str] = None
+    file: Optional[BinaryIO] = None
+
+    @property
+    def headers(self) -> dict:
+        return {
+            "X-Game-Id": str(self.item.gameId),
+            "X-Stage-Number": str(self.item.stageNumber),
+            "X-Variant": str(self.variant),
+        }
+
+
+def _part_header(boundary: str, headers: dict) -> bytes:
+    lines = [f"--{boundary}"] + [f"{name}: {value}" for name, value in headers.items()]
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("utf-8")
+
+
+async def _batch_parts(units, boundary: str):
+    """완료된 순서대로 multipart/mixed 파트 전송 (실패한 이미지는 JSON 오류 파트)"""
+    semaphore = asyncio.Semaphore(config.IMAGE_BATCH_CONCURRENCY)
+
+    async def produce(unit: _BatchUnit):
+        try:
+            if unit.image is not None:
+                unit.file = await asyncio.to_thread(_open_image, unit.image.path)
+                if unit.file is not None:
+                    return unit, None
+            async with semaphore:
+                if unit.image is not None:
+                    # 조회 후 용량 정리로 본문이 삭제된 경우 (별칭은 정리됐으므로 다시 확보)
+                    unit.image = await resolve_image(unit.item, unit.variant)
+                else:
+                    unit.image = await render_to_store(unit.item, unit.summarized_prompt, unit.variant)
+            unit.file = await asyncio.to_thread(_open_image, unit.image.path)
+            if unit.file is None:
+                raise RuntimeError("이미지를 저장하지 못했습니다.")
+            return unit, None
+        except Exception as e:
+            return unit, e
+
+    tasks = [asyncio.create_task(produce(unit)) for unit in units]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            unit, error = await next_done
+            if error is not None:
+                body = json.dumps({"error": str(error)}, ensure_ascii=False).encode("utf-8")
+                yield _part_header(boundary, {
+                    **unit.headers, "Content-Type": "application/json", "Content-Length": len(body)
+                })
+                yield body + b"\r\n"
+                continue
+
+            yield _part_header(boundary, {
+                **unit.headers,
+                "Content-Type": unit.image.media_type,
+                "Content-Length": unit.image.size,
+                "X-Image-Digest": unit.image.digest,
+            })
+            file, unit.file = unit.file, None
+            async for chunk in _iter_file(file):
+                yield chunk
+            yield b"\r\n"
+        yield f"--{boundary}--\r\n".encode("utf-8")
+    finally:
+        # 클라이언트 연결이 끊기면 남은 생성 작업 취소, 보내지 못한 파일 정리
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        for unit in units:
+            if unit.file is not None:
+                unit.file.close()
+
+
+@router.post("/generate-images")
+async def generate_images(request: ImageBatchRequest):
+    """
+    여러 스테이지/여러 장(n) 이미지를 한 번에 생성하는 엔드포인트
+    :param request: (gameId, stageNumber, prompt) 항목 목록
+    :return: 완료된 순서대로 이미지를 담은 multipart/mixed 응답 (파트 헤더 X-Game-Id, X-Stage-Number, X-Variant)
+    """
+    units = [
+        _BatchUnit(item=item, variant=variant)
+        for item in request.items
+        for variant in range(max(item.n, 1))
+    ]
+    if len(units) > config.IMAGE_BATCH_MAX_IMAGES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"한 번에 최대 {config.IMAGE_BATCH_MAX_IMAGES}장까지 생성할 수 있습니다."
+        )
+
+    try:
+        store = get_image_store()
+
+        # 이미 생성된 게임/스테이지 이미지는 재사용
+        cached = await asyncio.gather(*(
+            store.lookup(game_alias(unit.item.gameId, unit.item.stageNumber, unit.variant))
+            for unit in units
+        ))
+        for unit, image in zip(units, cached):
+            unit.image = image
+        pending = [unit for unit in units if unit.image is None]
+
+        # 남은 프롬프트는 한 번에 요약
+        if pending:
+            summaries = await summarize_prompts([(unit.item.prompt, unit.item.genre) for unit in pending])
+            for unit, summarized in zip(pending, summaries):
+                unit.summarized_prompt = summarized
+
+            # 같은 요약 프롬프트로 생성된 이미지 재사용
+            reused = await asyncio.gather(*(
+                store.lookup(prompt_alias(unit.summarized_prompt, unit.item.size, unit.variant))
+                for unit in pending
+            ))
+            for unit, image in zip(pending, reused):
+                if image is not None:
+                    unit.image = image
+                    await store.link(image, game_alias(unit.item.gameId, unit.item.stageNumber, unit.variant))
+
+    except RuntimeError as e:
+        raise HTTPException(status_code=500, detail=f"서버 오류입니다: {str(e)}")
+
+    boundary = uuid.uuid4().hex
+    return StreamingResponse(
+        _batch_parts(units, boundary),
+        media_type=f"multipart/mixed; boundary={boundary}"
+    )
+
+
+@router.post("/jobs", status_code=202)
+async def submit_image_job(request: ImageRequest):
+    """
+    이미지 생성 작업 제출 (즉시 반환)
+    같은 (gameId, stageNumber)로 진행 중이거나 완료된 작업이 있으면 그 작업을 반환
+    :return: job_id와 상태
+    """
+    try:
+        job = get_image_job_queue().submit(request)
+    except asyncio.QueueFull:
+        raise HTTPException(status_code=503, detail="이미지 작업 대기열이 가득 찼습니다.")
+    return job.to_dict()
+
+
+async def _get_job(job_id: str, wait: float):
+    queue = get_image_job_queue()
+    job = queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="존재하지 않거나 만료된 작업입니다.")
+    return await queue.wait(job, wait)
+
+
+@router.get("/jobs/{job_id}")
+async def get_image_job(job_id: str, wait: float = Query(0, ge=0, description="완료까지 최대 대기 시간(초)")):
+    """
+    작업 상태 조회 (wait > 0이면 완료될 때까지 long-poll)
+    """
+    return (await _get_job(job_id, wait)).to_dict()
+
+
+@router.get("/jobs/{job_id}/result")
+async def get_image_job_result(job_id: str, wait: float = Query(0, ge=0, description="완료까지 최대 대기 시간(초)")):
+    """
+    작업 결과 이미지 반환 (아직 진행 중이면 202와 상태, 실패했으면 500)
+    결과 이미지가 저장소 용량 정리로 삭제됐으면 작업을 다시 대기열에 넣고 202를 반환합니다.
+    """
+    job = await _get_job(job_id, wait)
+    if job.status == "failed":
+        log.warning("Image job result requested for failed job", job_id=job_id, error=job.error)
+        raise HTTPException(status_code=500, detail=JOB_FAILED_MESSAGE)
+    if job.status == "done":
+        response = await _stored_response(job.image)
+        if response is not None:
+            return response
+        log.info("Image job result was evicted, requeueing", job_id=job_id)
+        try:
+            get_image_job_queue().requeue(job)
+        except asyncio.QueueFull:
+            raise HTTPException(status_code=503, detail="이미지 작업 대기열이 가득 찼습니다.")
+    return JSONResponse(status_code=202, content=job.to_dict())
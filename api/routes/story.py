@@ -1,6 +1,8 @@
 # api/routes/story.py
 
+import json
 from fastapi import APIRouter, HTTPException, Depends
+from fastapi.responses import StreamingResponse
 from schemas.story_class import (
     StoryGenerationStartRequest,
     StoryGenerationChatRequest,
@@ -11,34 +13,59 @@ from schemas.story_class import (
     NPCResponse,
     NPCAdviceResponse
 )
-from service.story_service import StoryService
-from models.story_generator import StoryGenerator
-from models.s3_manager import S3Manager
+from models.s3_manager import get_s3_manager
+from models.prompt_catalog import PromptCatalog
+from service.session_backend import SessionConflictError, SessionNotFoundError, create_session_backend
 from functools import lru_cache
 
 
 class SingletonContainer:
     def __init__(self):
         self._s3_manager = None
+        self._prompt_catalog = None
         self._story_generator = None
         self._story_service = None
+        self._session_backend = None
 
     @property
     def s3_manager(self):
         if self._s3_manager is None:
-            self._s3_manager = S3Manager()
+            self._s3_manager = get_s3_manager()
         return self._s3_manager
 
+    @property
+    def prompt_catalog(self):
+        if self._prompt_catalog is None:
+            self._prompt_catalog = PromptCatalog(s3_manager=self.s3_manager)
+        return self._prompt_catalog
+
     @property
     def story_generator(self):
         if self._story_generator is None:
-            self._story_generator = StoryGenerator(s3_manager=self.s3_manager)
+            # langchain을 불러오는 모듈은 처음 필요할 때 import (main import와 /health 응답을 가볍게 유지)
+            from models.story_generator import StoryGenerator
+
+            self._story_generator = StoryGenerator(
+                s3_manager=self.s3_manager,
+                prompt_catalog=self.prompt_catalog
+            )
         return self._story_generator
 
+    @property
+    def session_backend(self):
+        if self._session_backend is None:
+            self._session_backend = create_session_backend()
+        return self._session_backend
+
     @property
     def story_service(self):
         if self._story_service is None:
-            self._story_service = StoryService(story_generator=self.story_generator)
+            from service.story_service import StoryService
+
+            self._story_service = StoryService(
+                story_generator=self.story_generator,
+                session_backend=self.session_backend
+            )
         return self._story_service
 
 
@@ -55,11 +82,42 @@ async def generate_story_endpoint(
     container: SingletonContainer = Depends(get_singleton_container)
 ):
     try:
-        response = await container.story_service.generate_initial_story(genre=request.genre)
+        response = await container.story_service.generate_initial_story(
+            genre=request.genre,
+            game_id=request.game_id
+        )
         return response
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error generating story: {str(e)}")
 
+def _sse(event: str, data: dict) -> str:
+    """Server-Sent Events 형식으로 직렬화"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+async def _sse_stream(events):
+    try:
+        async for event, data in events:
+            yield _sse(event, data)
+    except Exception as e:
+        yield _sse("error", {"detail": str(e)})
+
+def _sse_response(events) -> StreamingResponse:
+    return StreamingResponse(
+        _sse_stream(events),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.post("/start/stream")
+async def stream_story_endpoint(
+    request: StoryGenerationStartRequest, 
+    container: SingletonContainer = Depends(get_singleton_container)
+):
+    """SSE 이벤트: story(본문 증분) → choices(선택지 완성 즉시) → done(최종 결과) / error"""
+    return _sse_response(
+        container.story_service.stream_initial_story(genre=request.genre, game_id=request.game_id)
+    )
+
 @router.post("/continue", response_model=StoryResponse)
 async def continue_story_endpoint(
     request: StoryGenerationChatRequest, 
@@ -68,11 +126,27 @@ async def continue_story_endpoint(
     try:
         response = await container.story_service.continue_story(request)
         return response
+    except SessionNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except SessionConflictError as e:
+        raise HTTPException(status_code=409, detail=str(e))
     except ValueError as e:
         raise HTTPException(status_code=400, detail=f"Invalid input: {str(e)}")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error continuing story: {str(e)}")
 
+@router.post("/continue/stream")
+async def stream_continue_story_endpoint(
+    request: StoryGenerationChatRequest, 
+    container: SingletonContainer = Depends(get_singleton_container)
+):
+    """SSE 이벤트: story(본문 증분) → choices(선택지 완성 즉시) → done(최종 결과) / error"""
+    try:
+        events = await container.story_service.stream_continue_story(request)
+    except SessionNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    return _sse_response(events)
+
 @router.post("/advice", response_model=NPCAdviceResponse)
 async def get_npc_advice_endpoint(
     request: NPCChatRequest, 
@@ -110,6 +184,8 @@ async def generate_ending_endpoint(
             user_choice=request.user_choice
         )
         return response
+    except SessionNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
     except ValueError as e:
         raise HTTPException(status_code=400, detail=f"Invalid input: {str(e)}")
     except Exception as e:
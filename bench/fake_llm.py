@@ -0,0 +1,84 @@
+# bench/fake_llm.py
+
+import asyncio
+import random
+import time
+from typing import Any, AsyncIterator, List, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+# 벤치마크용 가짜 채팅 모델
+# 스텁 백엔드 템플릿에 들어 있는 [[bench:<종류>]] 표식을 보고 실제 파서가 받아들이는 형식으로 응답합니다.
+# 지연 = 첫 토큰까지 latency + 토큰 수 / tokens_per_second (jitter 비율만큼 무작위 변동)
+
+_WORDS = (
+    "the survivors move through the ruined city while the storm gathers above "
+    "a distant signal flickers and supplies run low as night begins to fall"
+).split()
+
+
+def _words(count: int, rng: random.Random) -> str:
+    return " ".join(rng.choice(_WORDS) for _ in range(max(count, 1)))
+
+
+def _prompt_text(messages: List[BaseMessage]) -> str:
+    return "\n".join(str(message.content) for message in messages)
+
+
+class FakeChatModel(BaseChatModel):
+    latency: float = 0.4
+    tokens_per_second: float = 80.0
+    jitter: float = 0.2
+    story_tokens: int = 350
+    text_tokens: int = 120
+
+    @property
+    def _llm_type(self) -> str:
+        return "nati-bench-fake"
+
+    def _respond(self, prompt: str, rng: random.Random) -> str:
+        if "[[bench:initial]]" in prompt or "[[bench:continue]]" in prompt:
+            choices = ", ".join(f"Choice {i} {_words(4, rng)}" for i in range(1, 4))
+            return f"Story: {_words(self.story_tokens, rng)}\nChoices: [{choices}]"
+        if "[[bench:advice]]" in prompt:
+            lines = [
+                f"선택지 {i} = {_words(12, rng)} | 생존율 {rng.randint(10, 90)}%"
+                for i in range(1, 4)
+            ]
+            return "\n".join(lines + [f"추가 코멘트: {_words(15, rng)}"])
+        if "[[bench:rate]]" in prompt:
+            return str(rng.randint(0, 100))
+        return _words(self.text_tokens, rng)
+
+    def _delay(self, tokens: int, rng: random.Random) -> float:
+        base = self.latency + tokens / max(self.tokens_per_second, 1e-6)
+        return max(0.0, base * (1 + rng.uniform(-self.jitter, self.jitter)))
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager=None, **kwargs: Any) -> ChatResult:
+        rng = random.Random()
+        text = self._respond(_prompt_text(messages), rng)
+        time.sleep(self._delay(len(text.split()), rng))
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=text))])
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager=None, **kwargs: Any) -> ChatResult:
+        rng = random.Random()
+        text = self._respond(_prompt_text(messages), rng)
+        await asyncio.sleep(self._delay(len(text.split()), rng))
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=text))])
+
+    async def _astream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager=None, **kwargs: Any) -> AsyncIterator[ChatGenerationChunk]:
+        rng = random.Random()
+        text = self._respond(_prompt_text(messages), rng)
+        tokens = text.split(" ")
+        scale = 1 + rng.uniform(-self.jitter, self.jitter)
+        await asyncio.sleep(self.latency * scale)
+        per_token = scale / max(self.tokens_per_second, 1e-6)
+        for index, token in enumerate(tokens):
+            await asyncio.sleep(per_token)
+            content = token if index == 0 else " " + token
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=content))
+            if run_manager is not None:
+                await run_manager.on_llm_new_token(content, chunk=chunk)
+            yield chunk
@@ -0,0 +1,272 @@
+# bench/replay.py
+"""
+기록된 실제 트래픽(core/traffic.py, TRAFFIC_RECORD_ENABLED=true) 재생
+
+게임별 요청 순서와 요청 사이 대기 시간(이전 응답 완료 ~ 다음 요청 시작)을 유지하면서
+실행 중인 인스턴스로 다시 보냅니다. 게임 시작 시점도 기록된 간격을 speedup 배 압축해 재현합니다.
+game_id는 재생 중 새로 발급된 값으로, 선택지는 응답으로 받은 선택지 중에서 무작위로 바꿔 보냅니다.
+
+사용 예:
+    python -m bench.replay traffic/recording.jsonl --url http://localhost:8000 --api-key $API_KEY --speedup 10
+    python -m bench.replay traffic/*.jsonl --url ... --concurrency 200 --slo-p95-ms 8000 --output replay.json
+
+이미지 엔드포인트는 실제 생성 비용이 들기 때문에 --include-images를 줄 때만 재생합니다.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+from bench.report import LatencyRecorder, format_table, save_json
+
+START_ROUTES = ("/api/story/start", "/api/story/start/stream")
+STREAM_ROUTES = ("/api/story/start/stream", "/api/story/continue/stream")
+IMAGE_ROUTES = ("/api/images/generate-image", "/api/images/jobs")
+
+
+def load_games(paths: List[str], include_images: bool) -> Dict[str, List[Dict]]:
+    """게임 키별로 시간순 정렬된 요청 목록"""
+    games: Dict[str, List[Dict]] = defaultdict(list)
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    continue
+                route = event.get("p", "")
+                if route.startswith("/api/images/") and not (include_images and route in IMAGE_ROUTES):
+                    continue
+                if event.get("m") != "POST" or "{" in route:
+                    continue
+                games[event["g"]].append(event)
+    for events in games.values():
+        events.sort(key=lambda event: event["t"])
+    return dict(games)
+
+
+class GameState:
+    def __init__(self, rng: random.Random):
+        self.rng = rng
+        self.game_id: Optional[str] = None
+        self.image_game_id = rng.randint(1, 2**31 - 1)
+        self.genre = "Survival"
+        self.choices: List[str] = ["continue"]
+
+    def choice(self) -> str:
+        return self.rng.choice(self.choices)
+
+    def update(self, result: Optional[Dict]) -> None:
+        if not result:
+            return
+        self.game_id = result.get("game_id") or self.game_id
+        self.choices = result.get("choices") or self.choices
+
+
+def build_payload(route: str, body: Dict, state: GameState) -> Dict:
+    """익명화된 요청 요약으로 재생용 요청 본문 구성"""
+    state.genre = body.get("genre", state.genre)
+    if route in START_ROUTES:
+        return {"genre": state.genre}
+    if route in ("/api/story/continue", "/api/story/continue/stream"):
+        return {"genre": state.genre, "user_choice": state.choice(), "game_id": state.game_id, "stage": body.get("stage")}
+    if route == "/api/story/end":
+        return {"genre": state.genre, "user_choice": state.choice(), "game_id": state.game_id}
+    if route in IMAGE_ROUTES:
+        return {
+            "gameId": state.image_game_id,
+            "stageNumber": body.get("stageNumber", 1),
+            "prompt": "replayed scene " * max(1, body.get("prompt_len", 60) // 15),
+            "size": body.get("size", "9x16"),
+            "n": body.get("n", 1),
+            "genre": state.genre,
+        }
+    return {"game_id": state.game_id}
+
+
+async def send(client, recorder: LatencyRecorder, route: str, payload: Dict, label: Optional[str] = None) -> Optional[Dict]:
+    label = label or route
+    started = time.perf_counter()
+    status = 0
+    result = None
+    try:
+        if route in STREAM_ROUTES:
+            async with client.stream("POST", route, json=payload) as response:
+                status = response.status_code
+                event = None
+                async for line in response.aiter_lines():
+                    if line.startswith("event: "):
+                        event = line[len("event: "):]
+                    elif line.startswith("data: ") and event == "done":
+                        result = json.loads(line[len("data: "):])
+                    elif line.startswith("data: ") and event == "error":
+                        status = 500
+        else:
+            response = await client.post(route, json=payload)
+            status = response.status_code
+            if status in (200, 202) and response.headers.get("content-type", "").startswith("application/json"):
+                result = response.json()
+            elif status == 200:
+                result = {}
+    except Exception:
+        result = None
+    finally:
+        ok = status in (200, 202) and result is not None
+        recorder.record(label, time.perf_counter() - started, status, ok)
+    return result
+
+
+class Replayer:
+    def __init__(self, client, games: Dict[str, List[Dict]], args):
+        self.client = client
+        self.games = games
+        self.args = args
+        self.recorder = LatencyRecorder()
+        self.active = 0
+        self.peak_active = 0
+        self.completed = 0
+        self.failed = 0
+
+    def _think_time(self, previous: Dict, event: Dict) -> float:
+        # 기록된 대기 시간 = 다음 요청 시작 - (이전 요청 시작 + 이전 요청 소요)
+        gap = (event["t"] - previous["t"] - previous.get("d", 0)) / 1000
+        return min(max(gap, 0.0) / self.args.speedup, self.args.max_think)
+
+    async def _play(self, events: List[Dict], rng: random.Random) -> bool:
+        state = GameState(rng)
+        previous = None
+        for event in events:
+            if previous is not None:
+                await asyncio.sleep(self._think_time(previous, event))
+            previous = event
+            route, body = event["p"], event.get("b", {})
+
+            if state.game_id is None and route not in START_ROUTES and not route.startswith("/api/images/"):
+                # 기록이 게임 중간부터 시작된 경우 세션을 먼저 만듦
+                state.genre = body.get("genre", state.genre)
+                state.update(await send(
+                    self.client, self.recorder, "/api/story/start", {"genre": state.genre},
+                    label="/api/story/start (bootstrap)"
+                ))
+                if state.game_id is None:
+                    return False
+
+            result = await send(self.client, self.recorder, route, build_payload(route, body, state))
+            if result is None:
+                return False
+            state.update(result)
+        return True
+
+    async def _game(self, offset: float, events: List[Dict], seed: float, semaphore: asyncio.Semaphore) -> None:
+        await asyncio.sleep(offset)
+        async with semaphore:
+            self.active += 1
+            self.peak_active = max(self.peak_active, self.active)
+            try:
+                ok = await self._play(events, random.Random(seed))
+            finally:
+                self.active -= 1
+        if ok:
+            self.completed += 1
+        else:
+            self.failed += 1
+
+    async def run(self) -> Dict:
+        ordered = sorted(self.games.values(), key=lambda events: events[0]["t"])
+        if self.args.games:
+            ordered = ordered[:self.args.games]
+        origin = ordered[0][0]["t"] if ordered else 0
+        rng = random.Random(self.args.seed)
+        semaphore = asyncio.Semaphore(self.args.concurrency)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(
+            self._game((events[0]["t"] - origin) / 1000 / self.args.speedup, events, rng.random(), semaphore)
+            for events in ordered
+        ))
+        summary = self.recorder.summary(time.perf_counter() - started)
+        summary["games"] = {
+            "replayed": len(ordered),
+            "completed": self.completed,
+            "failed": self.failed,
+            "peak_concurrent": self.peak_active,
+        }
+        return summary
+
+
+def check_slo(summary: Dict, p95_ms: float, max_error_rate: float) -> List[str]:
+    """엔드포인트별 p95와 오류율이 기준을 넘는 항목"""
+    violations = []
+    for endpoint, stats in summary["endpoints"].items():
+        if stats["p95_ms"] > p95_ms:
+            violations.append(f"{endpoint}: p95 {stats['p95_ms']}ms > {p95_ms}ms")
+        error_rate = stats["errors"] / stats["count"] if stats["count"] else 0
+        if error_rate > max_error_rate:
+            violations.append(f"{endpoint}: error rate {error_rate:.1%} > {max_error_rate:.1%}")
+    return violations
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Replay recorded game traffic against a running instance")
+    parser.add_argument("files", nargs="+", help="기록 JSONL 파일")
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--api-key", default="", help="X-API-Key 헤더 값")
+    parser.add_argument("--speedup", type=float, default=1.0, help="게임 시작 간격과 대기 시간을 나눌 배수")
+    parser.add_argument("--concurrency", type=int, default=100, help="동시에 진행할 최대 게임 수")
+    parser.add_argument("--max-think", type=float, default=60.0, help="요청 사이 대기 시간 상한(초, speedup 적용 후)")
+    parser.add_argument("--games", type=int, default=0, help="재생할 게임 수 (0이면 전체)")
+    parser.add_argument("--include-images", action="store_true", help="이미지 생성 요청도 재생")
+    parser.add_argument("--timeout", type=float, default=120.0, help="요청별 타임아웃(초)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--slo-p95-ms", type=float, help="엔드포인트별 p95 기준 (넘으면 종료 코드 1)")
+    parser.add_argument("--slo-error-rate", type=float, default=0.01, help="엔드포인트별 허용 오류율")
+    parser.add_argument("--output", help="결과 JSON 저장 경로")
+    return parser.parse_args(argv)
+
+
+async def _main(args) -> Dict:
+    import httpx
+
+    games = load_games(args.files, args.include_images)
+    if not games:
+        raise SystemExit("no replayable games found")
+    limits = httpx.Limits(max_connections=args.concurrency * 2, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(
+        base_url=args.url, headers={"X-API-Key": args.api_key},
+        timeout=args.timeout, limits=limits
+    ) as client:
+        return await Replayer(client, games, args).run()
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    summary = asyncio.run(_main(args))
+
+    print(format_table(summary))
+    games = summary["games"]
+    print(
+        f"games: {games['replayed']} replayed, {games['completed']} completed, "
+        f"{games['failed']} failed, peak {games['peak_concurrent']} concurrent"
+    )
+    if args.output:
+        save_json(args.output, summary)
+
+    if args.slo_p95_ms is not None:
+        violations = check_slo(summary, args.slo_p95_ms, args.slo_error_rate)
+        if violations:
+            print("\nSLO violated:\n  " + "\n  ".join(violations))
+            return 1
+        print(f"\nSLO met at {games['peak_concurrent']} concurrent games")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
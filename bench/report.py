@@ -0,0 +1,112 @@
+# bench/report.py
+
+import json
+import math
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+# 엔드포인트별 지연/오류 집계, 기준선(baseline) 비교
+
+
+def percentile(values: List[float], q: float) -> float:
+    """nearest-rank 백분위수 (values는 정렬되어 있지 않아도 됨)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = math.ceil(q / 100 * len(ordered))
+    return ordered[min(len(ordered), max(rank, 1)) - 1]
+
+
+class LatencyRecorder:
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+        self.statuses: Dict[str, Dict[int, int]] = defaultdict(lambda: defaultdict(int))
+
+    def record(self, endpoint: str, seconds: float, status: int, ok: bool) -> None:
+        self.latencies[endpoint].append(seconds)
+        self.statuses[endpoint][status] += 1
+        if not ok:
+            self.errors[endpoint] += 1
+
+    def summary(self, elapsed: float) -> Dict[str, Dict]:
+        endpoints = {}
+        for endpoint in sorted(self.latencies):
+            values = self.latencies[endpoint]
+            endpoints[endpoint] = {
+                "count": len(values),
+                "errors": self.errors.get(endpoint, 0),
+                "throughput_rps": round(len(values) / elapsed, 3) if elapsed > 0 else 0.0,
+                "p50_ms": round(percentile(values, 50) * 1000, 1),
+                "p95_ms": round(percentile(values, 95) * 1000, 1),
+                "p99_ms": round(percentile(values, 99) * 1000, 1),
+                "max_ms": round(max(values) * 1000, 1),
+                "statuses": {str(code): count for code, count in sorted(self.statuses[endpoint].items())},
+            }
+        total = sum(len(values) for values in self.latencies.values())
+        return {
+            "elapsed_s": round(elapsed, 3),
+            "requests": total,
+            "errors": sum(self.errors.values()),
+            "throughput_rps": round(total / elapsed, 3) if elapsed > 0 else 0.0,
+            "endpoints": endpoints,
+        }
+
+
+def format_table(summary: Dict) -> str:
+    lines = [
+        f"{'endpoint':<28}{'count':>7}{'err':>6}{'rps':>9}{'p50':>9}{'p95':>9}{'p99':>9}{'max':>9}  (ms)",
+    ]
+    for endpoint, stats in summary["endpoints"].items():
+        lines.append(
+            f"{endpoint:<28}{stats['count']:>7}{stats['errors']:>6}{stats['throughput_rps']:>9.2f}"
+            f"{stats['p50_ms']:>9.1f}{stats['p95_ms']:>9.1f}{stats['p99_ms']:>9.1f}{stats['max_ms']:>9.1f}"
+        )
+    lines.append(
+        f"total {summary['requests']} requests, {summary['errors']} errors, "
+        f"{summary['throughput_rps']:.2f} req/s over {summary['elapsed_s']:.1f}s"
+    )
+    return "\n".join(lines)
+
+
+def load_baseline(path: str) -> Optional[Dict]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def save_json(path: str, data: Dict) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+        f.write("\n")
+
+
+def compare(current: Dict, baseline: Dict, max_regression_pct: float) -> Tuple[List[str], bool]:
+    """기준선 대비 변화율 (지연은 증가, 처리량은 감소가 max_regression_pct를 넘으면 회귀)"""
+    lines = []
+    regressed = False
+
+    def delta(name: str, now: float, before: float, higher_is_worse: bool) -> str:
+        nonlocal regressed
+        if not before:
+            return f"  {name:<40}{before:>10.2f} -> {now:>10.2f}"
+        change = (now - before) / before * 100
+        worse = change > max_regression_pct if higher_is_worse else change < -max_regression_pct
+        regressed = regressed or worse
+        return f"  {name:<40}{before:>10.2f} -> {now:>10.2f}  ({change:+.1f}%){'  REGRESSION' if worse else ''}"
+
+    lines.append(delta("throughput_rps", current["throughput_rps"], baseline.get("throughput_rps", 0), False))
+    for endpoint, stats in current["endpoints"].items():
+        before = baseline.get("endpoints", {}).get(endpoint)
+        if before is None:
+            continue
+        for key in ("p50_ms", "p95_ms", "p99_ms"):
+            lines.append(delta(f"{endpoint} {key}", stats[key], before.get(key, 0), True))
+
+    lag_now, lag_before = current.get("loop_lag"), baseline.get("loop_lag")
+    if lag_now and lag_before:
+        for key in ("p99_ms", "max_ms"):
+            lines.append(delta(f"loop_lag {key}", lag_now[key], lag_before.get(key, 0), True))
+    return lines, regressed
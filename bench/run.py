@@ -0,0 +1,281 @@
+# bench/run.py
+"""
+오프라인 스토리/NPC 파이프라인 벤치마크
+
+OpenAI와 Spring 백엔드 없이 앱을 프로세스 안에서 띄워 측정합니다.
+- StoryGenerator / NPCHandler의 ChatOpenAI → FakeChatModel (지연, 토큰 속도 설정)
+- S3Manager → 별도 스레드의 스텁 HTTP 서버
+- 가상 게임마다 /start → (/advice, /chat, /continue) × stages → /end 를 동시에 실행
+
+기본값은 외부 호출 제한(OPENAI_MAX_CONCURRENCY, OPENAI_RATE_PER_SECOND)을 끄고 파이프라인 자체를 측정합니다.
+운영 제한을 그대로 재현하려면 --env OPENAI_RATE_PER_SECOND=8 처럼 덮어쓰세요.
+
+사용 예:
+    python -m bench.run --games 200 --concurrency 50 --stages 3
+    python -m bench.run --save-baseline            # bench/baseline.json 갱신
+    python -m bench.run --max-regression 10        # 기준선 대비 10% 넘게 나빠지면 종료 코드 1
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+from bench.report import LatencyRecorder, compare, format_table, load_baseline, percentile, save_json
+from bench.stub_backend import StubBackend
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+API_KEY = "bench-api-key"
+
+
+class LoopLagMonitor:
+    """interval마다 깨어나 예정 시각보다 늦어진 만큼을 이벤트 루프 지연으로 기록"""
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.samples: List[float] = []
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self) -> None:
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(0.0, time.perf_counter() - started - self.interval))
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+
+    def summary(self) -> Dict[str, float]:
+        return {
+            "samples": len(self.samples),
+            "p50_ms": round(percentile(self.samples, 50) * 1000, 2),
+            "p99_ms": round(percentile(self.samples, 99) * 1000, 2),
+            "max_ms": round(max(self.samples, default=0.0) * 1000, 2),
+        }
+
+
+def _prepare_environment(args, backend_url: str) -> None:
+    """앱 모듈을 import하기 전에 설정 (core.config는 import 시점에 환경 변수를 읽음)"""
+    defaults = {
+        "API_KEY": API_KEY,
+        "OPENAI_KEY": "bench-openai-key",
+        "REPLICATE_API_KEY": "bench-replicate-key",
+        "BACK_BASE_URL": backend_url,
+        "OPENAI_MAX_CONCURRENCY": "0",
+        "OPENAI_RATE_PER_SECOND": "0",
+        "TRACE_SAMPLE_RATE": "0",
+        "LOG_FILE": "",
+        "LOG_LEVEL": "WARNING",
+        "SESSION_BACKEND": "memory",
+        "IMAGE_STORE_DIR": os.path.join(tempfile.gettempdir(), "nati-bench-images"),
+    }
+    for key, value in defaults.items():
+        os.environ[key] = value
+    for item in args.env:
+        key, _, value = item.partition("=")
+        os.environ[key] = value
+
+
+def _install_fake_models(container, args) -> None:
+    from bench.fake_llm import FakeChatModel
+    from models.rolling_summary import RollingSummaryMemory
+
+    def fake(story_tokens: int, text_tokens: int) -> FakeChatModel:
+        return FakeChatModel(
+            latency=args.llm_latency,
+            tokens_per_second=args.llm_tps,
+            jitter=args.llm_jitter,
+            story_tokens=story_tokens,
+            text_tokens=text_tokens,
+        )
+
+    generator = container.story_generator
+    generator.model = fake(args.story_tokens, args.text_tokens)
+    generator.summary_memory = RollingSummaryMemory(generator.model, generator.parser)
+    # StoryGenerator와 StoryService가 각각 NPCHandler를 가지고 있음
+    for handler in {id(h): h for h in (generator.npc_handler, container.story_service.npc_handler)}.values():
+        handler.model = fake(args.story_tokens, args.npc_tokens)
+
+
+async def _call(client, recorder: LatencyRecorder, endpoint: str, payload: Dict) -> Optional[Dict]:
+    started = time.perf_counter()
+    status = 0
+    try:
+        response = await client.post(endpoint, json=payload)
+        status = response.status_code
+        body = response.json() if status == 200 else None
+        return body
+    except Exception:
+        return None
+    finally:
+        recorder.record(endpoint, time.perf_counter() - started, status, status == 200)
+
+
+async def _call_stream(client, recorder: LatencyRecorder, endpoint: str, payload: Dict) -> Optional[Dict]:
+    """SSE 엔드포인트: 첫 story 이벤트까지(… first event)와 done까지를 따로 기록"""
+    started = time.perf_counter()
+    status = 0
+    first_recorded = False
+    result = None
+    try:
+        async with client.stream("POST", endpoint, json=payload) as response:
+            status = response.status_code
+            event = None
+            async for line in response.aiter_lines():
+                if line.startswith("event: "):
+                    event = line[len("event: "):]
+                    if event == "story" and not first_recorded:
+                        first_recorded = True
+                        recorder.record(f"{endpoint} (first event)", time.perf_counter() - started, status, True)
+                elif line.startswith("data: ") and event == "done":
+                    result = json.loads(line[len("data: "):])
+                elif line.startswith("data: ") and event == "error":
+                    status = 500
+        return result
+    except Exception:
+        return None
+    finally:
+        recorder.record(endpoint, time.perf_counter() - started, status, status == 200 and result is not None)
+
+
+async def _play_game(client, recorder: LatencyRecorder, args, rng: random.Random) -> None:
+    genre = rng.choice(args.genres)
+    if args.stream:
+        started = await _call_stream(client, recorder, "/api/story/start/stream", {"genre": genre})
+    else:
+        started = await _call(client, recorder, "/api/story/start", {"genre": genre})
+    if not started:
+        return
+    game_id, choices = started["game_id"], started.get("choices") or ["continue"]
+
+    for stage in range(1, args.stages + 1):
+        await asyncio.sleep(rng.uniform(0, args.think_time))
+        if rng.random() < args.advice_rate:
+            await _call(client, recorder, "/api/story/advice", {"game_id": game_id})
+        if rng.random() < args.chat_rate:
+            await _call(client, recorder, "/api/story/chat", {"game_id": game_id})
+
+        payload = {"genre": genre, "user_choice": rng.choice(choices), "game_id": game_id, "stage": stage}
+        if args.stream:
+            result = await _call_stream(client, recorder, "/api/story/continue/stream", payload)
+        else:
+            result = await _call(client, recorder, "/api/story/continue", payload)
+        if not result:
+            return
+        choices = result.get("choices") or choices
+
+    await _call(client, recorder, "/api/story/end", {
+        "game_id": game_id, "genre": genre, "user_choice": rng.choice(choices)
+    })
+
+
+async def run(args) -> Dict:
+    import httpx
+    from main import app
+    from api.routes.story import get_singleton_container
+    from service.warmup import get_warmup
+
+    recorder = LatencyRecorder()
+    monitor = LoopLagMonitor()
+    rng = random.Random(args.seed)
+
+    async with app.router.lifespan_context(app):
+        # 워밍업(스토리 파이프라인, 템플릿)이 끝난 뒤 측정 시작
+        await get_warmup().ready.wait()
+        _install_fake_models(get_singleton_container(), args)
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://bench", headers={"X-API-Key": API_KEY}, timeout=None
+        ) as client:
+            semaphore = asyncio.Semaphore(args.concurrency)
+
+            async def game(seed: int):
+                async with semaphore:
+                    await _play_game(client, recorder, args, random.Random(seed))
+
+            monitor.start()
+            started = time.perf_counter()
+            await asyncio.gather(*(game(rng.random()) for _ in range(args.games)))
+            elapsed = time.perf_counter() - started
+            await monitor.stop()
+
+    summary = recorder.summary(elapsed)
+    summary["loop_lag"] = monitor.summary()
+    summary["settings"] = {
+        key: getattr(args, key) for key in (
+            "games", "concurrency", "stages", "stream", "advice_rate", "chat_rate", "think_time",
+            "llm_latency", "llm_tps", "story_tokens", "backend_latency", "env",
+        )
+    }
+    return summary
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Offline story/NPC pipeline benchmark")
+    parser.add_argument("--games", type=int, default=100, help="실행할 가상 게임 수")
+    parser.add_argument("--concurrency", type=int, default=20, help="동시에 진행하는 게임 수")
+    parser.add_argument("--stages", type=int, default=3, help="게임당 /continue 횟수")
+    parser.add_argument("--genres", nargs="+", default=["Survival", "Romance"])
+    parser.add_argument("--stream", action="store_true", help="/start, /continue 대신 SSE 엔드포인트 사용")
+    parser.add_argument("--advice-rate", type=float, default=0.5, help="스테이지마다 /advice를 호출할 확률")
+    parser.add_argument("--chat-rate", type=float, default=0.5, help="스테이지마다 /chat을 호출할 확률")
+    parser.add_argument("--think-time", type=float, default=0.0, help="스테이지 사이 최대 대기 시간(초)")
+    parser.add_argument("--llm-latency", type=float, default=0.4, help="가짜 LLM 첫 토큰까지 지연(초)")
+    parser.add_argument("--llm-tps", type=float, default=80.0, help="가짜 LLM 초당 토큰 수")
+    parser.add_argument("--llm-jitter", type=float, default=0.2, help="지연 무작위 변동 비율")
+    parser.add_argument("--story-tokens", type=int, default=350)
+    parser.add_argument("--npc-tokens", type=int, default=120)
+    parser.add_argument("--text-tokens", type=int, default=120, help="요약/엔딩 등 일반 응답 토큰 수")
+    parser.add_argument("--backend-latency", type=float, default=0.005, help="스텁 백엔드 응답 지연(초)")
+    parser.add_argument("--env", action="append", default=[], metavar="KEY=VALUE", help="앱 설정 덮어쓰기")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="결과 JSON 저장 경로")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="비교할 기준선 JSON")
+    parser.add_argument("--save-baseline", action="store_true", help="이번 결과를 기준선으로 저장")
+    parser.add_argument("--max-regression", type=float, help="기준선 대비 허용 악화율(%%), 넘으면 종료 코드 1")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    backend = StubBackend(latency=args.backend_latency, genres=args.genres)
+    _prepare_environment(args, backend.start())
+    try:
+        summary = asyncio.run(run(args))
+    finally:
+        backend.stop()
+    summary["backend_requests"] = dict(backend.requests)
+
+    print(format_table(summary))
+    lag = summary["loop_lag"]
+    print(f"event loop lag: p50 {lag['p50_ms']}ms, p99 {lag['p99_ms']}ms, max {lag['max_ms']}ms")
+
+    if args.output:
+        save_json(args.output, summary)
+
+    exit_code = 0
+    baseline = load_baseline(args.baseline)
+    if baseline is not None and not args.save_baseline:
+        threshold = args.max_regression if args.max_regression is not None else 10.0
+        lines, regressed = compare(summary, baseline, threshold)
+        print(f"\nbaseline comparison ({args.baseline}):")
+        print("\n".join(lines))
+        if regressed and args.max_regression is not None:
+            exit_code = 1
+    if args.save_baseline:
+        save_json(args.baseline, summary)
+        print(f"\nbaseline saved to {args.baseline}")
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,180 @@
+# bench/startup.py
+"""
+기동 시간 측정
+
+1. import 시간: `python -X importtime -c "import main"` 결과를 최상위 패키지별 누적 시간으로 정리
+   main import 시점에 불러오면 안 되는 무거운 패키지(--forbid)가 섞여 있으면 실패로 표시합니다.
+2. /health 응답까지: uvicorn 프로세스를 띄운 시점부터 /health가 200을 돌려줄 때까지 (--runs회 중앙값)
+3. /ready 응답까지: 백그라운드 워밍업(스토리 파이프라인, 템플릿, 커넥션)이 끝나 /ready가 200이 될 때까지
+
+사용 예:
+    python -m bench.startup
+    python -m bench.startup --runs 5 --max-health-seconds 3 --output startup.json
+"""
+
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+from bench.report import save_json
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_FORBID = ["langchain", "langchain_openai", "langchain_core", "openai", "replicate", "tiktoken"]
+
+
+def _environment(args) -> Dict[str, str]:
+    env = dict(os.environ)
+    env.setdefault("API_KEY", "startup-bench-key")
+    env.setdefault("BACK_BASE_URL", "http://127.0.0.1:9")
+    env.setdefault("LOG_FILE", "")
+    for item in args.env:
+        key, _, value = item.partition("=")
+        env[key] = value
+    return env
+
+
+def parse_importtime(stderr: str) -> Tuple[float, Dict[str, float]]:
+    """(main 전체 누적 초, main이 직접 import한 모듈의 최상위 패키지별 누적 초)
+
+    -X importtime 형식: "import time: self [us] | cumulative | imported package"
+    하위 import가 부모보다 먼저, 두 칸씩 더 들여써서 출력되므로
+    main 줄 직전까지 모인 깊이 1 줄이 main의 직접 import입니다.
+    """
+    children: Dict[str, float] = defaultdict(float)
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        seconds = int(cumulative) / 1_000_000
+        name = name.strip()
+        if depth == 0:
+            if name == "main":
+                return seconds, dict(children)
+            children.clear()
+        elif depth == 1:
+            children[name.split(".")[0]] += seconds
+    return 0.0, {}
+
+
+def measure_imports(args, env: Dict[str, str]) -> Dict:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=ROOT, env=env, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise SystemExit(f"import main failed:\n{result.stderr[-2000:]}")
+    total, packages = parse_importtime(result.stderr)
+
+    # 의존 관계로 끌려온 모듈까지 포함해 금지 패키지가 로드됐는지 확인
+    check = subprocess.run(
+        [sys.executable, "-c", "import sys, main; print('\\n'.join(sys.modules))"],
+        cwd=ROOT, env=env, capture_output=True, text=True
+    )
+    loaded = {name.split(".")[0] for name in check.stdout.split()}
+    return {
+        "import_main_s": round(total, 3),
+        "top_packages": {
+            name: round(seconds, 3)
+            for name, seconds in sorted(packages.items(), key=lambda item: item[1], reverse=True)[:args.top]
+        },
+        "eager_heavy_packages": sorted(loaded & set(args.forbid)),
+    }
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _get_ok(url: str) -> bool:
+    try:
+        with urllib.request.urlopen(url, timeout=1) as response:
+            return response.status == 200
+    except OSError:
+        return False
+
+
+def measure_startup(env: Dict[str, str], timeout: float) -> Tuple[float, float]:
+    """uvicorn 실행부터 /health 200, /ready 200까지 걸린 초"""
+    port = _free_port()
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    times = []
+    try:
+        for path in ("/health", "/ready"):
+            while not _get_ok(f"http://127.0.0.1:{port}{path}"):
+                if process.poll() is not None:
+                    raise SystemExit(f"uvicorn exited with code {process.returncode}")
+                if time.perf_counter() - started > timeout:
+                    raise SystemExit(f"{path} did not answer within {timeout}s")
+                time.sleep(0.02)
+            times.append(time.perf_counter() - started)
+        return times[0], times[1]
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Import time and time-to-/health benchmark")
+    parser.add_argument("--runs", type=int, default=3, help="/health 측정 반복 횟수")
+    parser.add_argument("--top", type=int, default=15, help="출력할 패키지 수")
+    parser.add_argument("--forbid", nargs="*", default=DEFAULT_FORBID, help="main import 시점에 로드되면 안 되는 패키지")
+    parser.add_argument("--timeout", type=float, default=60.0, help="/health, /ready 대기 한도(초)")
+    parser.add_argument("--max-health-seconds", type=float, help="/health 중앙값 기준 (넘으면 종료 코드 1)")
+    parser.add_argument("--env", action="append", default=[], metavar="KEY=VALUE", help="앱 설정 덮어쓰기")
+    parser.add_argument("--output", help="결과 JSON 저장 경로")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    env = _environment(args)
+
+    summary = measure_imports(args, env)
+    runs: List[Tuple[float, float]] = [measure_startup(env, args.timeout) for _ in range(args.runs)]
+    for key, values in (("time_to_health_s", [run[0] for run in runs]), ("time_to_ready_s", [run[1] for run in runs])):
+        summary[key] = {
+            "median": round(statistics.median(values), 3),
+            "min": round(min(values), 3),
+            "max": round(max(values), 3),
+            "runs": [round(value, 3) for value in values],
+        }
+
+    print(f"import main: {summary['import_main_s']:.3f}s")
+    for name, seconds in summary["top_packages"].items():
+        print(f"  {name:<30}{seconds:>8.3f}s")
+    health = summary["time_to_health_s"]
+    print(f"time to /health: median {health['median']:.3f}s (min {health['min']:.3f}s, max {health['max']:.3f}s)")
+    ready = summary["time_to_ready_s"]
+    print(f"time to /ready:  median {ready['median']:.3f}s (min {ready['min']:.3f}s, max {ready['max']:.3f}s)")
+    if args.output:
+        save_json(args.output, summary)
+
+    exit_code = 0
+    if summary["eager_heavy_packages"]:
+        print(f"\nheavy packages loaded by `import main`: {', '.join(summary['eager_heavy_packages'])}")
+        exit_code = 1
+    if args.max_health_seconds is not None and health["median"] > args.max_health_seconds:
+        print(f"\ntime to /health {health['median']:.3f}s > {args.max_health_seconds}s")
+        exit_code = 1
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,124 @@
+# bench/stub_backend.py
+
+import asyncio
+import hashlib
+import random
+import threading
+from collections import Counter
+from typing import Dict, Optional
+
+from aiohttp import web
+
+# Spring 백엔드 대신 템플릿/프롬프트를 내려주는 로컬 HTTP 서버
+# 측정 대상 이벤트 루프에 부하를 주지 않도록 별도 스레드의 이벤트 루프에서 실행합니다.
+
+TEMPLATES: Dict[str, str] = {
+    "initial": "[[bench:initial]] Start a {genre} story for the player.",
+    "continue": (
+        "[[bench:continue]] Stage guide: {stage_template}\n"
+        "Previous story:\n{previous_story}\nPlayer choice: {user_choice}"
+    ),
+    "ending": "[[bench:ending]] Summary: {summary}\nConversation:\n{conversation_text}",
+    "rate": "[[bench:rate]] Rate the survival chance (0-100) for: {summary}",
+    "npc": "[[bench:npc]] Greet the player as an NPC guide.\n{story_context}",
+    "advice": (
+        "[[bench:advice]] Story: {story_context}\n"
+        "Previous advice:\n{conversation_history}\nChoices:\n{choices}"
+    ),
+}
+
+
+def _template_content(genre: str, type_: str) -> Optional[str]:
+    content = TEMPLATES.get(type_)
+    if content is None:
+        return None
+    # {genre}는 템플릿 변수가 아니므로 미리 채움
+    return content.replace("{genre}", genre)
+
+
+class StubBackend:
+    def __init__(self, latency: float = 0.005, prompts_per_genre: int = 20, genres=("Survival", "Romance")):
+        self.latency = latency
+        self.prompts = {
+            genre: [
+                {"file_name": f"{genre.lower()}-{i:03d}.txt", "content": f"{genre} opening scenario #{i}."}
+                for i in range(prompts_per_genre)
+            ]
+            for genre in genres
+        }
+        self.requests: Counter = Counter()
+        self.url: Optional[str] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._runner: Optional[web.AppRunner] = None
+
+    async def _delay(self) -> None:
+        if self.latency > 0:
+            await asyncio.sleep(self.latency)
+
+    async def _template(self, request: web.Request) -> web.Response:
+        self.requests["template"] += 1
+        await self._delay()
+        genre, type_ = request.match_info["genre"], request.match_info["type"]
+        content = _template_content(genre, type_)
+        if content is None:
+            return web.Response(status=404, text="unknown template")
+        etag = '"' + hashlib.sha1(content.encode("utf-8")).hexdigest() + '"'
+        if request.headers.get("If-None-Match") == etag:
+            return web.Response(status=304)
+        return web.json_response({"content": content, "version": etag}, headers={"ETag": etag})
+
+    async def _prompts(self, request: web.Request) -> web.Response:
+        self.requests["prompts"] += 1
+        await self._delay()
+        genre = request.query.get("genre", "")
+        cursor = "v1"
+        if request.query.get("since") == cursor:
+            return web.json_response({"prompts": [], "deleted": [], "cursor": cursor})
+        return web.json_response({"prompts": self.prompts.get(genre, []), "deleted": [], "cursor": cursor})
+
+    async def _random_prompt(self, request: web.Request) -> web.Response:
+        self.requests["random_prompt"] += 1
+        await self._delay()
+        prompts = self.prompts.get(request.query.get("genre", ""))
+        if not prompts:
+            return web.Response(status=404, text="unknown genre")
+        return web.json_response(random.choice(prompts))
+
+    def _app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get("/api/templates/{genre}/{type}", self._template)
+        app.router.add_get("/api/admin/prompts/random", self._random_prompt)
+        app.router.add_get("/api/admin/prompts", self._prompts)
+        return app
+
+    def start(self) -> str:
+        """서버 스레드 시작 후 base URL 반환"""
+        ready = threading.Event()
+
+        async def serve():
+            self._runner = web.AppRunner(self._app(), access_log=None)
+            await self._runner.setup()
+            site = web.TCPSite(self._runner, "127.0.0.1", 0)
+            await site.start()
+            port = site._server.sockets[0].getsockname()[1]
+            self.url = f"http://127.0.0.1:{port}"
+            ready.set()
+
+        def run():
+            self._loop = asyncio.new_event_loop()
+            self._loop.run_until_complete(serve())
+            self._loop.run_forever()
+            self._loop.run_until_complete(self._runner.cleanup())
+            self._loop.close()
+
+        self._thread = threading.Thread(target=run, name="bench-stub-backend", daemon=True)
+        self._thread.start()
+        ready.wait()
+        return self.url
+
+    def stop(self) -> None:
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+        if self._thread is not None:
+            self._thread.join(timeout=5)
@@ -14,4 +14,107 @@ class Config:
 
     API_KEY = os.getenv("API_KEY")
 
+    # 게임 세션 저장소
+    SESSION_MAX_GAMES = int(os.getenv("SESSION_MAX_GAMES", "10000"))
+    SESSION_TTL_SECONDS = float(os.getenv("SESSION_TTL_SECONDS", "3600"))
+    SESSION_MAX_BYTES = int(os.getenv("SESSION_MAX_BYTES", str(256 * 1024 * 1024)))
+    SESSION_HISTORY_TURNS = int(os.getenv("SESSION_HISTORY_TURNS", "5"))
+    SESSION_MAX_PENDING_TURNS = int(os.getenv("SESSION_MAX_PENDING_TURNS", "30"))  # 요약 대기 중 보관할 최대 턴 수
+    SESSION_BACKEND = os.getenv("SESSION_BACKEND", "memory")  # memory | sqlite | kv
+    SESSION_SQLITE_PATH = os.getenv("SESSION_SQLITE_PATH", "sessions.db")
+    SESSION_BATCH_MAX = int(os.getenv("SESSION_BATCH_MAX", "64"))
+    SESSION_BATCH_DELAY_MS = float(os.getenv("SESSION_BATCH_DELAY_MS", "2"))
+    SESSION_UPDATE_RETRIES = int(os.getenv("SESSION_UPDATE_RETRIES", "5"))  # 동시 갱신 충돌 시 재시도 횟수
+
+    # 백엔드 템플릿 캐시
+    TEMPLATE_CACHE_TTL_SECONDS = float(os.getenv("TEMPLATE_CACHE_TTL_SECONDS", "300"))
+    TEMPLATE_CACHE_STALE_SECONDS = float(os.getenv("TEMPLATE_CACHE_STALE_SECONDS", "86400"))
+
+    # 백엔드 API 커넥션 풀
+    BACKEND_HTTP_LIMIT = int(os.getenv("BACKEND_HTTP_LIMIT", "100"))
+    BACKEND_HTTP_LIMIT_PER_HOST = int(os.getenv("BACKEND_HTTP_LIMIT_PER_HOST", "50"))
+    BACKEND_HTTP_KEEPALIVE_SECONDS = float(os.getenv("BACKEND_HTTP_KEEPALIVE_SECONDS", "30"))
+    BACKEND_HTTP_DNS_TTL_SECONDS = int(os.getenv("BACKEND_HTTP_DNS_TTL_SECONDS", "300"))
+    BACKEND_HTTP_TIMEOUT_SECONDS = float(os.getenv("BACKEND_HTTP_TIMEOUT_SECONDS", "10"))
+    BACKEND_HTTP_CONNECT_TIMEOUT_SECONDS = float(os.getenv("BACKEND_HTTP_CONNECT_TIMEOUT_SECONDS", "3"))
+
+    # 로컬 프롬프트 카탈로그
+    PROMPT_CATALOG_GENRES = [g for g in os.getenv("PROMPT_CATALOG_GENRES", "Survival,Romance").split(",") if g]
+    PROMPT_CATALOG_SYNC_SECONDS = float(os.getenv("PROMPT_CATALOG_SYNC_SECONDS", "300"))
+    PROMPT_CATALOG_FULL_SYNC_SECONDS = float(os.getenv("PROMPT_CATALOG_FULL_SYNC_SECONDS", "3600"))
+    PROMPT_CATALOG_RECENT = int(os.getenv("PROMPT_CATALOG_RECENT", "5"))
+
+    # 이미지 생성
+    IMAGE_EXECUTOR_WORKERS = int(os.getenv("IMAGE_EXECUTOR_WORKERS", "32"))
+    IMAGE_HTTP_LIMIT = int(os.getenv("IMAGE_HTTP_LIMIT", "64"))
+    IMAGE_DOWNLOAD_TIMEOUT_SECONDS = float(os.getenv("IMAGE_DOWNLOAD_TIMEOUT_SECONDS", "60"))
+    IMAGE_STREAM_CHUNK_BYTES = int(os.getenv("IMAGE_STREAM_CHUNK_BYTES", str(64 * 1024)))
+    IMAGE_BATCH_MAX_IMAGES = int(os.getenv("IMAGE_BATCH_MAX_IMAGES", "32"))
+    IMAGE_BATCH_CONCURRENCY = int(os.getenv("IMAGE_BATCH_CONCURRENCY", "4"))
+    IMAGE_JOB_WORKERS = int(os.getenv("IMAGE_JOB_WORKERS", "4"))
+    IMAGE_JOB_QUEUE_MAX = int(os.getenv("IMAGE_JOB_QUEUE_MAX", "256"))
+    IMAGE_JOB_RESULT_TTL_SECONDS = float(os.getenv("IMAGE_JOB_RESULT_TTL_SECONDS", "3600"))
+    IMAGE_JOB_MAX_WAIT_SECONDS = float(os.getenv("IMAGE_JOB_MAX_WAIT_SECONDS", "30"))
+
+    # 누적 요약 메모리
+    SUMMARY_RECENT_TURNS = int(os.getenv("SUMMARY_RECENT_TURNS", "2"))
+    SUMMARY_MAX_WORDS = int(os.getenv("SUMMARY_MAX_WORDS", "250"))
+    SUMMARY_END_WAIT_SECONDS = float(os.getenv("SUMMARY_END_WAIT_SECONDS", "1.5"))
+
+    # 프롬프트 종류별 토큰 예산 (히스토리/요약 등 가변 입력 기준)
+    TOKEN_BUDGET_CONTINUE = int(os.getenv("TOKEN_BUDGET_CONTINUE", "2500"))
+    TOKEN_BUDGET_NPC_ADVICE = int(os.getenv("TOKEN_BUDGET_NPC_ADVICE", "1500"))
+    TOKEN_BUDGET_ENDING = int(os.getenv("TOKEN_BUDGET_ENDING", "3000"))
+
+    # 이미지 프롬프트 요약 캐시 (PROMPT_CACHE_DIR를 지정하면 디스크 계층 사용)
+    PROMPT_CACHE_SIZE = int(os.getenv("PROMPT_CACHE_SIZE", "1024"))
+    PROMPT_CACHE_TTL_SECONDS = float(os.getenv("PROMPT_CACHE_TTL_SECONDS", "86400"))
+    PROMPT_CACHE_DIR = os.getenv("PROMPT_CACHE_DIR", "")
+
+    # 생성 이미지 디스크 저장소 (내용 주소 기반, 용량 초과 시 LRU 삭제)
+    IMAGE_STORE_DIR = os.getenv("IMAGE_STORE_DIR", "image_cache")
+    IMAGE_STORE_MAX_BYTES = int(os.getenv("IMAGE_STORE_MAX_BYTES", str(1024 * 1024 * 1024)))
+    IMAGE_STORE_EVICT_RATIO = float(os.getenv("IMAGE_STORE_EVICT_RATIO", "0.9"))
+    IMAGE_STORE_EVICT_GRACE_SECONDS = float(os.getenv("IMAGE_STORE_EVICT_GRACE_SECONDS", "60"))
+    IMAGE_STORE_WRITE_BUFFER_BYTES = int(os.getenv("IMAGE_STORE_WRITE_BUFFER_BYTES", str(256 * 1024)))
+
+    # 외부 모델 호출 제한 (동시 실행 수 0이면 무제한, 초당 호출 수 0이면 제한 없음)
+    OPENAI_MAX_CONCURRENCY = int(os.getenv("OPENAI_MAX_CONCURRENCY", "16"))
+    OPENAI_RATE_PER_SECOND = float(os.getenv("OPENAI_RATE_PER_SECOND", "8"))
+    OPENAI_RATE_BURST = float(os.getenv("OPENAI_RATE_BURST", "16"))
+    REPLICATE_MAX_CONCURRENCY = int(os.getenv("REPLICATE_MAX_CONCURRENCY", "4"))
+    REPLICATE_RATE_PER_SECOND = float(os.getenv("REPLICATE_RATE_PER_SECOND", "1"))
+    REPLICATE_RATE_BURST = float(os.getenv("REPLICATE_RATE_BURST", "4"))
+
+    # 선택지별 다음 스테이지 미리 생성 (기본 비활성화)
+    SPECULATION_ENABLED = os.getenv("SPECULATION_ENABLED", "false").lower() == "true"
+    SPECULATION_MAX_CONCURRENCY = int(os.getenv("SPECULATION_MAX_CONCURRENCY", "4"))
+    SPECULATION_TTL_SECONDS = float(os.getenv("SPECULATION_TTL_SECONDS", "600"))
+
+    # 스테이지 생성 직후 NPC 조언 미리 계산 (기본 비활성화)
+    NPC_PRECOMPUTE_ENABLED = os.getenv("NPC_PRECOMPUTE_ENABLED", "false").lower() == "true"
+
+    # 구조화 로그 / 트레이싱 (LOG_COLLECTOR_HOST를 지정하면 JSON 라인을 TCP로 전송)
+    LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+    LOG_FILE = os.getenv("LOG_FILE", "logs/nati.jsonl")
+    LOG_FILE_MAX_BYTES = int(os.getenv("LOG_FILE_MAX_BYTES", str(50 * 1024 * 1024)))
+    LOG_FILE_BACKUPS = int(os.getenv("LOG_FILE_BACKUPS", "5"))
+    LOG_COLLECTOR_HOST = os.getenv("LOG_COLLECTOR_HOST", "")
+    LOG_COLLECTOR_PORT = int(os.getenv("LOG_COLLECTOR_PORT", "5170"))
+    LOG_QUEUE_MAX = int(os.getenv("LOG_QUEUE_MAX", "10000"))
+    TRACE_SAMPLE_RATE = float(os.getenv("TRACE_SAMPLE_RATE", "0.1"))
+
+    # 트래픽 기록 (bench/replay.py로 재생, 기본 비활성화)
+    TRAFFIC_RECORD_ENABLED = os.getenv("TRAFFIC_RECORD_ENABLED", "false").lower() == "true"
+    TRAFFIC_RECORD_FILE = os.getenv("TRAFFIC_RECORD_FILE", "traffic/recording.jsonl")
+    TRAFFIC_RECORD_SAMPLE_RATE = float(os.getenv("TRAFFIC_RECORD_SAMPLE_RATE", "1.0"))
+    TRAFFIC_RECORD_MAX_BYTES = int(os.getenv("TRAFFIC_RECORD_MAX_BYTES", str(100 * 1024 * 1024)))
+    TRAFFIC_RECORD_SALT = os.getenv("TRAFFIC_RECORD_SALT", "")
+
+    # 기동 워밍업 (/ready는 필수 단계가 성공한 뒤에만 200, 실패하면 백오프 재시도)
+    WARMUP_TIMEOUT_SECONDS = float(os.getenv("WARMUP_TIMEOUT_SECONDS", "30"))
+    WARMUP_LLM_PING = os.getenv("WARMUP_LLM_PING", "false").lower() == "true"
+    WARMUP_RETRY_BACKOFF_SECONDS = float(os.getenv("WARMUP_RETRY_BACKOFF_SECONDS", "1"))
+    WARMUP_RETRY_BACKOFF_MAX_SECONDS = float(os.getenv("WARMUP_RETRY_BACKOFF_MAX_SECONDS", "30"))
+
 config = Config()
@@ -0,0 +1,162 @@
+# core/log.py
+
+import copy
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import socket
+from typing import Optional
+
+from core.config import config
+from core.tracing import current_span
+
+# 구조화(JSON 라인) 로그
+# 요청 경로에서는 레코드를 큐에 넣기만 하고, 파일/수집기 기록은 QueueListener 스레드가 처리합니다.
+# WARNING 미만 레코드는 트레이스 샘플링 결과를 따르므로 부하가 높아도 기록량이 일정 비율로 유지됩니다.
+
+_RESERVED = {"exc_info", "stack_info", "stacklevel", "extra"}
+
+_exception_formatter = logging.Formatter()
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_queue_handler: Optional[logging.Handler] = None
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "ts": round(record.created, 6),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        trace_id = getattr(record, "trace_id", None)
+        if trace_id:
+            payload["trace_id"] = trace_id
+            payload["span_id"] = record.span_id
+        payload.update(getattr(record, "fields", None) or {})
+        if record.exc_text:
+            payload["exc"] = record.exc_text
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+
+class TraceSampler(logging.Filter):
+    """현재 트레이스 ID를 레코드에 붙이고, 샘플링되지 않은 트레이스의 INFO 이하 로그는 큐에 넣기 전에 버림"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        current = current_span()
+        if current is not None:
+            record.trace_id = current.trace_id
+            record.span_id = current.span_id
+            sampled = current.sampled
+        else:
+            sampled = random.random() < config.TRACE_SAMPLE_RATE
+        return sampled or record.levelno >= logging.WARNING or record.name == "nati.trace"
+
+
+class _DroppingQueueHandler(logging.handlers.QueueHandler):
+    """큐가 가득 차면 기다리지 않고 레코드를 버림 (요청 경로를 막지 않음)"""
+
+    dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # 기본 구현은 예외 스택을 메시지에 합치므로 exc_text로 따로 보관
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = _exception_formatter.formatException(record.exc_info)
+        record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            _DroppingQueueHandler.dropped += 1
+
+
+class CollectorHandler(logging.handlers.SocketHandler):
+    """JSON 라인을 TCP 수집기(Vector, Fluent Bit 등)로 전송 (리스너 스레드에서만 실행)"""
+
+    def makePickle(self, record: logging.LogRecord) -> bytes:
+        return (self.format(record) + "\n").encode("utf-8")
+
+    def makeSocket(self, timeout=1):
+        return socket.create_connection((self.host, self.port), timeout=timeout)
+
+
+class StructuredLogger(logging.LoggerAdapter):
+    """log.info("message", game_id=..., stage=...) 형태로 필드를 넘기는 로거"""
+
+    def process(self, msg, kwargs):
+        fields = {key: kwargs.pop(key) for key in list(kwargs) if key not in _RESERVED}
+        if fields:
+            kwargs["extra"] = {**kwargs.get("extra", {}), "fields": fields}
+        return msg, kwargs
+
+
+def get_logger(name: str) -> StructuredLogger:
+    return StructuredLogger(logging.getLogger(f"nati.{name}"), {})
+
+
+def _make_handlers():
+    formatter = JsonFormatter()
+    handlers = []
+    if config.LOG_FILE:
+        directory = os.path.dirname(config.LOG_FILE)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        file_handler = logging.handlers.RotatingFileHandler(
+            config.LOG_FILE, maxBytes=config.LOG_FILE_MAX_BYTES,
+            backupCount=config.LOG_FILE_BACKUPS, encoding="utf-8"
+        )
+        handlers.append(file_handler)
+    if config.LOG_COLLECTOR_HOST:
+        handlers.append(CollectorHandler(config.LOG_COLLECTOR_HOST, config.LOG_COLLECTOR_PORT))
+    if not handlers:
+        handlers.append(logging.StreamHandler())
+    for handler in handlers:
+        handler.setFormatter(formatter)
+    return handlers
+
+
+def setup_logging() -> None:
+    """nati.* 로거를 비동기 큐 핸들러로 연결하고 리스너 스레드 시작 (lifespan에서 호출)"""
+    global _listener, _queue_handler
+    if _listener is not None:
+        return
+    records: queue.Queue = queue.Queue(maxsize=config.LOG_QUEUE_MAX)
+    _queue_handler = _DroppingQueueHandler(records)
+    _queue_handler.addFilter(TraceSampler())
+
+    root = logging.getLogger("nati")
+    root.setLevel(config.LOG_LEVEL)
+    root.addHandler(_queue_handler)
+    root.propagate = False
+
+    _listener = logging.handlers.QueueListener(records, *_make_handlers(), respect_handler_level=True)
+    _listener.start()
+
+
+def shutdown_logging() -> None:
+    """남은 레코드를 모두 기록하고 리스너 종료"""
+    global _listener, _queue_handler
+    if _listener is None:
+        return
+    _listener.stop()
+    for handler in _listener.handlers:
+        handler.close()
+    logging.getLogger("nati").removeHandler(_queue_handler)
+    _listener = None
+    _queue_handler = None
+
+
+def logging_stats():
+    return {
+        "queued": _queue_handler.queue.qsize() if _queue_handler is not None else 0,
+        "dropped": _DroppingQueueHandler.dropped,
+    }
@@ -0,0 +1,297 @@
+# core/metrics.py
+
+import bisect
+import time
+from contextlib import asynccontextmanager
+from typing import Callable, Dict, Iterable, List, Tuple
+
+from core.log import get_logger
+from core.tracing import span
+
+log = get_logger("metrics")
+
+# Prometheus 텍스트 포맷(0.0.4)을 직접 생성하는 경량 구현
+# 관측은 딕셔너리 조회 + 덧셈 수준이라 요청 경로에 부담이 거의 없습니다.
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60)
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Iterable[str], values: Iterable[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> List[str]:
+        return self.header() + [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in self._values.items()
+        ]
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[LabelValues, float] = {}
+
+    def set(self, value: float, **labels) -> None:
+        self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels) -> None:
+        self.inc(-amount, **labels)
+
+    def render(self) -> List[str]:
+        return self.header() + [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in self._values.items()
+        ]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # 라벨 조합별 [버킷별 개수..., +Inf 개수], 합계
+        self._counts: Dict[LabelValues, List[int]] = {}
+        self._sums: Dict[LabelValues, float] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        counts = self._counts.get(key)
+        if counts is None:
+            counts = self._counts[key] = [0] * (len(self.buckets) + 1)
+            self._sums[key] = 0.0
+        counts[bisect.bisect_left(self.buckets, value)] += 1
+        self._sums[key] += value
+
+    @asynccontextmanager
+    async def time(self, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def render(self) -> List[str]:
+        lines = self.header()
+        for key, counts in self._counts.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(self._sums[key])}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: Dict[str, Callable[[], Dict]] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames=()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames=()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames=(), buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def register_collector(self, component: str, stats: Callable[[], Dict]) -> None:
+        """스크랩 시점에만 호출되는 컴포넌트 stats() (숫자 값만 게이지로 내보냄)"""
+        self._collectors[component] = stats
+
+    def _collect_components(self) -> List[str]:
+        name = "nati_component_stat"
+        lines = [
+            f"# HELP {name} Internal component counters exported from stats()",
+            f"# TYPE {name} gauge",
+        ]
+        for component, stats in list(self._collectors.items()):
+            try:
+                values = stats()
+            except Exception as e:
+                log.warning("Failed to collect component stats", component=component, error=str(e))
+                continue
+            for key, value in _flatten(values):
+                labels = _format_labels(("component", "key"), (component, key))
+                lines.append(f"{name}{labels} {_format_value(value)}")
+        return lines
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in list(self._metrics.values()):
+            lines.extend(metric.render())
+        if self._collectors:
+            lines.extend(self._collect_components())
+        return "\n".join(lines) + "\n"
+
+
+def _flatten(values: Dict, prefix: str = "") -> Iterable[Tuple[str, float]]:
+    for key, value in values.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, bool):
+            yield name, float(value)
+        elif isinstance(value, (int, float)):
+            yield name, value
+        elif isinstance(value, dict):
+            yield from _flatten(value, f"{name}.")
+
+
+registry = Registry()
+
+# HTTP
+HTTP_REQUEST_SECONDS = registry.histogram(
+    "nati_http_request_duration_seconds", "HTTP request latency until the last body chunk",
+    ("method", "route", "status")
+)
+HTTP_IN_FLIGHT = registry.gauge("nati_http_requests_in_flight", "HTTP requests in progress")
+
+# LLM 호출 (call site: initial, continue, npc_greeting, npc_advice, summary, rate, ending, image_prompt, speculative)
+LLM_SECONDS = registry.histogram("nati_llm_request_duration_seconds", "LLM call latency per call site", ("site",))
+LLM_TOKENS = registry.counter("nati_llm_tokens_total", "LLM tokens per call site", ("site", "kind"))
+LLM_ERRORS = registry.counter("nati_llm_errors_total", "Failed LLM calls per call site", ("site",))
+LLM_IN_FLIGHT = registry.gauge("nati_llm_requests_in_flight", "LLM calls in progress", ("site",))
+
+# 백엔드(Spring) 호출
+BACKEND_SECONDS = registry.histogram(
+    "nati_backend_request_duration_seconds", "Backend template/prompt fetch latency", ("kind", "status")
+)
+
+# 이미지
+IMAGE_RENDER_SECONDS = registry.histogram("nati_image_render_duration_seconds", "Replicate render latency", ("status",))
+IMAGE_DOWNLOAD_SECONDS = registry.histogram(
+    "nati_image_download_duration_seconds", "Generated image download/stream time", ("status",)
+)
+IMAGE_IN_FLIGHT = registry.gauge("nati_image_renders_in_flight", "Replicate renders in progress")
+
+# 기동 단계별 소요 시간 (import: main 모듈 import, lifespan: /health 응답 전까지, warmup과 그 단계들: /ready 전까지)
+STARTUP_SECONDS = registry.gauge("nati_startup_duration_seconds", "Startup phase duration", ("phase",))
+
+
+class LLMCall:
+    """observe_llm 블록 안에서 토큰 수를 기록"""
+    __slots__ = ("prompt_tokens", "completion_tokens")
+
+    def __init__(self):
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+
+
+@asynccontextmanager
+async def observe_llm(site: str):
+    """LLM 호출 하나의 지연/토큰 수 기록 (트레이스에는 llm.<site> 스팬으로 남음)"""
+    call = LLMCall()
+    LLM_IN_FLIGHT.inc(site=site)
+    started = time.perf_counter()
+    with span(f"llm.{site}") as current:
+        try:
+            yield call
+        except BaseException:
+            LLM_ERRORS.inc(site=site)
+            raise
+        finally:
+            LLM_SECONDS.observe(time.perf_counter() - started, site=site)
+            LLM_IN_FLIGHT.dec(site=site)
+            if call.prompt_tokens:
+                LLM_TOKENS.inc(call.prompt_tokens, site=site, kind="prompt")
+            if call.completion_tokens:
+                LLM_TOKENS.inc(call.completion_tokens, site=site, kind="completion")
+            current.set(prompt_tokens=call.prompt_tokens, completion_tokens=call.completion_tokens)
+
+
+class MetricsMiddleware:
+    """라우트 템플릿(/api/story/continue 등) 기준 요청 지연 및 전체 동시 처리 수 측정 (ASGI)
+
+    스트리밍 응답도 마지막 본문 청크가 나갈 때까지를 지연 시간으로 봅니다.
+    """
+
+    def __init__(self, app, exclude: Tuple[str, ...] = ("/metrics",)):
+        self.app = app
+        self.exclude = exclude
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in self.exclude:
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = {"code": "500"}
+        HTTP_IN_FLIGHT.inc()
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = str(message["status"])
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_IN_FLIGHT.dec()
+            route = scope.get("route")
+            HTTP_REQUEST_SECONDS.observe(
+                time.perf_counter() - started,
+                method=scope["method"],
+                route=getattr(route, "path", "unmatched"),
+                status=status["code"],
+            )
+
+
+def render_metrics() -> str:
+    return registry.render()
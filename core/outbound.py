@@ -0,0 +1,171 @@
+# core/outbound.py
+
+import asyncio
+import heapq
+import itertools
+import time
+from contextlib import asynccontextmanager
+from enum import IntEnum
+from functools import lru_cache
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple, TypeVar
+
+from core.config import config
+
+T = TypeVar("T")
+
+OPENAI = "openai"
+REPLICATE = "replicate"
+
+
+class Priority(IntEnum):
+    """값이 작을수록 먼저 실행"""
+    STORY = 0   # 스토리 진행 (/start, /continue, /end, 누적 요약)
+    NPC = 1     # NPC 인사/조언
+    IMAGE = 2   # 이미지 프롬프트 요약, 이미지 생성
+    SPECULATIVE = 3  # 다음 스테이지 미리 생성 (남는 슬롯에서만)
+
+
+class TokenBucket:
+    """초당 rate개씩 채워지는 토큰 버킷 (최대 capacity개까지 버스트 허용)"""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = max(capacity, 1.0)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self) -> None:
+        # 락을 잡은 순서(=슬롯을 받은 우선순위 순서)대로 토큰 배분
+        async with self._lock:
+            while True:
+                self._refill()
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class ProviderLimiter:
+    """공급자 하나의 동시 실행 수 제한 + 우선순위 대기열 + 토큰 버킷"""
+
+    def __init__(self, name: str, max_concurrency: int, rate: float = 0, burst: float = 0):
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.bucket = TokenBucket(rate, burst or rate) if rate > 0 else None
+        self.active = 0
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._seq = itertools.count()
+
+        self.acquired = 0
+        self.max_queued = 0
+        self.wait_count: Dict[str, int] = {}
+        self.wait_total: Dict[str, float] = {}
+        self.wait_max: Dict[str, float] = {}
+
+    def queued(self) -> Dict[str, int]:
+        depth = {priority.name.lower(): 0 for priority in Priority}
+        for priority, _, future in self._waiters:
+            if not future.done():
+                depth[Priority(priority).name.lower()] += 1
+        return depth
+
+    async def acquire(self, priority: Priority) -> None:
+        started = time.monotonic()
+        unlimited = self.max_concurrency <= 0
+        if unlimited or (self.active < self.max_concurrency and not any(not f.done() for _, _, f in self._waiters)):
+            self.active += 1
+        else:
+            future = asyncio.get_running_loop().create_future()
+            heapq.heappush(self._waiters, (int(priority), next(self._seq), future))
+            self.max_queued = max(self.max_queued, sum(self.queued().values()))
+            try:
+                # release()가 슬롯을 넘겨주면 깨어남 (active는 넘겨준 쪽에서 유지)
+                await future
+            except asyncio.CancelledError:
+                if future.done() and not future.cancelled():
+                    self.release()
+                raise
+
+        try:
+            if self.bucket is not None:
+                await self.bucket.acquire()
+        except BaseException:
+            self.release()
+            raise
+        self._record_wait(priority, time.monotonic() - started)
+
+    def release(self) -> None:
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                future.set_result(None)
+                return
+        self.active -= 1
+
+    def _record_wait(self, priority: Priority, waited: float) -> None:
+        name = priority.name.lower()
+        self.acquired += 1
+        self.wait_count[name] = self.wait_count.get(name, 0) + 1
+        self.wait_total[name] = self.wait_total.get(name, 0.0) + waited
+        self.wait_max[name] = max(self.wait_max.get(name, 0.0), waited)
+
+    def stats(self) -> Dict:
+        return {
+            "max_concurrency": self.max_concurrency,
+            "active": self.active,
+            "queued": self.queued(),
+            "max_queued": self.max_queued,
+            "acquired": self.acquired,
+            "wait_count": dict(self.wait_count),
+            "wait_seconds_total": {k: round(v, 4) for k, v in self.wait_total.items()},
+            "wait_seconds_max": {k: round(v, 4) for k, v in self.wait_max.items()},
+        }
+
+
+class OutboundScheduler:
+    """외부 모델 호출(OpenAI, Replicate) 공용 스케줄러
+
+    공급자별로 동시 실행 수와 초당 호출 수를 제한하고,
+    슬롯이 부족하면 스토리 > NPC > 이미지 순서로 대기열에서 꺼냅니다.
+    """
+
+    def __init__(self, limiters: Optional[Dict[str, ProviderLimiter]] = None):
+        self.limiters = limiters or {
+            OPENAI: ProviderLimiter(
+                OPENAI, config.OPENAI_MAX_CONCURRENCY,
+                config.OPENAI_RATE_PER_SECOND, config.OPENAI_RATE_BURST
+            ),
+            REPLICATE: ProviderLimiter(
+                REPLICATE, config.REPLICATE_MAX_CONCURRENCY,
+                config.REPLICATE_RATE_PER_SECOND, config.REPLICATE_RATE_BURST
+            ),
+        }
+
+    @asynccontextmanager
+    async def slot(self, provider: str, priority: Priority):
+        """스트리밍처럼 호출이 길게 이어지는 경우 슬롯을 잡고 있는 구간"""
+        limiter = self.limiters[provider]
+        await limiter.acquire(priority)
+        try:
+            yield
+        finally:
+            limiter.release()
+
+    async def run(self, provider: str, priority: Priority, fn: Callable[[], Awaitable[T]]) -> T:
+        async with self.slot(provider, priority):
+            return await fn()
+
+    def stats(self) -> Dict[str, Dict]:
+        return {name: limiter.stats() for name, limiter in self.limiters.items()}
+
+
+@lru_cache()
+def get_outbound_scheduler() -> OutboundScheduler:
+    """프로세스 공용 OutboundScheduler"""
+    return OutboundScheduler()
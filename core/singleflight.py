@@ -0,0 +1,77 @@
+# core/singleflight.py
+
+import asyncio
+from typing import Awaitable, Callable, Dict, Hashable, TypeVar
+
+T = TypeVar("T")
+
+# 이름별 인스턴스 (통계 수집용)
+_registry: Dict[str, "SingleFlight"] = {}
+
+
+class _Call:
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """같은 키로 동시에 들어온 호출을 하나의 실행으로 합침
+
+    - 먼저 들어온 호출만 실제로 실행하고, 나머지는 같은 결과(또는 예외)를 받습니다.
+    - 기다리던 호출 하나가 취소되어도 공유 작업은 계속되며,
+      마지막으로 기다리던 호출까지 취소되면 공유 작업도 취소합니다.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._calls: Dict[Hashable, _Call] = {}
+        self.executed = 0
+        self.collapsed = 0
+        self.errors = 0
+        _registry[name] = self
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        call = self._calls.get(key)
+        if call is None:
+            call = _Call(asyncio.ensure_future(fn()))
+            self._calls[key] = call
+            call.task.add_done_callback(lambda task, key=key, call=call: self._on_done(key, call, task))
+            self.executed += 1
+        else:
+            self.collapsed += 1
+
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task)
+        except asyncio.CancelledError:
+            if call.waiters == 1 and not call.task.done():
+                # 결과를 기다리는 호출이 더 없으므로 공유 작업도 정리
+                if self._calls.get(key) is call:
+                    del self._calls[key]
+                call.task.cancel()
+            raise
+        finally:
+            call.waiters -= 1
+
+    def _on_done(self, key: Hashable, call: _Call, task: asyncio.Task) -> None:
+        if self._calls.get(key) is call:
+            del self._calls[key]
+        if not task.cancelled() and task.exception() is not None:
+            self.errors += 1
+
+    def in_flight(self, key: Hashable) -> bool:
+        return key in self._calls
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "executed": self.executed,
+            "collapsed": self.collapsed,
+            "errors": self.errors,
+            "in_flight": len(self._calls),
+        }
+
+
+def singleflight_stats() -> Dict[str, Dict[str, int]]:
+    """등록된 모든 SingleFlight의 통계"""
+    return {name: flight.stats() for name, flight in _registry.items()}
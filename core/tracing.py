@@ -0,0 +1,165 @@
+# core/tracing.py
+
+import functools
+import logging
+import random
+import secrets
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+from core.config import config
+
+# 요청 단위 트레이스 (W3C traceparent 호환 ID)
+# 샘플링 여부는 루트 스팬에서 한 번 정하고 자식 스팬과 로그가 그대로 따릅니다.
+# 샘플링되지 않은 스팬은 ID만 가지고 있다가 아무것도 기록하지 않습니다.
+
+_span_logger = logging.getLogger("nati.trace")
+_current: ContextVar[Optional["Span"]] = ContextVar("nati_current_span", default=None)
+
+
+class Span:
+    __slots__ = (
+        "name", "trace_id", "span_id", "parent_id", "sampled",
+        "attributes", "started", "started_at", "status", "error",
+    )
+
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str], sampled: bool, attributes: Dict):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.sampled = sampled
+        self.attributes = attributes
+        self.started = time.perf_counter()
+        self.started_at = time.time()
+        self.status = "ok"
+        self.error: Optional[str] = None
+
+    def set(self, **attributes) -> None:
+        if self.sampled:
+            self.attributes.update(attributes)
+
+    def fail(self, error: BaseException) -> None:
+        self.status = "error"
+        self.error = f"{type(error).__name__}: {error}"
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-{'01' if self.sampled else '00'}"
+
+    def finish(self) -> None:
+        if not self.sampled and self.status == "ok":
+            return
+        # 오류가 난 스팬은 샘플링과 관계없이 기록
+        _span_logger.info(self.name, extra={"fields": {
+            "kind": "span",
+            "span": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start": round(self.started_at, 6),
+            "duration_ms": round((time.perf_counter() - self.started) * 1000, 3),
+            "status": self.status,
+            "error": self.error,
+            **self.attributes,
+        }})
+
+
+def current_span() -> Optional[Span]:
+    return _current.get()
+
+
+def _parse_traceparent(header: Optional[str]):
+    """traceparent 헤더에서 (trace_id, parent_id, sampled) 추출 (형식이 다르면 None)"""
+    if not header:
+        return None
+    parts = header.strip().split("-")
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    try:
+        sampled = bool(int(parts[3], 16) & 1)
+    except ValueError:
+        return None
+    return parts[1], parts[2], sampled
+
+
+@contextmanager
+def span(name: str, traceparent: Optional[str] = None, **attributes):
+    """현재 스팬의 자식 스팬 (없으면 새 트레이스 시작)
+
+    async 코드에서도 그대로 사용할 수 있습니다. contextvars는 태스크별로 복사되므로
+    create_task로 띄운 백그라운드 작업은 만든 시점의 스팬을 부모로 이어받습니다.
+    """
+    parent = _current.get()
+    if parent is not None:
+        trace_id, parent_id, sampled = parent.trace_id, parent.span_id, parent.sampled
+    else:
+        incoming = _parse_traceparent(traceparent)
+        if incoming is not None:
+            trace_id, parent_id, sampled = incoming
+        else:
+            trace_id, parent_id = secrets.token_hex(16), None
+            sampled = random.random() < config.TRACE_SAMPLE_RATE
+
+    current = Span(name, trace_id, parent_id, sampled, attributes if sampled else {})
+    token = _current.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.fail(e)
+        raise
+    finally:
+        try:
+            _current.reset(token)
+        except ValueError:
+            # 비동기 제너레이터가 다른 컨텍스트에서 닫힌 경우
+            _current.set(parent)
+        current.finish()
+
+
+def traced(name: str):
+    """async 함수 전체를 스팬으로 감싸는 데코레이터"""
+    def decorator(fn):
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            with span(name):
+                return await fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class TracingMiddleware:
+    """요청마다 루트 스팬 생성 (traceparent 헤더를 이어받고 응답에 X-Trace-Id 추가, ASGI)"""
+
+    def __init__(self, app, exclude=("/metrics", "/health", "/ready")):
+        self.app = app
+        self.exclude = exclude
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in self.exclude:
+            await self.app(scope, receive, send)
+            return
+
+        traceparent = None
+        for name, value in scope.get("headers", ()):
+            if name == b"traceparent":
+                traceparent = value.decode("latin-1")
+                break
+
+        with span("http", traceparent=traceparent, method=scope["method"], path=scope["path"]) as root:
+            async def send_wrapper(message):
+                if message["type"] == "http.response.start":
+                    root.set(status_code=message["status"])
+                    if message["status"] >= 500:
+                        root.status = "error"
+                    message["headers"] = list(message.get("headers", [])) + [(b"x-trace-id", root.trace_id.encode())]
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                route = scope.get("route")
+                if route is not None:
+                    root.name = f"{scope['method']} {route.path}"
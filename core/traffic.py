@@ -0,0 +1,194 @@
+# core/traffic.py
+
+import hashlib
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import re
+import secrets
+import time
+from functools import lru_cache
+from typing import Dict, Optional
+
+from core.config import config
+
+# 실제 트래픽 재생용 요청 기록 (bench/replay.py)
+# 게임(game_id) 단위로 샘플링하고, game_id는 프로세스별 salt로 해시, 사용자 입력 텍스트는 길이만 남깁니다.
+# 한 줄 형식: {"g": 게임 키, "t": 시작 시각(ms), "p": 라우트, "m": 메서드, "s": 상태 코드, "d": 소요(ms), "b": 요청 요약}
+
+_GAME_ID_PATTERN = re.compile(rb'"game_id"\s*:\s*"([^"]+)"')
+
+# 요청 본문에서 그대로 남길 필드 (나머지 문자열은 길이만 기록)
+_KEEP_FIELDS = {"genre", "stage", "stageNumber", "size", "n"}
+
+
+def _anonymize_body(body: Dict) -> Dict:
+    summary = {}
+    for key, value in body.items():
+        if key in ("game_id", "gameId"):
+            continue
+        if key in _KEEP_FIELDS:
+            summary[key] = value
+        elif isinstance(value, str):
+            summary[f"{key}_len"] = len(value)
+        elif isinstance(value, list):
+            summary[f"{key}_count"] = len(value)
+    return summary
+
+
+class TrafficRecorder:
+    """기록은 큐에 넣기만 하고 파일 쓰기는 QueueListener 스레드에서 처리"""
+
+    def __init__(
+        self,
+        path: str = config.TRAFFIC_RECORD_FILE,
+        sample_rate: float = config.TRAFFIC_RECORD_SAMPLE_RATE,
+        max_bytes: int = config.TRAFFIC_RECORD_MAX_BYTES,
+    ):
+        self.path = path
+        self.sample_rate = sample_rate
+        self.max_bytes = max_bytes
+        self._salt = (config.TRAFFIC_RECORD_SALT or secrets.token_hex(16)).encode("utf-8")
+        self._logger = logging.getLogger("nati.traffic_recording")
+        self._handler: Optional[logging.Handler] = None
+        self._listener: Optional[logging.handlers.QueueListener] = None
+        self.recorded = 0
+        self.skipped = 0
+
+    def start(self) -> None:
+        if self._listener is not None:
+            return
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        file_handler = logging.handlers.RotatingFileHandler(
+            self.path, maxBytes=self.max_bytes, backupCount=5, encoding="utf-8"
+        )
+        file_handler.setFormatter(logging.Formatter("%(message)s"))
+        records: queue.Queue = queue.Queue(maxsize=config.LOG_QUEUE_MAX)
+        self._handler = logging.handlers.QueueHandler(records)
+        self._logger.addHandler(self._handler)
+        self._logger.setLevel(logging.INFO)
+        self._logger.propagate = False
+        self._listener = logging.handlers.QueueListener(records, file_handler)
+        self._listener.start()
+
+    def stop(self) -> None:
+        if self._listener is None:
+            return
+        self._listener.stop()
+        for handler in self._listener.handlers:
+            handler.close()
+        self._logger.removeHandler(self._handler)
+        self._listener = None
+        self._handler = None
+
+    def game_key(self, game_id: str) -> str:
+        return hashlib.sha256(self._salt + game_id.encode("utf-8")).hexdigest()[:16]
+
+    def sampled(self, game_key: str) -> bool:
+        # 게임 키 기준으로 결정하므로 한 게임의 요청은 모두 기록되거나 모두 빠짐
+        return int(game_key[:8], 16) / 0xFFFFFFFF < self.sample_rate
+
+    def record(self, game_id: str, started: float, route: str, method: str, status: int, duration: float, body: Dict) -> None:
+        if self._handler is None:
+            return
+        key = self.game_key(game_id)
+        if not self.sampled(key):
+            self.skipped += 1
+            return
+        line = json.dumps({
+            "g": key,
+            "t": int(started * 1000),
+            "p": route,
+            "m": method,
+            "s": status,
+            "d": round(duration * 1000, 1),
+            "b": _anonymize_body(body),
+        }, ensure_ascii=False, separators=(",", ":"))
+        try:
+            self._handler.queue.put_nowait(logging.makeLogRecord({"msg": line, "levelno": logging.INFO}))
+            self.recorded += 1
+        except queue.Full:
+            self.skipped += 1
+
+    def stats(self) -> Dict[str, int]:
+        return {"recorded": self.recorded, "skipped": self.skipped}
+
+
+@lru_cache()
+def get_traffic_recorder() -> TrafficRecorder:
+    """프로세스 공용 TrafficRecorder"""
+    return TrafficRecorder()
+
+
+class TrafficRecordingMiddleware:
+    """/api/ 요청을 게임 단위로 기록 (ASGI)
+
+    game_id는 요청 본문에서 읽고, 새 게임(/start)은 응답 본문에서 발급된 game_id를 찾습니다.
+    """
+
+    def __init__(self, app, recorder: TrafficRecorder, prefix: str = "/api/", max_capture: int = 64 * 1024):
+        self.app = app
+        self.recorder = recorder
+        self.prefix = prefix
+        self.max_capture = max_capture
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not scope["path"].startswith(self.prefix):
+            await self.app(scope, receive, send)
+            return
+
+        started_wall = time.time()
+        started = time.perf_counter()
+        request_body = bytearray()
+        response_head = bytearray()
+        status = {"code": 500}
+
+        async def receive_wrapper():
+            message = await receive()
+            if message["type"] == "http.request" and len(request_body) < self.max_capture:
+                request_body.extend(message.get("body", b""))
+            return message
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            elif (
+                message["type"] == "http.response.body"
+                and len(response_head) < self.max_capture
+                and b'"game_id"' not in request_body
+                and b'"gameId"' not in request_body
+            ):
+                # 요청에 game_id가 없을 때(새 게임)만 응답 앞부분 보관
+                response_head.extend(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive_wrapper, send_wrapper)
+        finally:
+            self._record(scope, started_wall, time.perf_counter() - started, status["code"], request_body, response_head)
+
+    def _record(self, scope, started_wall: float, duration: float, status: int, request_body: bytes, response_head: bytes) -> None:
+        try:
+            body = json.loads(request_body) if request_body else {}
+        except ValueError:
+            body = {}
+        if not isinstance(body, dict):
+            body = {}
+
+        game_id = body.get("game_id") or body.get("gameId")
+        if not game_id:
+            # 새 게임: JSON 응답 또는 SSE done 이벤트에 담긴 game_id
+            match = _GAME_ID_PATTERN.search(bytes(response_head))
+            game_id = match.group(1).decode("utf-8") if match else None
+        if not game_id:
+            return
+
+        route = scope.get("route")
+        self.recorder.record(
+            str(game_id), started_wall, getattr(route, "path", scope["path"]),
+            scope["method"], status, duration, body
+        )
@@ -1,14 +1,95 @@
 # main.py
 
+import time
+
+# main import 시간 측정 시작 (nati_startup_duration_seconds{phase="import"})
+_IMPORT_STARTED = time.perf_counter()
+
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Security, HTTPException
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.security.api_key import APIKeyHeader
 from starlette.status import HTTP_403_FORBIDDEN
 from api.routes import image, story
 from fastapi.middleware.cors import CORSMiddleware
 from core.config import config
+from api.routes.story import get_singleton_container
+from core.log import logging_stats, setup_logging, shutdown_logging
+from core.metrics import STARTUP_SECONDS, MetricsMiddleware, registry, render_metrics
+from core.outbound import get_outbound_scheduler
+from core.singleflight import singleflight_stats
+from core.tracing import TracingMiddleware
+from core.traffic import TrafficRecordingMiddleware, get_traffic_recorder
+from models.image_generator import close_image_clients
+from models.image_store import get_image_store
+from models.prompt_summarizer import summary_cache
+from service.image_jobs import get_image_job_queue
+from service.warmup import get_warmup
+from templates.story_templates import template_stats
+
+
+def _register_metric_collectors(container) -> None:
+    """컴포넌트별 stats()를 /metrics 스크랩 시점에 게이지로 내보냄"""
+    registry.register_collector("backend_http", container.s3_manager.stats)
+    registry.register_collector("prompt_catalog", container.prompt_catalog.stats)
+    registry.register_collector("session_backend", container.session_backend.stats)
+    registry.register_collector("templates", template_stats)
+    registry.register_collector("summary_cache", summary_cache.stats)
+    registry.register_collector("outbound", get_outbound_scheduler().stats)
+    registry.register_collector("singleflight", singleflight_stats)
+    registry.register_collector("image_store", get_image_store().stats)
+    registry.register_collector("image_jobs", get_image_job_queue().stats)
+    registry.register_collector("logging", logging_stats)
+    registry.register_collector("warmup", get_warmup().stats)
+    if config.TRAFFIC_RECORD_ENABLED:
+        registry.register_collector("traffic_recording", get_traffic_recorder().stats)
+
+
+def _register_story_collectors(container) -> None:
+    generator = container.story_generator
+    registry.register_collector("npc_service", container.story_service.npc_service.stats)
+    registry.register_collector("speculation", generator.speculator.stats)
+    registry.register_collector("rolling_summary", generator.summary_memory.stats)
+    registry.register_collector("token_budget", generator.token_budget.stats)
+
+
+async def _warm_up(container) -> None:
+    warmup = get_warmup()
+    await warmup.run(container)  # 스토리 파이프라인 로드가 성공해야 반환
+    _register_story_collectors(container)
+
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 시작: 로그 리스너, 백엔드 커넥션 풀 생성, 프롬프트 카탈로그 동기화, 이미지 작업 워커 시작
+    # 스토리 파이프라인 로드, 템플릿/커넥션 워밍업은 /health 응답을 막지 않도록 백그라운드에서 (끝나면 /ready 200)
+    started = time.perf_counter()
+    setup_logging()
+    if config.TRAFFIC_RECORD_ENABLED:
+        get_traffic_recorder().start()
+    container = get_singleton_container()
+    await container.s3_manager.start()
+    container.prompt_catalog.start()
+    get_image_job_queue().start()
+    _register_metric_collectors(container)
+    warmup = asyncio.create_task(_warm_up(container))
+    STARTUP_SECONDS.set(time.perf_counter() - started, phase="lifespan")
+    yield
+    # 종료: 커넥션 풀 및 세션 저장소 정리
+    warmup.cancel()
+    await asyncio.gather(warmup, return_exceptions=True)
+    await get_image_job_queue().stop()
+    await container.prompt_catalog.stop()
+    await container.s3_manager.close()
+    await close_image_clients()
+    await container.session_backend.close()
+    if config.TRAFFIC_RECORD_ENABLED:
+        get_traffic_recorder().stop()
+    shutdown_logging()
 
-app = FastAPI()
+
+app = FastAPI(lifespan=lifespan)
 
 # 릴리스 버전관리
 __version__ = "0.0.2"
@@ -32,6 +113,16 @@ async def get_api_key(api_key_header: str = Security(api_key_header)):
         detail="Could not validate credentials"
     )
 
+# 요청 지연/동시 처리 수 측정
+app.add_middleware(MetricsMiddleware)
+
+# 요청별 트레이스 (루트 스팬, X-Trace-Id 응답 헤더)
+app.add_middleware(TracingMiddleware)
+
+# 재생용 트래픽 기록 (게임 단위 익명화 JSONL)
+if config.TRAFFIC_RECORD_ENABLED:
+    app.add_middleware(TrafficRecordingMiddleware, recorder=get_traffic_recorder())
+
 # CORS 설정
 app.add_middleware(
     CORSMiddleware,
@@ -46,6 +137,17 @@ app.add_middleware(
 async def health_check():
     return {"message": "OK"}
 
+# 워밍업이 끝난 인스턴스만 트래픽을 받도록 하는 readiness 프로브 (/health는 liveness)
+@app.get("/ready", include_in_schema=False)
+async def readiness_check():
+    warmup = get_warmup()
+    return JSONResponse(warmup.status(), status_code=200 if warmup.ready.is_set() else 503)
+
+# Prometheus 스크랩 엔드포인트 (/health와 같이 인증 없음)
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
 # API 키 인증을 라우터에 적용
 def get_authenticated_router(router):
     for route in router.routes:
@@ -68,6 +170,9 @@ app.include_router(
 
 
 
+STARTUP_SECONDS.set(time.perf_counter() - _IMPORT_STARTED, phase="import")
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -1,28 +1,42 @@
 import os
-import openai
+import asyncio
+import time
+import aiohttp
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import AsyncIterator, Optional
 from dotenv import load_dotenv
-import replicate
+from core.config import config
+from core.metrics import IMAGE_DOWNLOAD_SECONDS, IMAGE_IN_FLIGHT, IMAGE_RENDER_SECONDS
+from core.outbound import REPLICATE, Priority, get_outbound_scheduler
 
 
 # 환경 변수 로드
 load_dotenv()
 
-# Replicate API 클라이언트 초기화
-replicate_client = replicate.Client(api_token=os.getenv("REPLICATE_API_KEY"))
+# Replicate 클라이언트는 첫 이미지 요청에서 생성 (replicate 패키지 import를 기동 경로에서 제외)
+_replicate_client = None
 
+# async_run을 지원하지 않는 클라이언트용 전용 스레드 풀 (이벤트 루프 블로킹 방지)
+_replicate_executor: Optional[ThreadPoolExecutor] = None
 
-def generate_image_with_api(prompt: str, size: str = "9:16") -> str:
+# 이미지 다운로드용 공유 세션
+_http_session: Optional[aiohttp.ClientSession] = None
+
+
+async def generate_image_with_api(prompt: str, size: str = "9:16") -> str:
 
     try:
-        output = replicate_client.run(
-            "luma/photon-flash",
-            input={
-                "prompt": prompt,
-                "aspect_ratio": size,
-                "image_reference_weight": 0.85,
-                "style_reference_weight": 0.85
-                
-            }
+        model_input = {
+            "prompt": prompt,
+            "aspect_ratio": size,
+            "image_reference_weight": 0.85,
+            "style_reference_weight": 0.85
+            
+        }
+
+        output = await get_outbound_scheduler().run(
+            REPLICATE, Priority.IMAGE, lambda: _run_replicate(model_input)
         )
 
         #print("Output:", output)  # 출력
@@ -31,3 +45,104 @@ def generate_image_with_api(prompt: str, size: str = "9:16") -> str:
     except Exception as e:
         raise RuntimeError(f"OpenAI API 호출 중 오류 발생: {e}")
 
+
+async def _run_replicate(model_input: dict):
+    """Replicate 호출 (스케줄러 대기 시간을 제외한 생성 시간 기록)"""
+    IMAGE_IN_FLIGHT.inc()
+    started = time.perf_counter()
+    status = "error"
+    try:
+        replicate_client = _get_replicate_client()
+        if hasattr(replicate_client, "async_run"):
+            output = await replicate_client.async_run("luma/photon-flash", input=model_input)
+        else:
+            loop = asyncio.get_running_loop()
+            output = await loop.run_in_executor(
+                _get_replicate_executor(),
+                partial(replicate_client.run, "luma/photon-flash", input=model_input)
+            )
+        status = "ok"
+        return output
+    finally:
+        IMAGE_IN_FLIGHT.dec()
+        IMAGE_RENDER_SECONDS.observe(time.perf_counter() - started, status=status)
+
+
+def _get_replicate_client():
+    global _replicate_client
+    if _replicate_client is None:
+        import replicate
+
+        _replicate_client = replicate.Client(api_token=os.getenv("REPLICATE_API_KEY"))
+    return _replicate_client
+
+
+def _get_replicate_executor() -> ThreadPoolExecutor:
+    global _replicate_executor
+    if _replicate_executor is None:
+        _replicate_executor = ThreadPoolExecutor(
+            max_workers=config.IMAGE_EXECUTOR_WORKERS,
+            thread_name_prefix="replicate"
+        )
+    return _replicate_executor
+
+
+async def get_http_session() -> aiohttp.ClientSession:
+    """이미지 다운로드용 공유 ClientSession (keep-alive 재사용)"""
+    global _http_session
+    if _http_session is None or _http_session.closed:
+        _http_session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(
+                limit=config.IMAGE_HTTP_LIMIT,
+                ttl_dns_cache=config.BACKEND_HTTP_DNS_TTL_SECONDS,
+            ),
+            timeout=aiohttp.ClientTimeout(total=config.IMAGE_DOWNLOAD_TIMEOUT_SECONDS),
+        )
+    return _http_session
+
+
+class UpstreamImage:
+    """업스트림 이미지 응답을 청크 단위로 전달 (요청당 메모리는 청크 크기로 제한)"""
+
+    def __init__(self, response: aiohttp.ClientResponse, started: Optional[float] = None):
+        self.response = response
+        self.media_type = response.headers.get("Content-Type", "image/jpeg").split(";")[0].strip()
+        self.content_length: Optional[int] = response.content_length
+        self.started = started if started is not None else time.perf_counter()
+
+    async def iter_chunks(self, chunk_size: int = config.IMAGE_STREAM_CHUNK_BYTES) -> AsyncIterator[bytes]:
+        # 요청 시작부터 마지막 청크까지 (중간에 끊기면 status="aborted")
+        status = "aborted"
+        try:
+            async for chunk in self.response.content.iter_chunked(chunk_size):
+                yield chunk
+            status = "ok"
+        finally:
+            IMAGE_DOWNLOAD_SECONDS.observe(time.perf_counter() - self.started, status=status)
+            self.close()
+
+    def close(self) -> None:
+        self.response.release()
+
+
+async def open_image_stream(image_url: str) -> UpstreamImage:
+    """생성된 이미지 응답 헤더까지만 받고 본문은 스트리밍으로 읽도록 반환"""
+    session = await get_http_session()
+    started = time.perf_counter()
+    response = await session.get(image_url)
+    if response.status != 200:
+        response.release()
+        IMAGE_DOWNLOAD_SECONDS.observe(time.perf_counter() - started, status=str(response.status))
+        raise RuntimeError(f"이미지 다운로드에 실패했습니다. (status: {response.status})")
+    return UpstreamImage(response, started)
+
+
+async def close_image_clients() -> None:
+    """lifespan 종료 시 다운로드 세션과 스레드 풀 정리"""
+    global _http_session, _replicate_executor
+    if _http_session is not None and not _http_session.closed:
+        await _http_session.close()
+    _http_session = None
+    if _replicate_executor is not None:
+        _replicate_executor.shutdown(wait=False)
+        _replicate_executor = None
@@ -0,0 +1,307 @@
+# models/image_store.py
+
+import asyncio
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional
+
+from core.config import config
+from core.log import get_logger
+
+log = get_logger("image_store")
+
+_EXTENSIONS = {
+    "image/jpeg": ".jpg",
+    "image/png": ".png",
+    "image/webp": ".webp",
+    "image/gif": ".gif",
+}
+
+
+@dataclass
+class StoredImage:
+    path: str
+    digest: str
+    media_type: str
+    size: int
+
+
+def game_alias(game_id, stage_number, variant: int = 0) -> str:
+    """(gameId, stageNumber) 기준 별칭 (n > 1이면 두 번째 이미지부터 variant 구분)"""
+    alias = f"game:{game_id}:{stage_number}"
+    return f"{alias}:{variant}" if variant else alias
+
+
+def prompt_alias(summarized_prompt: str, size: str, variant: int = 0) -> str:
+    """요약 프롬프트 + 비율 기준 별칭"""
+    digest = hashlib.sha256(f"{size}|{summarized_prompt}".encode("utf-8")).hexdigest()
+    return f"prompt:{digest}:{variant}" if variant else f"prompt:{digest}"
+
+
+class ImageWriter:
+    """스트리밍 중인 이미지를 임시 파일에 기록하고, 끝나면 저장소에 원자적으로 등록
+
+    청크는 flush_bytes만큼 모아 스레드에서 기록하므로 임시 파일 생성과 디스크 쓰기가 이벤트 루프를 막지 않습니다.
+    """
+
+    def __init__(self, store: "ImageStore", media_type: str, flush_bytes: int = config.IMAGE_STORE_WRITE_BUFFER_BYTES):
+        self.store = store
+        self.media_type = media_type
+        self.flush_bytes = flush_bytes
+        self._hash = hashlib.sha256()
+        self._size = 0
+        self._buffer: List[bytes] = []
+        self._buffered = 0
+        self._file = None
+        self._tmp_path: Optional[str] = None
+        self.failed = False
+
+    def _write_sync(self, chunks: List[bytes]) -> None:
+        if self._file is None:
+            fd, self._tmp_path = tempfile.mkstemp(dir=self.store.incoming_dir, suffix=".tmp")
+            self._file = os.fdopen(fd, "wb")
+        for chunk in chunks:
+            self._file.write(chunk)
+            self._hash.update(chunk)
+
+    async def _flush(self) -> None:
+        """디스크 쓰기에 실패해도 클라이언트 전송은 계속되도록 저장만 포기"""
+        chunks, self._buffer, self._buffered = self._buffer, [], 0
+        try:
+            await asyncio.to_thread(self._write_sync, chunks)
+        except OSError as e:
+            log.warning("Write failed, skipping cache", error=str(e))
+            self.failed = True
+            await self.abort()
+
+    async def write(self, chunk: bytes) -> None:
+        if self.failed:
+            return
+        self._buffer.append(chunk)
+        self._buffered += len(chunk)
+        self._size += len(chunk)
+        if self._buffered >= self.flush_bytes:
+            await self._flush()
+
+    def _commit_sync(self, aliases: List[str]) -> StoredImage:
+        self._file.close()
+        return self.store._commit_sync(self._tmp_path, self._hash.hexdigest(), self._size, self.media_type, aliases)
+
+    async def commit(self, aliases: Iterable[str] = ()) -> Optional[StoredImage]:
+        if not self.failed and (self._buffer or self._file is None):
+            await self._flush()
+        if self.failed:
+            return None
+        return await asyncio.to_thread(self._commit_sync, list(aliases))
+
+    def _abort_sync(self) -> None:
+        if self._file is not None and not self._file.closed:
+            self._file.close()
+        if self._tmp_path is not None:
+            try:
+                os.remove(self._tmp_path)
+            except OSError:
+                pass
+
+    async def abort(self) -> None:
+        """중간에 끊긴 스트림은 저장하지 않음"""
+        self._buffer, self._buffered = [], 0
+        await asyncio.to_thread(self._abort_sync)
+
+
+class ImageStore:
+    """내용 주소 기반(sha256) 디스크 이미지 저장소
+
+    - blobs/ab/abcdef....jpg : 이미지 본문 (같은 내용은 한 번만 저장)
+    - aliases/<hash>.json   : 별칭(game/stage, 프롬프트) → 본문 digest
+    모든 쓰기는 임시 파일 + os.replace로 원자적으로 처리하며,
+    전체 용량이 max_bytes를 넘으면 가장 오래 사용되지 않은 본문부터 max_bytes × evict_ratio까지 삭제합니다
+    (한계 근처에서 쓰기마다 전체 스캔과 삭제가 반복되지 않도록 여유를 둠).
+    조회/저장 후 evict_grace_seconds가 지나지 않은 본문은 응답 전송 중일 수 있으므로 삭제하지 않습니다.
+    """
+
+    def __init__(
+        self,
+        root: str = config.IMAGE_STORE_DIR,
+        max_bytes: int = config.IMAGE_STORE_MAX_BYTES,
+        evict_ratio: float = config.IMAGE_STORE_EVICT_RATIO,
+        evict_grace_seconds: float = config.IMAGE_STORE_EVICT_GRACE_SECONDS,
+    ):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.evict_target = int(max_bytes * min(max(evict_ratio, 0.0), 1.0))
+        self.evict_grace_seconds = evict_grace_seconds
+        self.blob_dir = os.path.join(root, "blobs")
+        self.alias_dir = os.path.join(root, "aliases")
+        self.incoming_dir = os.path.join(self.blob_dir, "incoming")
+        os.makedirs(self.incoming_dir, exist_ok=True)
+        os.makedirs(self.alias_dir, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._total_bytes = self._scan_total_bytes()
+
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+
+    def _scan_total_bytes(self) -> int:
+        total = 0
+        for path in self._iter_blobs():
+            try:
+                total += os.path.getsize(path)
+            except OSError:
+                pass
+        return total
+
+    def _iter_blobs(self) -> Iterable[str]:
+        for dirpath, _, filenames in os.walk(self.blob_dir):
+            for filename in filenames:
+                if not filename.endswith(".tmp"):
+                    yield os.path.join(dirpath, filename)
+
+    def _blob_path(self, digest: str, media_type: str) -> str:
+        extension = _EXTENSIONS.get(media_type, ".bin")
+        return os.path.join(self.blob_dir, digest[:2], digest + extension)
+
+    def _alias_path(self, alias: str) -> str:
+        return os.path.join(self.alias_dir, hashlib.sha256(alias.encode("utf-8")).hexdigest() + ".json")
+
+    @staticmethod
+    def _atomic_write(path: str, data: bytes) -> None:
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def _lookup_sync(self, aliases: List[str]) -> Optional[StoredImage]:
+        for alias in aliases:
+            alias_path = self._alias_path(alias)
+            try:
+                with open(alias_path, encoding="utf-8") as f:
+                    meta = json.load(f)
+            except (OSError, ValueError):
+                continue
+
+            path = self._blob_path(meta["digest"], meta["media_type"])
+            try:
+                os.utime(path)  # LRU 기준 시각 갱신
+                size = os.path.getsize(path)
+            except OSError:
+                # 본문이 정리된 별칭은 제거
+                try:
+                    os.remove(alias_path)
+                except OSError:
+                    pass
+                continue
+            return StoredImage(path=path, digest=meta["digest"], media_type=meta["media_type"], size=size)
+        return None
+
+    def _link_sync(self, image: StoredImage, aliases: Iterable[str]) -> None:
+        meta = json.dumps({"digest": image.digest, "media_type": image.media_type}).encode("utf-8")
+        for alias in aliases:
+            self._atomic_write(self._alias_path(alias), meta)
+
+    def _put_sync(self, data: bytes, media_type: str, aliases: List[str]) -> StoredImage:
+        fd, tmp_path = tempfile.mkstemp(dir=self.incoming_dir, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        return self._commit_sync(tmp_path, hashlib.sha256(data).hexdigest(), len(data), media_type, aliases)
+
+    def _commit_sync(self, tmp_path: str, digest: str, size: int, media_type: str, aliases: List[str]) -> StoredImage:
+        path = self._blob_path(digest, media_type)
+        if os.path.exists(path):
+            # 같은 내용이 이미 있으면 임시 파일만 정리
+            os.remove(tmp_path)
+            os.utime(path)
+        else:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            os.replace(tmp_path, path)
+            with self._lock:
+                self._total_bytes += size
+            self.writes += 1
+
+        image = StoredImage(path=path, digest=digest, media_type=media_type, size=size)
+        self._link_sync(image, aliases)
+        self._evict_sync(keep=path)
+        return image
+
+    def _evict_sync(self, keep: Optional[str] = None) -> None:
+        with self._lock:
+            if self._total_bytes <= self.max_bytes:
+                return
+            blobs = []
+            for path in self._iter_blobs():
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                blobs.append((stat.st_mtime, stat.st_size, path))
+            # 다른 워커가 쓴 파일도 반영하도록 실제 용량으로 다시 계산
+            self._total_bytes = sum(size for _, size, _ in blobs)
+            if self._total_bytes <= self.max_bytes:
+                return
+            # lookup/commit이 방금 mtime을 갱신한 본문은 전송 중일 수 있으므로 남김 (오래된 순이므로 이후는 모두 최근)
+            cutoff = time.time() - self.evict_grace_seconds
+            for mtime, size, path in sorted(blobs):
+                if self._total_bytes <= self.evict_target or mtime >= cutoff:
+                    break
+                if path == keep:
+                    continue
+                try:
+                    os.remove(path)
+                except OSError:
+                    continue
+                self._total_bytes -= size
+                self.evictions += 1
+
+    async def lookup(self, *aliases: str) -> Optional[StoredImage]:
+        """별칭 중 하나라도 저장되어 있으면 반환"""
+        image = await asyncio.to_thread(self._lookup_sync, list(aliases))
+        if image is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return image
+
+    async def link(self, image: StoredImage, *aliases: str) -> None:
+        """기존 이미지에 별칭 추가"""
+        await asyncio.to_thread(self._link_sync, image, aliases)
+
+    async def put(self, data: bytes, media_type: str, aliases: Iterable[str] = ()) -> StoredImage:
+        """이미지 저장 후 별칭 연결"""
+        return await asyncio.to_thread(self._put_sync, data, media_type, list(aliases))
+
+    def open_writer(self, media_type: str) -> ImageWriter:
+        """응답을 스트리밍하면서 동시에 저장할 때 사용"""
+        return ImageWriter(self, media_type)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "bytes": self._total_bytes,
+            "max_bytes": self.max_bytes,
+            "evict_target_bytes": self.evict_target,
+            "hits": self.hits,
+            "misses": self.misses,
+            "writes": self.writes,
+            "evictions": self.evictions,
+        }
+
+
+@lru_cache()
+def get_image_store() -> ImageStore:
+    """프로세스 공용 ImageStore"""
+    return ImageStore()
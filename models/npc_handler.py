@@ -1,11 +1,12 @@
 # models/npc_handler.py
 
-from langchain.callbacks.base import BaseCallbackHandler
-from langchain.prompts import ChatPromptTemplate
 from langchain_openai import ChatOpenAI
 from langchain.schema.output_parser import StrOutputParser
-from langchain.memory import ConversationBufferWindowMemory
-from templates.story_templates import get_default_npc_template, get_default_advice_template
+from templates.story_templates import get_npc_prompt, get_advice_prompt
+from models.token_budget import get_token_budget
+from core.metrics import observe_llm
+from core.outbound import OPENAI, Priority, get_outbound_scheduler
+from core.tracing import traced
 from typing import Dict, List, Optional
 
 class NPCHandler:
@@ -18,8 +19,21 @@ class NPCHandler:
             max_tokens=300
         )
         self.parser = StrOutputParser()
-        self.memory = ConversationBufferWindowMemory(k=5, return_messages=True)
+        self.token_budget = get_token_budget()
+        self.scheduler = get_outbound_scheduler()
 
+    async def _invoke(self, chain, variables: Dict, site: str) -> str:
+        """NPC 우선순위로 체인 실행 (호출 지연/토큰 수 기록)"""
+        async def call():
+            async with observe_llm(site) as llm:
+                result = await chain.ainvoke(variables)
+                llm.prompt_tokens = self.token_budget.count_variables(variables)
+                llm.completion_tokens = self.token_budget.count(result)
+                return result
+
+        return await self.scheduler.run(OPENAI, Priority.NPC, call)
+
+    @traced("npc_handler.greeting")
     async def generate_greeting(self, story_context: str, choices: List[str] = None) -> str:
         """NPC 초기 인사말 생성"""
         try:
@@ -27,41 +41,48 @@ class NPCHandler:
             if choices:
                 story_context += f"\n선택지: {', '.join(choices)}"
             
-            npc_template = await get_default_npc_template(story_context=story_context)
-            prompt = ChatPromptTemplate.from_template(npc_template)
+            prompt = await get_npc_prompt()
             chain = prompt | self.model | self.parser
 
-            greeting = await chain.ainvoke({
-                "story_context": story_context
-            })
+            greeting = await self._invoke(chain, {"story_context": story_context}, "npc_greeting")
 
             return greeting
         except Exception as e:
             raise Exception(f"Error generating NPC greeting: {str(e)}")
 
-    async def provide_advice(self, story_context: str, choices: List[str]) -> Dict:
-        """NPC 조언 및 생존율 제공"""
+    @traced("npc_handler.advice")
+    async def provide_advice(
+        self,
+        story_context: str,
+        choices: List[str],
+        conversation_history: Optional[List[Dict[str, str]]] = None
+    ) -> Dict:
+        """NPC 조언 및 생존율 제공 (conversation_history: 게임별 NPC 대화 기록)"""
         try:
             # 대화 기록과 선택지 포맷
-            memory_vars = self.memory.load_memory_variables({})
-            conversation_history = memory_vars.get("history", [])
-            conversation_text = "\n".join(str(msg) for msg in conversation_history)
+            conversation_text = "\n".join(
+                f"{turn['input']}\n{turn['output']}" for turn in (conversation_history or [])
+            )
             formatted_choices = "\n".join([f"선택지 {i+1}: {choice}" for i, choice in enumerate(choices)])
 
-            # 매개변수를 전달하여 Advice 템플릿 생성
-            advice_template = await get_default_advice_template(
-                story_context=story_context,
-                conversation_history=conversation_text,
-                choices=formatted_choices
+            # 토큰 예산: 현재 스토리 > 이전 NPC 대화(최근 내용 우선)
+            fitted = self.token_budget.fit(
+                "npc_advice",
+                [("story_context", story_context, "head"), ("conversation_history", conversation_text, "tail")],
+                reserved=[formatted_choices]
             )
-            prompt = ChatPromptTemplate.from_template(advice_template)
+            story_context = fitted["story_context"]
+            conversation_text = fitted["conversation_history"]
+
+            # 캐시된 Advice 프롬프트에 매개변수 전달
+            prompt = await get_advice_prompt()
             chain = prompt | self.model | self.parser
 
-            response = await chain.ainvoke({
+            response = await self._invoke(chain, {
                 "story_context": story_context,
                 "conversation_history": conversation_text,
                 "choices": formatted_choices
-            })
+            }, "npc_advice")
 
             response_data = {}
             lines = response.strip().split("\n")
@@ -83,15 +104,11 @@ class NPCHandler:
                         "survival_rate": survival_rate
                     }
 
-            # 대화 메모리에 저장
-            self.memory.save_context(
-                {"input": formatted_choices},
-                {"output": response}
-            )
-
+            # 대화 기록은 호출 측에서 게임 세션에 저장
             return {
                 "response": response_data,
-                "additional_comment": additional_comment
+                "additional_comment": additional_comment,
+                "memory": {"input": formatted_choices, "output": response}
             }
 
         except Exception as e:
@@ -0,0 +1,179 @@
+# models/prompt_catalog.py
+
+import asyncio
+import random
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, Dict, List, Optional
+
+from core.config import config
+from core.log import get_logger
+
+log = get_logger("prompt_catalog")
+
+
+@dataclass
+class CatalogPrompt:
+    file_name: str
+    content: str
+    weight: float = 1.0
+
+
+class PromptCatalog:
+    """백엔드 프롬프트 목록의 로컬 사본
+
+    백그라운드에서 장르별 프롬프트를 주기적으로(변경분 위주로) 동기화하고,
+    /start에서는 네트워크 없이 가중치 기반으로 샘플링합니다.
+    최근에 나온 프롬프트는 가능한 한 다시 뽑지 않습니다.
+    """
+
+    def __init__(
+        self,
+        s3_manager,
+        genres: Optional[List[str]] = None,
+        sync_interval: float = config.PROMPT_CATALOG_SYNC_SECONDS,
+        full_sync_interval: float = config.PROMPT_CATALOG_FULL_SYNC_SECONDS,
+        recent_size: int = config.PROMPT_CATALOG_RECENT,
+    ):
+        self.s3_manager = s3_manager
+        self.genres = genres if genres is not None else config.PROMPT_CATALOG_GENRES
+        self.sync_interval = sync_interval
+        self.full_sync_interval = full_sync_interval
+        self.recent_size = recent_size
+
+        self._prompts: Dict[str, Dict[str, CatalogPrompt]] = {}
+        self._cursors: Dict[str, Optional[str]] = {}
+        self._full_synced_at: Dict[str, float] = {}
+        self._recent: Dict[str, Deque[str]] = {}
+        self._attempted_at: Dict[str, float] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._task: Optional[asyncio.Task] = None
+
+        self.local_hits = 0
+        self.remote_fallbacks = 0
+        self.syncs = 0
+        self.sync_errors = 0
+
+    def _lock(self, genre: str) -> asyncio.Lock:
+        if genre not in self._locks:
+            self._locks[genre] = asyncio.Lock()
+        return self._locks[genre]
+
+    async def sync(self, genre: str, full: bool = False) -> int:
+        """장르 하나 동기화 (full이 아니면 마지막 커서 이후 변경분만)"""
+        async with self._lock(genre):
+            now = time.monotonic()
+            full = (
+                full
+                or genre not in self._prompts
+                or now - self._full_synced_at.get(genre, 0) > self.full_sync_interval
+            )
+            since = None if full else self._cursors.get(genre)
+
+            data = await self.s3_manager.get_prompts(genre, since=since)
+            self.syncs += 1
+
+            prompts = {} if full else dict(self._prompts.get(genre, {}))
+            for item in data["prompts"]:
+                file_name = item.get("file_name") or item.get("fileName")
+                if not file_name:
+                    continue
+                if item.get("deleted"):
+                    prompts.pop(file_name, None)
+                    continue
+                prompts[file_name] = CatalogPrompt(
+                    file_name=file_name,
+                    content=item.get("content", ""),
+                    weight=max(float(item.get("weight", 1.0) or 0), 0.0)
+                )
+            for file_name in data["deleted"]:
+                prompts.pop(file_name, None)
+
+            self._prompts[genre] = prompts
+            if data.get("cursor"):
+                self._cursors[genre] = data["cursor"]
+            if full:
+                self._full_synced_at[genre] = now
+            return len(prompts)
+
+    async def sync_all(self) -> None:
+        """설정된 모든 장르 동기화 (실패한 장르는 기존 사본 유지)"""
+        results = await asyncio.gather(
+            *(self.sync(genre) for genre in self.genres),
+            return_exceptions=True
+        )
+        for genre, result in zip(self.genres, results):
+            if isinstance(result, Exception):
+                self.sync_errors += 1
+                log.warning("Failed to sync prompt catalog", genre=genre, error=str(result))
+
+    async def _run(self) -> None:
+        while True:
+            await self.sync_all()
+            await asyncio.sleep(self.sync_interval)
+
+    def start(self) -> None:
+        """백그라운드 주기 동기화 시작"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def sample(self, genre: str) -> Optional[dict]:
+        """가중치 기반 로컬 샘플링 (최근에 나온 프롬프트 제외)"""
+        prompts = self._prompts.get(genre)
+        if not prompts:
+            return None
+
+        eligible = [p for p in prompts.values() if p.weight > 0] or list(prompts.values())
+        recent = self._recent.setdefault(genre, deque(maxlen=self.recent_size))
+        candidates = [p for p in eligible if p.file_name not in recent] or eligible
+
+        weights = [p.weight for p in candidates]
+        chosen = random.choices(candidates, weights=weights if sum(weights) > 0 else None)[0]
+
+        # 항상 후보가 남도록 최근 목록 길이를 선택 가능한 프롬프트 수보다 작게 유지
+        recent.append(chosen.file_name)
+        while len(recent) >= len(eligible) and recent:
+            recent.popleft()
+
+        return {"file_name": chosen.file_name, "content": chosen.content}
+
+    async def get_prompt(self, genre: str) -> dict:
+        """로컬 사본에서 프롬프트 선택 (사본이 없으면 동기화 후 원격 랜덤 API로 대체)"""
+        prompt = self.sample(genre)
+        now = time.monotonic()
+        if prompt is None and now - self._attempted_at.get(genre, -self.sync_interval) >= self.sync_interval:
+            # 백엔드 장애 시 매 요청마다 재시도하지 않도록 sync_interval 간격으로만 시도
+            self._attempted_at[genre] = now
+            try:
+                await self.sync(genre)
+            except Exception as e:
+                self.sync_errors += 1
+                log.warning("On-demand prompt catalog sync failed", genre=genre, error=str(e))
+            prompt = self.sample(genre)
+
+        if prompt is not None:
+            self.local_hits += 1
+            return prompt
+
+        self.remote_fallbacks += 1
+        return await self.s3_manager.get_random_prompt(genre)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "genres": len(self._prompts),
+            "prompts": sum(len(prompts) for prompts in self._prompts.values()),
+            "local_hits": self.local_hits,
+            "remote_fallbacks": self.remote_fallbacks,
+            "syncs": self.syncs,
+            "sync_errors": self.sync_errors,
+        }
@@ -1,18 +1,151 @@
 # models/prompt_summarizer.py
 
-import openai
+import asyncio
+import json
 import os
+from typing import Dict, List, Optional, Tuple
 from dotenv import load_dotenv
+from core.log import get_logger
+from core.metrics import observe_llm
+from core.outbound import OPENAI, Priority, get_outbound_scheduler
+from core.singleflight import SingleFlight
+from models.summary_cache import SummaryCache, make_cache_key
 
 
 # 환경 변수 로드
 load_dotenv()
 
-# OpenAI API 키 설정
-openai.api_key = os.getenv("OPENAI_KEY")
+# 비동기 클라이언트 (이벤트 루프를 막지 않도록 AsyncOpenAI 사용, 첫 요약 요청에서 생성)
+_client = None
+
+# 요약 결과 캐시 (재시도/새로고침으로 같은 프롬프트가 다시 들어오는 경우 LLM 호출 생략)
+summary_cache = SummaryCache()
+
+SUMMARY_INSTRUCTION = (
+    "Summarize and translate the following prompt into English. "
+    "Focus on key visual elements, settings, objects, and colors."
+    "Avoid unnecessary descriptive language."
+)
+
+# 캐시에 아직 없는 같은 프롬프트가 동시에 들어오면 LLM 호출 하나만 실행
+_summary_flight = SingleFlight("prompt_summary")
+
+log = get_logger("prompt_summarizer")
+
+
+def _get_client():
+    global _client
+    if _client is None:
+        import openai
+
+        _client = openai.AsyncOpenAI(api_key=os.getenv("OPENAI_KEY"))
+    return _client
 
 
 async def summarize_prompt(prompt: str, genre: str = None) -> str:
+    """
+    캐시를 거쳐 프롬프트 요약 (정규화된 프롬프트 해시 + 장르 기준)
+    :param prompt: 원본 프롬프트
+    :param genre: 장르
+    :return: 요약된 프롬프트
+    """
+    cache_key = make_cache_key(prompt, genre)
+    cached = await summary_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    async def summarize_and_cache() -> str:
+        summarized = await _summarize_prompt(prompt, genre)
+        await summary_cache.set(cache_key, summarized)
+        return summarized
+
+    return await _summary_flight.do(cache_key, summarize_and_cache)
+
+
+async def summarize_prompts(items: List[Tuple[str, Optional[str]]]) -> List[str]:
+    """
+    여러 프롬프트를 한 번의 LLM 호출로 요약 (캐시 적중분은 제외)
+    배치 응답을 해석할 수 없으면 프롬프트별 요약으로 대체합니다.
+    :param items: (원본 프롬프트, 장르) 목록
+    :return: 입력 순서대로 요약된 프롬프트
+    """
+    keys = [make_cache_key(prompt, genre) for prompt, genre in items]
+    results: Dict[str, str] = {}
+    missing: Dict[str, Tuple[str, Optional[str]]] = {}
+    for key, item in zip(keys, items):
+        if key in results or key in missing:
+            continue
+        cached = await summary_cache.get(key)
+        if cached is not None:
+            results[key] = cached
+        else:
+            missing[key] = item
+
+    if len(missing) == 1:
+        (key, (prompt, genre)), = missing.items()
+        results[key] = await summarize_prompt(prompt, genre)
+    elif missing:
+        try:
+            summaries = await _summarize_batch([prompt for prompt, _ in missing.values()])
+            for (key, (_, genre)), summarized in zip(missing.items(), summaries):
+                results[key] = apply_genre_style(summarized, genre)
+                await summary_cache.set(key, results[key])
+        except Exception as e:
+            log.warning("Batch summary failed, falling back to single calls", prompts=len(missing), error=str(e))
+            summaries = await asyncio.gather(
+                *(summarize_prompt(prompt, genre) for prompt, genre in missing.values())
+            )
+            results.update(zip(missing.keys(), summaries))
+
+    return [results[key] for key in keys]
+
+
+async def _create_completion(messages: List[Dict], max_tokens: int):
+    """이미지 우선순위로 요약 호출 (호출 지연/토큰 사용량 기록)"""
+    async def call():
+        async with observe_llm("image_prompt") as llm:
+            response = await _get_client().chat.completions.create(
+                model="gpt-4o-mini",
+                messages=messages,
+                max_tokens=max_tokens,
+                temperature=0.5
+            )
+            if response.usage is not None:
+                llm.prompt_tokens = response.usage.prompt_tokens
+                llm.completion_tokens = response.usage.completion_tokens
+            return response
+
+    return await get_outbound_scheduler().run(OPENAI, Priority.IMAGE, call)
+
+
+async def _summarize_batch(prompts: List[str]) -> List[str]:
+    """JSON 배열로 여러 프롬프트를 한 번에 요약 (개수가 맞지 않으면 ValueError)"""
+    response = await _create_completion(
+        messages=[
+            {"role": "system", "content": (
+                SUMMARY_INSTRUCTION + " "
+                "You will receive a JSON array of prompts. Reply with only a JSON array of strings "
+                "containing one summary per prompt, in the same order."
+            )},
+            {"role": "user", "content": json.dumps(prompts, ensure_ascii=False)}
+        ],
+        max_tokens=60 * len(prompts),
+    )
+
+    content = response.choices[0].message.content.strip()
+    if content.startswith("```"):
+        content = content.strip("`").removeprefix("json").strip()
+    summaries = json.loads(content)
+    if (
+        not isinstance(summaries, list)
+        or len(summaries) != len(prompts)
+        or not all(isinstance(summary, str) and summary.strip() for summary in summaries)
+    ):
+        raise ValueError(f"Expected {len(prompts)} summaries, got: {content[:200]}")
+    return [summary.strip() for summary in summaries]
+
+
+async def _summarize_prompt(prompt: str, genre: str = None) -> str:
     """
     GPT를 사용하여 프롬프트 요약
     :param prompt: 원본 프롬프트
@@ -21,44 +154,43 @@ async def summarize_prompt(prompt: str, genre: str = None) -> str:
     """
     try:
         # 먼저 원본 프롬프트를 요약
-        response = openai.chat.completions.create(
-            model="gpt-4o-mini",
+        response = await _create_completion(
             messages=[
-                {"role": "system", "content": (
-                    "Summarize and translate the following prompt into English. "
-                    "Focus on key visual elements, settings, objects, and colors."
-                    "Avoid unnecessary descriptive language."
-                )},
+                {"role": "system", "content": SUMMARY_INSTRUCTION},
                 {"role": "user", "content": prompt}  # 원본 프롬프트를 요약
-            ],            
+            ],
             max_tokens=50,
-            temperature=0.5
         )
 
         # 요약된 프롬프트
         summarized_prompt = response.choices[0].message.content
 
-        # 뒤에 고정으로 나오는 프롬프트
-        style = ", cinematic photograph, explosive action, high contrast, dynamic lightning."
-        style_Romance =", Japanese Anime style. webtoon photograph"
-        
-        # genre에 따라 사전 정의된 프롬프트 설정
-        if genre == "Survival":
-            newPrompt = "very depressed atmosphere " + summarized_prompt + style
-        elif genre == "좀비":
-            newPrompt = "Post-apocalyptic scene with abandoned streets and hordes of zombies." + summarized_prompt + style
-        elif genre == "외계인":
-            newPrompt = "Surreal dreamscape with floating islands and impossible architecture. " + summarized_prompt + style
-        elif genre == "Romance":
-            newPrompt = (
-                "male and female love. both adults, " + summarized_prompt + style_Romance
-            )
-        else:
-            # 장르가 정의되지 않으면 원본 프롬프트 그대로 사용
-            newPrompt = summarized_prompt + " "
-
-        # 최종적으로 새로운 프롬프트 반환
-        return newPrompt
+        return apply_genre_style(summarized_prompt, genre)
     
     except Exception as e:
         raise RuntimeError(f"Error summarizing prompt: {str(e)}")
+
+
+def apply_genre_style(summarized_prompt: str, genre: str = None) -> str:
+    """요약된 프롬프트에 장르별 고정 문구를 덧붙임"""
+    # 뒤에 고정으로 나오는 프롬프트
+    style = ", cinematic photograph, explosive action, high contrast, dynamic lightning."
+    style_Romance =", Japanese Anime style. webtoon photograph"
+
+    # genre에 따라 사전 정의된 프롬프트 설정
+    if genre == "Survival":
+        newPrompt = "very depressed atmosphere " + summarized_prompt + style
+    elif genre == "좀비":
+        newPrompt = "Post-apocalyptic scene with abandoned streets and hordes of zombies." + summarized_prompt + style
+    elif genre == "외계인":
+        newPrompt = "Surreal dreamscape with floating islands and impossible architecture. " + summarized_prompt + style
+    elif genre == "Romance":
+        newPrompt = (
+            "male and female love. both adults, " + summarized_prompt + style_Romance
+        )
+    else:
+        # 장르가 정의되지 않으면 원본 프롬프트 그대로 사용
+        newPrompt = summarized_prompt + " "
+
+    # 최종적으로 새로운 프롬프트 반환
+    return newPrompt
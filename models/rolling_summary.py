@@ -0,0 +1,107 @@
+# models/rolling_summary.py
+
+from typing import Dict, List, Tuple
+from langchain.prompts import ChatPromptTemplate
+from core.config import config
+from core.metrics import observe_llm
+from core.outbound import OPENAI, Priority, get_outbound_scheduler
+from models.token_budget import get_token_budget
+from service.session_store import GameSession
+
+# 누적 요약 갱신용 프롬프트 (백엔드 템플릿이 없는 내부용)
+SUMMARY_UPDATE_TEMPLATE = """You maintain a running summary of an interactive story.
+
+Current summary:
+{summary}
+
+New turns (player input followed by story output):
+{new_turns}
+
+Rewrite the summary so it also covers the new turns. Keep the main characters, the player's choices
+and their consequences, and the current situation. Write in the same language as the story and
+keep it under {max_words} words. Return only the summary."""
+
+
+class RollingSummaryMemory:
+    """게임별 누적 요약 + 최근 N턴 원문으로 이전 스토리 컨텍스트를 구성
+
+    요약은 continue_story 이후 백그라운드에서 새 턴만 반영해 갱신하므로
+    이어가기 프롬프트 크기가 단계가 늘어도 일정하게 유지되고,
+    /end에서는 처음부터 다시 요약하지 않고 이 요약을 재사용합니다.
+    요청은 갱신을 기다리지 않고, 아직 반영되지 않은 턴은 원문으로 함께 전달합니다.
+    """
+
+    def __init__(
+        self,
+        model,
+        parser,
+        recent_turns: int = config.SUMMARY_RECENT_TURNS,
+        max_words: int = config.SUMMARY_MAX_WORDS,
+    ):
+        self.recent_turns = recent_turns
+        self.max_words = max_words
+        self.chain = ChatPromptTemplate.from_template(SUMMARY_UPDATE_TEMPLATE) | model | parser
+
+        self.updates = 0
+        self.update_errors = 0
+
+    def pending_turns(self, session: GameSession) -> List[Dict[str, str]]:
+        """아직 요약에 반영되지 않은 턴 (세션이 요약 전까지 보관, GameSession.trim_turns)"""
+        pending = session.turn_count - session.summarized_turns
+        if pending <= 0:
+            return []
+        return session.turns[-pending:]
+
+    def is_current(self, session: GameSession) -> bool:
+        return bool(session.summary) and not self.pending_turns(session)
+
+    def context_parts(self, session: GameSession) -> Tuple[str, str]:
+        """(누적 요약, 최근 턴 원문) - 요약이 없으면 원문 전체
+
+        요약 갱신이 아직 끝나지 않았으면 요약에 빠진 턴까지 원문으로 포함합니다.
+        """
+        if not session.summary:
+            return "", "\n".join(session.history_messages())
+        last_n = max(self.recent_turns, len(self.pending_turns(session)))
+        return session.summary, "\n".join(session.history_messages(last_n=last_n))
+
+    @staticmethod
+    def format_context(summary: str, recent: str) -> str:
+        if not summary:
+            return recent
+        return f"Story so far (summary):\n{summary}\n\nMost recent turns:\n{recent}"
+
+    async def summarize(self, session: GameSession) -> str:
+        """기존 요약에 미반영 턴을 합친 새 요약 생성 (세션은 변경하지 않음)"""
+        new_turns = "\n".join(
+            f"{turn['input']}\n{turn['output']}" for turn in self.pending_turns(session)
+        )
+        # 다음 /continue 전에 끝나야 재사용되고 /end는 잠시 기다리므로 스토리 우선순위로 실행
+        variables = {
+            "summary": session.summary or "(none yet)",
+            "new_turns": new_turns,
+            "max_words": self.max_words
+        }
+
+        async def call():
+            async with observe_llm("summary") as llm:
+                result = await self.chain.ainvoke(variables)
+                budget = get_token_budget()
+                llm.prompt_tokens = budget.count_variables(variables)
+                llm.completion_tokens = budget.count(result)
+                return result
+
+        summary = await get_outbound_scheduler().run(OPENAI, Priority.STORY, call)
+        self.updates += 1
+        return str(summary).strip()
+
+    @staticmethod
+    def apply(session: GameSession, summary: str, upto_turn: int) -> None:
+        """요약 결과를 세션에 반영 (이미 더 최신 요약이 있으면 무시)"""
+        if summary and upto_turn > session.summarized_turns:
+            session.summary = summary
+            session.summarized_turns = upto_turn
+            session.trim_turns()  # 요약에 반영된 오래된 턴 정리
+
+    def stats(self) -> Dict[str, int]:
+        return {"updates": self.updates, "update_errors": self.update_errors}
@@ -2,8 +2,16 @@
 
 import aiohttp
 import os
+import time
+from contextlib import asynccontextmanager
+from typing import Dict, Optional
 from fastapi import HTTPException
 from dotenv import load_dotenv
+from functools import lru_cache
+from core.config import config
+from core.metrics import BACKEND_SECONDS
+from core.tracing import span
+from core.singleflight import SingleFlight
 
 load_dotenv()
 
@@ -18,6 +26,79 @@ class S3Manager:
         if not isinstance(self.api_url, str) or not self.api_url.startswith("http"):
             raise ValueError("API URL must be a valid string starting with 'http'.")
 
+        # 공유 커넥션 풀 (lifespan에서 start/close)
+        self._session: Optional[aiohttp.ClientSession] = None
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.requests = 0
+        self.sessions_created = 0
+
+        # 동일한 템플릿/프롬프트 목록 요청은 하나로 합침 (랜덤 프롬프트는 호출마다 달라야 하므로 제외)
+        self._template_flight = SingleFlight("backend_template")
+        self._prompts_flight = SingleFlight("backend_prompts")
+
+    async def start(self) -> aiohttp.ClientSession:
+        """keep-alive, DNS 캐시, 타임아웃이 설정된 공유 ClientSession 생성"""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=config.BACKEND_HTTP_LIMIT,
+                limit_per_host=config.BACKEND_HTTP_LIMIT_PER_HOST,
+                ttl_dns_cache=config.BACKEND_HTTP_DNS_TTL_SECONDS,
+                keepalive_timeout=config.BACKEND_HTTP_KEEPALIVE_SECONDS,
+            )
+            timeout = aiohttp.ClientTimeout(
+                total=config.BACKEND_HTTP_TIMEOUT_SECONDS,
+                connect=config.BACKEND_HTTP_CONNECT_TIMEOUT_SECONDS,
+            )
+            self._session = aiohttp.ClientSession(connector=connector, timeout=timeout)
+            self.sessions_created += 1
+        return self._session
+
+    async def close(self) -> None:
+        """공유 ClientSession 종료"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    @asynccontextmanager
+    async def _get(self, kind: str, url: str, **kwargs):
+        """공유 세션으로 GET 요청 (동시 요청 수 집계, 본문을 다 읽을 때까지의 지연 기록)"""
+        session = await self.start()
+        self.requests += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        started = time.perf_counter()
+        status = "error"
+        try:
+            with span(f"backend.{kind}") as current:
+                # 백엔드 로그와 이어 볼 수 있도록 traceparent 전달
+                headers = {**kwargs.pop("headers", {}), "traceparent": current.traceparent}
+                async with session.get(url, headers=headers, **kwargs) as response:
+                    status = str(response.status)
+                    current.set(status_code=response.status)
+                    yield response
+        finally:
+            self.in_flight -= 1
+            BACKEND_SECONDS.observe(time.perf_counter() - started, kind=kind, status=status)
+
+    def stats(self) -> Dict[str, int]:
+        """커넥션 풀 사용 현황"""
+        connector = self._session.connector if self._session is not None else None
+        idle = sum(len(conns) for conns in getattr(connector, "_conns", {}).values()) if connector else 0
+        acquired = len(getattr(connector, "_acquired", ())) if connector else 0
+        return {
+            "limit": config.BACKEND_HTTP_LIMIT,
+            "limit_per_host": config.BACKEND_HTTP_LIMIT_PER_HOST,
+            "connections_acquired": acquired,
+            "connections_idle": idle,
+            "in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight,
+            "requests": self.requests,
+            "sessions_created": self.sessions_created,
+            "template_collapsed": self._template_flight.collapsed,
+            "prompts_collapsed": self._prompts_flight.collapsed,
+        }
+
     async def get_random_prompt(self, genre: str) -> dict:
         """랜덤 프롬프트 가져오기"""
         if not genre or not isinstance(genre, str):
@@ -27,57 +108,125 @@ class S3Manager:
         url = f"{self.api_url}/api/admin/prompts/random"
         params = {"genre": genre}
 
-        async with aiohttp.ClientSession() as session:
-            try:
-                async with session.get(url, headers=headers, params=params) as response:
-                    if response.status != 200:
-                        raise HTTPException(
-                            status_code=response.status,
-                            detail=f"Failed to fetch prompt: {await response.text()}"
-                        )
-                    
-                    try:
-                        data = await response.json()
-                    except Exception as json_error:
-                        raise HTTPException(
-                            status_code=500,
-                            detail=f"Failed to parse JSON response: {str(json_error)}"
-                        )
-
-                    return {
-                        "file_name": data.get("file_name", "Unknown"),
-                        "content": data.get("content", "")
-                    }
-
-            except ValueError as ve:
-                raise HTTPException(status_code=500, detail=f"Value error in backend API interaction: {str(ve)}")
-            except Exception as e:
-                raise HTTPException(status_code=500, detail=f"Error interacting with backend API: {str(e)}")
+        try:
+            async with self._get("random_prompt", url, headers=headers, params=params) as response:
+                if response.status != 200:
+                    raise HTTPException(
+                        status_code=response.status,
+                        detail=f"Failed to fetch prompt: {await response.text()}"
+                    )
+                
+                try:
+                    data = await response.json()
+                except Exception as json_error:
+                    raise HTTPException(
+                        status_code=500,
+                        detail=f"Failed to parse JSON response: {str(json_error)}"
+                    )
+
+                return {
+                    "file_name": data.get("file_name", "Unknown"),
+                    "content": data.get("content", "")
+                }
+
+        except ValueError as ve:
+            raise HTTPException(status_code=500, detail=f"Value error in backend API interaction: {str(ve)}")
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Error interacting with backend API: {str(e)}")
     
-    async def get_genre_type_template(self, genre: str, template_type: str) -> dict:
-        """백엔드에서 특정 장르와 타입의 템플릿 가져오기"""
+    async def get_prompts(self, genre: str, since: Optional[str] = None) -> dict:
+        """장르별 전체 프롬프트 목록 가져오기 (since가 있으면 그 이후 변경분만)
+
+        반환값: {"prompts": [...], "deleted": [...], "cursor": ...}
+        """
+        return await self._prompts_flight.do(
+            (genre, since), lambda: self._get_prompts(genre, since)
+        )
+
+    async def _get_prompts(self, genre: str, since: Optional[str] = None) -> dict:
+        if not genre or not isinstance(genre, str):
+            raise ValueError("Genre must be a non-empty string.")
+
+        headers = {self.api_key_name: self.api_key}
+        url = f"{self.api_url}/api/admin/prompts"
+        params = {"genre": genre}
+        if since:
+            params["since"] = since
+
+        try:
+            async with self._get("prompts", url, headers=headers, params=params) as response:
+                if response.status != 200:
+                    raise HTTPException(
+                        status_code=response.status,
+                        detail=f"Failed to fetch prompts: {await response.text()}"
+                    )
+
+                try:
+                    data = await response.json()
+                except Exception as json_error:
+                    raise HTTPException(
+                        status_code=500,
+                        detail=f"Failed to parse JSON response: {str(json_error)}"
+                    )
+
+                # 목록만 내려주는 응답과 {"prompts": [...]} 형태 모두 지원
+                if isinstance(data, list):
+                    data = {"prompts": data}
+                return {
+                    "prompts": data.get("prompts", []),
+                    "deleted": data.get("deleted", []),
+                    "cursor": data.get("cursor")
+                }
+
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Error fetching prompts: {str(e)}")
+
+    async def get_genre_type_template(self, genre: str, template_type: str, etag: Optional[str] = None) -> Optional[dict]:
+        """백엔드에서 특정 장르와 타입의 템플릿 가져오기
+
+        etag를 넘기면 조건부 요청을 보내고, 변경이 없으면(304) None을 반환합니다.
+        """
+        return await self._template_flight.do(
+            (genre, template_type, etag),
+            lambda: self._get_genre_type_template(genre, template_type, etag)
+        )
+
+    async def _get_genre_type_template(self, genre: str, template_type: str, etag: Optional[str] = None) -> Optional[dict]:
         if not genre or not template_type:
             raise ValueError("Genre and template_type must be non-empty strings.")
 
         url = f"{self.api_url}/api/templates/{genre}/{template_type}"
         headers = {self.api_key_name: self.api_key}
+        if etag:
+            headers["If-None-Match"] = etag
+
+        try:
+            async with self._get("template", url, headers=headers) as response:
+                if response.status == 304:
+                    return None
+
+                if response.status != 200:
+                    raise HTTPException(
+                        status_code=response.status,
+                        detail=f"Failed to fetch template: {await response.text()}"
+                    )
+                
+                try:
+                    data = await response.json()
+                    if isinstance(data, dict) and response.headers.get("ETag"):
+                        data.setdefault("etag", response.headers["ETag"])
+                    return data
+                except Exception as json_error:
+                    raise HTTPException(
+                        status_code=500,
+                        detail=f"Failed to parse JSON response: {str(json_error)}"
+                    )
+
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Error fetching template: {str(e)}")
+
 
-        async with aiohttp.ClientSession() as session:
-            try:
-                async with session.get(url, headers=headers) as response:
-                    if response.status != 200:
-                        raise HTTPException(
-                            status_code=response.status,
-                            detail=f"Failed to fetch template: {await response.text()}"
-                        )
-                    
-                    try:
-                        return await response.json()
-                    except Exception as json_error:
-                        raise HTTPException(
-                            status_code=500,
-                            detail=f"Failed to parse JSON response: {str(json_error)}"
-                        )
-
-            except Exception as e:
-                raise HTTPException(status_code=500, detail=f"Error fetching template: {str(e)}")
\ No newline at end of file
+@lru_cache()
+def get_s3_manager() -> S3Manager:
+    """프로세스 공용 S3Manager (커넥션 풀 공유)"""
+    return S3Manager()
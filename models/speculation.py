@@ -0,0 +1,197 @@
+# models/speculation.py
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+
+from core.config import config
+from core.log import get_logger
+from core.outbound import Priority
+from service.session_store import GameSession
+
+log = get_logger("speculation")
+
+
+def _normalize_choice(choice: str) -> str:
+    return " ".join((choice or "").split()).casefold()
+
+
+@dataclass
+class _Speculation:
+    choice: str
+    task: asyncio.Task
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+
+
+@dataclass
+class _GameSpeculations:
+    turn_count: int
+    stage: int
+    genre: str
+    created_at: float = field(default_factory=time.monotonic)
+    by_choice: Dict[str, _Speculation] = field(default_factory=dict)
+
+
+class StorySpeculator:
+    """제시된 선택지마다 다음 스테이지를 미리 생성 (config.SPECULATION_ENABLED)
+
+    스테이지가 만들어지면 선택지별 이어가기를 낮은 우선순위로 백그라운드 생성하고,
+    실제 /continue가 들어오면 세션 상태(턴 수/스테이지/장르)와 선택지가 일치하는 결과를 꺼내 쓴 뒤
+    나머지는 취소합니다. 사용되지 않은 생성분은 낭비 토큰으로 집계합니다.
+    """
+
+    def __init__(
+        self,
+        story_generator,
+        enabled: bool = config.SPECULATION_ENABLED,
+        max_concurrency: int = config.SPECULATION_MAX_CONCURRENCY,
+        ttl_seconds: float = config.SPECULATION_TTL_SECONDS,
+    ):
+        self.story_generator = story_generator
+        self.enabled = enabled
+        self.ttl_seconds = ttl_seconds
+        self._semaphore = asyncio.Semaphore(max(max_concurrency, 1))
+        self._games: Dict[str, _GameSpeculations] = {}
+
+        self.started = 0
+        self.hits = 0
+        self.misses = 0
+        self.cancelled = 0
+        self.errors = 0
+        self.invalid = 0
+        self.wasted_prompt_tokens = 0
+        self.wasted_completion_tokens = 0
+        self.saved_completion_tokens = 0
+
+    def speculate(self, session: GameSession) -> None:
+        """방금 저장된 세션의 선택지마다 다음 스테이지 생성 시작"""
+        if not self.enabled or not session.choices:
+            return
+        self._purge_expired()
+        self.discard(session.game_id)
+
+        # 이후 요청이 세션을 바꿔도 영향이 없도록 스냅샷으로 생성
+        snapshot = GameSession.from_dict(session.to_dict())
+        game = _GameSpeculations(
+            turn_count=session.turn_count, stage=session.stage, genre=session.genre
+        )
+        for choice in session.choices:
+            key = _normalize_choice(choice)
+            if key in game.by_choice:
+                continue
+            speculation = _Speculation(choice=choice, task=None)
+            speculation.task = asyncio.create_task(self._generate(snapshot, speculation, game))
+            speculation.task.add_done_callback(self._on_done)
+            game.by_choice[key] = speculation
+            self.started += 1
+        self._games[session.game_id] = game
+
+    async def _generate(self, snapshot: GameSession, speculation: _Speculation, game: _GameSpeculations) -> str:
+        generator = self.story_generator
+        async with self._semaphore:
+            request = {"stage": game.stage, "user_choice": speculation.choice, "genre": game.genre}
+            chain, variables, _ = await generator._prepare_continue_story(request, snapshot)
+            speculation.prompt_tokens = generator.token_budget.count_variables(variables)
+            result = await generator._invoke(chain, variables, "speculative", priority=Priority.SPECULATIVE)
+            speculation.completion_tokens = generator.token_budget.count(result)
+            return result
+
+    def _on_done(self, task: asyncio.Task) -> None:
+        if not task.cancelled() and task.exception() is not None:
+            self.errors += 1
+            log.warning("Failed to pre-generate continuation", error=str(task.exception()))
+
+    def _waste(self, speculation: _Speculation) -> None:
+        task = speculation.task
+        if not task.done():
+            task.cancel()
+            self.cancelled += 1
+        self.wasted_prompt_tokens += speculation.prompt_tokens
+        self.wasted_completion_tokens += speculation.completion_tokens
+
+    async def take(
+        self, session: GameSession, request: Dict, validate: Optional[Callable[[str], object]] = None
+    ) -> Optional[str]:
+        """요청과 일치하는 미리 생성된 응답 반환 (없으면 None), 나머지는 취소
+
+        validate가 예외를 던지는 응답(형식 오류 등)은 미스로 집계하고 None을 반환합니다.
+        """
+        game = self._games.pop(session.game_id, None)
+        if game is None:
+            return None
+
+        stage = int(request.get("stage") or 1)
+        speculation = None
+        if (
+            game.turn_count == session.turn_count
+            and game.stage == stage
+            and game.genre == request.get("genre", game.genre)
+        ):
+            speculation = game.by_choice.pop(_normalize_choice(request.get("user_choice", "")), None)
+
+        for other in game.by_choice.values():
+            self._waste(other)
+
+        if speculation is None:
+            self.misses += 1
+            return None
+
+        try:
+            result = await asyncio.shield(speculation.task)
+        except asyncio.CancelledError:
+            if speculation.task.cancelled():
+                self.misses += 1
+                return None
+            raise
+        except Exception:
+            self.misses += 1
+            return None
+
+        if validate is not None:
+            try:
+                validate(result)
+            except Exception as e:
+                self.invalid += 1
+                self.misses += 1
+                self._waste(speculation)
+                log.warning("Discarded invalid pre-generated continuation", game_id=session.game_id, error=str(e))
+                return None
+
+        self.hits += 1
+        self.saved_completion_tokens += speculation.completion_tokens
+        return result
+
+    def discard(self, game_id: str) -> None:
+        """게임의 미리 생성 작업 전체 폐기 (엔딩 등)"""
+        game = self._games.pop(game_id, None)
+        if game is not None:
+            for speculation in game.by_choice.values():
+                self._waste(speculation)
+
+    def _purge_expired(self) -> None:
+        now = time.monotonic()
+        expired: List[str] = [
+            game_id for game_id, game in self._games.items()
+            if now - game.created_at > self.ttl_seconds
+        ]
+        for game_id in expired:
+            self.discard(game_id)
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "games": len(self._games),
+            "started": self.started,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "cancelled": self.cancelled,
+            "errors": self.errors,
+            "invalid": self.invalid,
+            "wasted_prompt_tokens": self.wasted_prompt_tokens,
+            "wasted_completion_tokens": self.wasted_completion_tokens,
+            "saved_completion_tokens": self.saved_completion_tokens,
+        }
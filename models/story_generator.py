@@ -1,216 +1,343 @@
 # models/story_generator.py
 
-from langchain.callbacks.base import BaseCallbackHandler
+import asyncio
 import os
+import time
 from dotenv import load_dotenv
 from langchain.prompts import ChatPromptTemplate
 from langchain_openai import ChatOpenAI
 from langchain.schema.output_parser import StrOutputParser
-from langchain.memory import ConversationBufferWindowMemory
-from typing import List, Dict, Optional
-from langchain.chains.summarize import load_summarize_chain
-from langchain.prompts import PromptTemplate
-from langchain.chains import LLMChain
-from langchain.schema import Document
+from typing import AsyncIterator, List, Dict, Optional, Tuple
+from core.log import get_logger
+from core.metrics import observe_llm
+from core.tracing import traced
+from core.outbound import OPENAI, Priority, get_outbound_scheduler
 from models.npc_handler import NPCHandler
+from models.prompt_catalog import PromptCatalog
+from models.story_stream import StoryStreamParser
+from models.speculation import StorySpeculator
+from models.rolling_summary import RollingSummaryMemory
+from models.token_budget import get_token_budget
+from service.session_store import GameSession
 import re
 from templates.story_templates import (
-    get_romance_initial_template,
-    get_survival_initial_template,
-    get_romance_continue_template,
-    get_survival_continue_template,
-    get_romance_ending_template,
-    get_survival_ending_template,
-    get_survival_rate_template,
-    get_romance_rate_template,
+    get_initial_prompt,
+    get_continue_prompt,
+    get_ending_prompt,
+    get_rate_prompt,
 )
 from functools import lru_cache
 
 load_dotenv()
 
-class StreamingCallbackHandler(BaseCallbackHandler):
-    """Custom callback handler for streaming responses."""
-    def on_llm_new_token(self, token: str, **kwargs) -> None:
-        print(token, end="", flush=True)
+log = get_logger("story_generator")
 
 class StoryGenerator:
-    def __init__(self, api_key: Optional[str] = None, s3_manager=None):
+    def __init__(self, api_key: Optional[str] = None, s3_manager=None, prompt_catalog: Optional[PromptCatalog] = None):
         self.api_key = api_key or os.getenv("OPENAI_KEY")
         if not self.api_key:
             raise ValueError("OpenAI API key is required")
 
         self.s3_manager = s3_manager
+        self.prompt_catalog = prompt_catalog or PromptCatalog(s3_manager)
         self.model = ChatOpenAI(
             openai_api_key=self.api_key,
             model="gpt-4o-mini",
             temperature=0.7,
             max_tokens=500,
-            streaming=True,
-            callbacks=[StreamingCallbackHandler()]
+            streaming=True
         )
         self.parser = StrOutputParser()
-        self.story_memory = ConversationBufferWindowMemory(k=5, return_messages=True)
-        self.game_id = None
+        self.summary_memory = RollingSummaryMemory(self.model, self.parser)
+        self.token_budget = get_token_budget()
+        self.scheduler = get_outbound_scheduler()
+        self.speculator = StorySpeculator(self)
 
      # NPCHandler 초기화
         self.npc_handler = NPCHandler(api_key=self.api_key)
 
-    def set_game_id(self, game_id: str):
-        """game_id 설정"""
-        self.game_id = game_id
-
     async def initialize_npc(self, story_context: str) -> str:
         """NPC 초기 인사말 생성"""
         try:
             return await self.npc_handler.generate_greeting(story_context)
         except Exception as e:
-            print(f"[ERROR] Failed to initialize NPC: {e}")
+            log.error("Failed to initialize NPC", error=str(e))
             raise
 
-    async def chat_with_npc(self, story_context: str, choices: List[str]) -> Dict:
+    async def chat_with_npc(self, story_context: str, choices: List[str], game_id: str = "default_id") -> Dict:
         """NPC 조언 및 생존율 얻기"""
         try:
             npc_response = await self.npc_handler.provide_advice(story_context, choices)
             return {
                 "response": npc_response["response"],
-                "game_id": self.game_id or "default_id",
+                "game_id": game_id,
                 "additional_comment": npc_response.get("additional_comment")
             }
         except Exception as e:
-            print(f"[ERROR] Failed to chat with NPC: {e}")
+            log.error("Failed to chat with NPC", game_id=game_id, error=str(e))
             raise
 
-    async def generate_initial_story(self, genre: str) -> Dict[str, str]:
+    @traced("story_generator.prepare_initial")
+    async def _prepare_initial_story(self, genre: str, session: GameSession) -> Tuple:
+        """첫 스토리 체인과 입력 변수 준비"""
+        # 로컬 카탈로그에서 샘플링 (백엔드 왕복 없음)
+        random_prompt = await self.prompt_catalog.get_prompt(genre)
+        base_prompt = random_prompt["content"]
+        file_name = random_prompt["file_name"]
+
+        session.genre = genre
+        session.add_turn("System", base_prompt)
+
+        # 캐시된 컴파일 프롬프트 사용 (base_prompt는 변수로 전달)
+        prompt_template = await get_initial_prompt(genre)
+        chain = prompt_template | self.model | self.parser
+        return chain, {"base_prompt": base_prompt}, file_name
+
+    def _finish_initial_story(self, result: str, session: GameSession, file_name: str) -> Dict:
+        """첫 스토리 응답 검증/파싱 후 세션에 기록"""
+        if not result:
+            raise ValueError("No story generated.")
+
+        if "Story:" not in result or "Choices:" not in result:
+            log.warning("Invalid initial story format", raw=result[:500])
+            raise ValueError("Invalid story format: missing Story or Choices section")
+
+        parts = result.split("\nChoices:")
+        story = parts[0].replace("Story:", "").strip()
+        choices = parts[1].strip("[] \n").split(",")
+        choices = [choice.strip() for choice in choices]
+
+        session.add_turn("Story begins", result)
+        session.story = story
+        session.choices = choices
+        session.stage = 1
+
+        return {
+            "story": story,
+            "choices": choices,
+            "file_name": file_name
+        }
+
+    @traced("story_generator.initial")
+    async def generate_initial_story(self, genre: str, session: GameSession) -> Dict[str, str]:
+        """첫 스토리 생성 (결과는 게임 세션에 기록)"""
         try:
-            random_prompt = await self.s3_manager.get_random_prompt(genre)
-            base_prompt = random_prompt["content"]
-            file_name = random_prompt["file_name"]
-
-            self.story_memory.save_context({"input": "System"}, {"output": base_prompt})
-
-            # 여기를 수정 - await 추가
-            if genre == "Romance":
-                system_template = await get_romance_initial_template(base_prompt)
-            else:
-                system_template = await get_survival_initial_template(base_prompt)
-
-            prompt_template = ChatPromptTemplate.from_template(system_template)
-            chain = prompt_template | self.model | self.parser
-
-            result = await chain.ainvoke({})
-
-            if not result:
-                raise ValueError("No story generated.")
-
-            if "Story:" not in result or "Choices:" not in result:
-                print("[Initial Story] ERROR: Invalid response format")
-                print(f"Raw response: {result}")
-                raise ValueError("Invalid story format: missing Story or Choices section")
-
-            parts = result.split("\nChoices:")
-            story = parts[0].replace("Story:", "").strip()
-            choices = parts[1].strip("[] \n").split(",")
-            choices = [choice.strip() for choice in choices]
-
-            self.story_memory.save_context({"input": "Story begins"}, {"output": result})
-
-            return {
-                "story": story,
-                "choices": choices,
-                "file_name": file_name
-            }
+            chain, variables, file_name = await self._prepare_initial_story(genre, session)
+            result = await self._invoke(chain, variables, "initial")
+            return self._finish_initial_story(result, session, file_name)
         except Exception as e:
             raise Exception(f"Error generating story: {str(e)}")
 
-    async def continue_story(self, request: Dict[str, str]) -> Dict[str, str]:
-        try:
-            current_stage = int(request.get("stage", 1))
-            user_choice = request.get("user_choice", "") 
-
-            # 대화 메모리에서 이전 스토리 불러오기
-            conversation_history = self.story_memory.load_memory_variables({}).get("history", [])
-            previous_story = "\n".join(
-                message.content if hasattr(message, "content") else str(message)
-                for message in conversation_history
-            )
-
-            # 단계별 템플릿
-            default_stage_templates = {
-                1: "Introduce the setting and the initial situation. Hint at the main conflict to come.",
-                2: "Develop the main conflict and build tension.",
-                3: "Bring the conflict to a climax. The stakes should be higher, and choices more significant.",
-                4: "Reach the turning point. Present a critical moment where the user's choice defines the resolution.",
-                5: "Conclude the story. Tie up loose ends and present the final outcome based on previous choices.",
-            }
-
-            stage_template = default_stage_templates.get(current_stage, default_stage_templates[5])
-            genre = request.get("genre", "Survival")
-
-            # 템플릿 생성
-            if genre == "Romance":
-                template = await get_romance_continue_template(
-                    stage_template=stage_template,
-                    previous_story=previous_story,
-                    user_choice=user_choice
-                )
+    async def stream_initial_story(self, genre: str, session: GameSession) -> AsyncIterator[Tuple[str, dict]]:
+        """첫 스토리를 토큰 단위로 스트리밍 (마지막에 ("done", 결과))"""
+        chain, variables, file_name = await self._prepare_initial_story(genre, session)
+        result = ""
+        async for event in self._stream_chain(chain, variables, "initial"):
+            if event[0] == "result":
+                result = event[1]
             else:
-                template = await get_survival_continue_template(
-                    stage_template=stage_template,
-                    previous_story=previous_story,
-                    user_choice=user_choice
-                )
+                yield event
+        yield "done", self._finish_initial_story(result, session, file_name)
+
+    @traced("story_generator.prepare_continue")
+    async def _prepare_continue_story(self, request: Dict[str, str], session: GameSession) -> Tuple:
+        """이어가기 체인과 입력 변수 준비"""
+        current_stage = int(request.get("stage") or 1)
+        user_choice = request.get("user_choice", "") 
+
+        # 단계별 템플릿
+        default_stage_templates = {
+            1: "Introduce the setting and the initial situation. Hint at the main conflict to come.",
+            2: "Develop the main conflict and build tension.",
+            3: "Bring the conflict to a climax. The stakes should be higher, and choices more significant.",
+            4: "Reach the turning point. Present a critical moment where the user's choice defines the resolution.",
+            5: "Conclude the story. Tie up loose ends and present the final outcome based on previous choices.",
+        }
+
+        stage_template = default_stage_templates.get(current_stage, default_stage_templates[5])
+        genre = request.get("genre", "Survival")
+
+        # 게임 세션의 누적 요약 + 최근 턴으로 이전 스토리 구성 (토큰 예산: 최근 턴 > 요약)
+        summary, recent = self.summary_memory.context_parts(session)
+        fitted = self.token_budget.fit(
+            "continue",
+            [("recent", recent, "tail"), ("summary", summary, "head")],
+            reserved=[stage_template, user_choice]
+        )
+        previous_story = self.summary_memory.format_context(fitted["summary"], fitted["recent"])
+
+        # 캐시된 컴파일 프롬프트 사용
+        prompt_template = await get_continue_prompt(genre)
+        chain = prompt_template | self.model | self.parser
+
+        variables = {
+            "previous_story": previous_story,
+            "user_choice": user_choice,  
+            "stage_template": stage_template
+        }
+        return chain, variables, self._continue_context(request)
+
+    @staticmethod
+    def _continue_context(request: Dict[str, str]) -> Dict:
+        return {
+            "user_choice": request.get("user_choice", ""),
+            "genre": request.get("genre", "Survival"),
+            "stage": int(request.get("stage") or 1)
+        }
+
+    @staticmethod
+    def _parse_continue_story(result: str) -> Tuple[str, List[str]]:
+        """이어가기 응답 검증/파싱 (story, choices) - 세션은 변경하지 않음"""
+        if not result:
+            raise ValueError("No continuation generated.")
+
+        # 응답 검증 및 파싱
+        if "\nChoices:" not in result:
+            log.warning("Continue story response missing Choices section", raw=result[:500])
+            raise ValueError("Invalid story format: missing 'Choices:' section")
+
+        parts = result.split("\nChoices:")
+        if len(parts) < 2:
+            log.warning("Continue story response could not be split", raw=result[:500])
+            raise ValueError("Invalid story format: could not split into story and choices.")
+
+        story = parts[0].replace("Story:", "").strip()
+        choices = parts[1].strip("[] \n").split(",")
+        choices = [choice.strip() for choice in choices if choice.strip()]
+
+        if not choices:
+            raise ValueError("No valid choices extracted from response.")
+
+        return story, choices
+
+    def _finish_continue_story(self, result: str, session: GameSession, context: Dict) -> Dict:
+        """이어가기 응답 검증/파싱 후 세션에 기록"""
+        story, choices = self._parse_continue_story(result)
+
+        # 게임 세션에 현재 스토리 저장
+        current_stage = context["stage"]
+        session.add_turn(context["user_choice"], result)
+        session.genre = context["genre"]
+        session.story = story
+        session.choices = choices
+        session.stage = current_stage + 1
+
+        return {
+            "story": story,
+            "choices": choices,
+            "stage": current_stage + 1
+        }
+
+    @traced("story_generator.continue")
+    async def continue_story(self, request: Dict[str, str], session: GameSession) -> Dict[str, str]:
+        """스토리 이어가기 (이전 스토리는 게임 세션에서 읽고 결과를 다시 기록)"""
+        try:
+            # 미리 생성해 둔 결과가 있으면 LLM 호출 생략 (형식이 잘못됐으면 미스로 보고 새로 생성)
+            speculated = await self.speculator.take(session, request, validate=self._parse_continue_story)
+            if speculated is not None:
+                return self._finish_continue_story(speculated, session, self._continue_context(request))
 
-            prompt_template = ChatPromptTemplate.from_template(template)
-            chain = prompt_template | self.model | self.parser
+            chain, variables, context = await self._prepare_continue_story(request, session)
 
             # LLM 호출
-            result = await chain.ainvoke({
-                "previous_story": previous_story,
-                "user_choice": user_choice,  
-                "stage_template": stage_template
-            })
-
-            if not result:
-                raise ValueError("No continuation generated.")
-
-            # 응답 검증 및 파싱
-            if "\nChoices:" not in result:
-                print("[Continue Story] ERROR: 'Choices:' section missing in response.")
-                print(f"Raw response: {result}")
-                raise ValueError("Invalid story format: missing 'Choices:' section")
-
-            parts = result.split("\nChoices:")
-            if len(parts) < 2:
-                print("[Continue Story] ERROR: Response could not be split into story and choices.")
-                print(f"Raw response: {result}")
-                raise ValueError("Invalid story format: could not split into story and choices.")
-
-            story = parts[0].replace("Story:", "").strip()
-            choices = parts[1].strip("[] \n").split(",")
-            choices = [choice.strip() for choice in choices if choice.strip()]
-
-            if not choices:
-                raise ValueError("No valid choices extracted from response.")
-
-            # 메모리에 현재 스토리 저장
-            self.story_memory.save_context(
-                {"input": user_choice},
-                {"output": result}
-            )
-
-            return {
-                "story": story,
-                "choices": choices,
-                "stage": current_stage + 1
-            }
+            result = await self._invoke(chain, variables, "continue")
+            return self._finish_continue_story(result, session, context)
         except Exception as e:
-            print(f"[Continue Story] ERROR: {str(e)}")
+            log.error("Failed to continue story", game_id=request.get("game_id"), error=str(e))
             raise Exception(f"Error continuing story: {str(e)}")
 
-    async def generate_ending_story(self, conversation_history: list, genre: str = "Survival") -> dict:
-        """엔딩 스토리 생성 및 생존율 계산"""
+    async def stream_continue_story(self, request: Dict[str, str], session: GameSession) -> AsyncIterator[Tuple[str, dict]]:
+        """스토리 이어가기를 토큰 단위로 스트리밍 (마지막에 ("done", 결과))"""
+        speculated = await self.speculator.take(session, request, validate=self._parse_continue_story)
+        if speculated is not None:
+            stream_parser = StoryStreamParser()
+            for event in stream_parser.feed(speculated) + stream_parser.close():
+                yield event
+            yield "done", self._finish_continue_story(speculated, session, self._continue_context(request))
+            return
+
+        chain, variables, context = await self._prepare_continue_story(request, session)
+        result = ""
+        async for event in self._stream_chain(chain, variables, "continue"):
+            if event[0] == "result":
+                result = event[1]
+            else:
+                yield event
+        yield "done", self._finish_continue_story(result, session, context)
+
+    async def _invoke(self, chain, variables: Dict, site: str, priority: Priority = Priority.STORY):
+        """외부 호출 스케줄러를 거쳐 체인 실행 (대기 시간을 제외한 호출 지연/토큰 수 기록)"""
+        async def call():
+            async with observe_llm(site) as llm:
+                result = await chain.ainvoke(variables)
+                llm.prompt_tokens = self.token_budget.count_variables(variables)
+                output = result.get("output_text", "") if isinstance(result, dict) else result
+                llm.completion_tokens = self.token_budget.count(output) if isinstance(output, str) else 0
+                return result
+
+        return await self.scheduler.run(OPENAI, priority, call)
+
+    async def _stream_chain(self, chain, variables: Dict, site: str) -> AsyncIterator[Tuple[str, object]]:
+        """체인 출력을 story/choices 이벤트로 변환하고 마지막에 ("result", 전체 응답) 반환"""
+        stream_parser = StoryStreamParser()
+        chunks = []
+        # 스트리밍이 끝날 때까지 OpenAI 슬롯 유지
+        async with self.scheduler.slot(OPENAI, Priority.STORY), observe_llm(site) as llm:
+            async for chunk in chain.astream(variables):
+                chunks.append(chunk)
+                for event in stream_parser.feed(chunk):
+                    yield event
+            llm.prompt_tokens = self.token_budget.count_variables(variables)
+            llm.completion_tokens = self.token_budget.count("".join(chunks))
+        for event in stream_parser.close():
+            yield event
+        yield "result", "".join(chunks)
+
+    @traced("story_generator.summarize")
+    async def _summarize_conversation(self, conversation_text: str) -> str:
+        """대화 전체를 map_reduce 방식으로 요약"""
+        # langchain.chains는 import 비용이 커서 엔딩 요청에서만 불러옴
+        from langchain.chains.summarize import load_summarize_chain
+        from langchain.schema import Document
+
+        conversation_document = [Document(page_content=conversation_text)]
+        summarize_chain = load_summarize_chain(self.model, chain_type="map_reduce")
+        summary_result = await self._invoke(summarize_chain, {"input_documents": conversation_document}, "summary")
+
+        # 요약본 추출
+        summary = (
+            summary_result.get("output_text", "")
+            if isinstance(summary_result, dict)
+            else summary_result
+        )
+        if not summary:
+            raise ValueError("Summary generation failed")
+        return summary
+
+    @traced("story_generator.ending")
+    async def generate_ending_story(
+        self,
+        conversation_history: list,
+        genre: str = "Survival",
+        summary: Optional[str] = None
+    ) -> dict:
+        """엔딩 스토리 생성 및 생존율 계산
+
+        의존 관계: [요약 | 생존율 템플릿 | 엔딩 템플릿] 동시 실행 → [생존율 | 엔딩] 동시 실행
+        summary(누적 요약)가 주어지면 요약 단계를 건너뜁니다.
+        """
+        timings: Dict[str, float] = {}
+
+        async def timed(stage: str, awaitable):
+            started = time.perf_counter()
+            try:
+                return await awaitable
+            finally:
+                timings[stage] = round((time.perf_counter() - started) * 1000, 1)
+
         try:
-            print(f"[DEBUG] Received conversation history: {conversation_history}")
+            total_started = time.perf_counter()
+            log.debug("Generating ending", messages=len(conversation_history), has_summary=bool(summary))
 
             # 대화 내용을 문자열로 변환
             conversation_text = "\n".join(
@@ -218,38 +345,44 @@ class StoryGenerator:
                 for message in conversation_history
             )
 
-            # 문서 생성 및 요약
-            conversation_document = [Document(page_content=conversation_text)]
-            summarize_chain = load_summarize_chain(self.model, chain_type="map_reduce")
-            summary_result = await summarize_chain.ainvoke({"input_documents": conversation_document})
-
-            # 요약본 추출
-            summary = (
-                summary_result.get("output_text", "")
-                if isinstance(summary_result, dict)
-                else summary_result
+            # 토큰 예산: 누적 요약 > 대화 원문(최근 내용 우선)
+            fitted = self.token_budget.fit(
+                "ending",
+                [("summary", summary or "", "head"), ("conversation_text", conversation_text, "tail")]
             )
+            conversation_text = fitted["conversation_text"]
+            if summary:
+                summary = fitted["summary"]
+
+            # 1단계: 요약과 템플릿 프리페치를 동시에 (하나라도 실패하면 나머지 취소)
+            async with asyncio.TaskGroup() as group:
+                if summary:
+                    timings["summary"] = 0.0
+                else:
+                    summary_task = group.create_task(timed("summary", self._summarize_conversation(conversation_text)))
+                rate_prompt_task = group.create_task(timed("rate_template", get_rate_prompt(genre)))
+                ending_prompt_task = group.create_task(timed("ending_template", get_ending_prompt(genre)))
+
             if not summary:
-                raise ValueError("Summary generation failed")
+                summary = summary_task.result()
 
-            print(f"[DEBUG Summary] {summary}")
+            rate_chain = rate_prompt_task.result() | self.model | self.parser
+            ending_chain = ending_prompt_task.result() | self.model | self.parser
 
-            # 생존율 계산 템플릿 선택 및 호출
-            if genre == "Romance":
-                rate_template = await get_romance_rate_template(summary=summary)
-            else:
-                rate_template = await get_survival_rate_template(summary=summary)
+            # 2단계: 생존율 계산과 엔딩 생성은 서로 독립적이므로 동시에
+            async with asyncio.TaskGroup() as group:
+                rate_task = group.create_task(timed("rate", self._invoke(rate_chain, {"summary": summary}, "rate")))
+                ending_task = group.create_task(timed("ending", self._invoke(ending_chain, {
+                    "conversation_text": conversation_text,
+                    "summary": summary
+                }, "ending")))
 
-            rate_prompt = ChatPromptTemplate.from_template(rate_template)
-            rate_chain = rate_prompt | self.model | self.parser
-
-            # 생존율 계산
-            rate_result = await rate_chain.ainvoke({"summary": summary})
+            rate_result = rate_task.result()
+            ending_story_result = ending_task.result()
 
             survival_rate = 0
             try:
                 # 숫자만 추출
-                import re
                 numbers = re.findall(r'\d+', str(rate_result))
                 if numbers:
                     survival_rate = min(100, max(0, int(numbers[0])))
@@ -258,29 +391,6 @@ class StoryGenerator:
             except ValueError:
                 survival_rate = 50  # 기본값
 
-            print(f"[DEBUG Survival Rate] {survival_rate}%")
-
-            # 엔딩 스토리 생성 템플릿 선택 및 호출
-            if genre == "Romance":
-                ending_template = await get_romance_ending_template(
-                    conversation_text=conversation_text,
-                    summary=summary
-                )
-            else:
-                ending_template = await get_survival_ending_template(
-                    conversation_text=conversation_text,
-                    summary=summary
-                )
-
-            ending_prompt = ChatPromptTemplate.from_template(ending_template)
-            ending_chain = ending_prompt | self.model | self.parser
-
-            # 엔딩 스토리 생성
-            ending_story_result = await ending_chain.ainvoke({
-                "conversation_text": conversation_text,
-                "summary": summary
-            })
-
             ending_story = (
                 ending_story_result.get("text", "")
                 if isinstance(ending_story_result, dict)
@@ -289,17 +399,24 @@ class StoryGenerator:
             if not ending_story:
                 raise ValueError("No ending generated")
 
-            print(f"[DEBUG Ending Story] {ending_story}")
+            # 단계별 소요 시간과 임계 경로
+            timings["prepare"] = max(timings["summary"], timings["rate_template"], timings["ending_template"])
+            timings["generate"] = max(timings["rate"], timings["ending"])
+            timings["total"] = round((time.perf_counter() - total_started) * 1000, 1)
+            log.info("Generated ending", survival_rate=survival_rate, timings_ms=timings)
 
             return {
                 "summary": summary.strip(),
                 "survival_rate": survival_rate,
                 "ending_story": ending_story,
-                "npc_final_message": "이야기가 끝났네요. 당신의 선택에 따라 모든 것이 달라졌습니다."
+                "npc_final_message": "이야기가 끝났네요. 당신의 선택에 따라 모든 것이 달라졌습니다.",
+                "timings": timings
             }
 
         except Exception as e:
-            print(f"[Ending Story ERROR] {str(e)}")
+            if isinstance(e, BaseExceptionGroup):
+                e = e.exceptions[0]
+            log.error("Failed to generate ending", error=str(e), timings_ms=timings)
             return {
                 "summary": "스토리 요약을 생성하지 못했습니다.",
                 "survival_rate": 50,  # 기본값
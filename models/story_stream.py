@@ -0,0 +1,91 @@
+# models/story_stream.py
+
+from typing import List, Optional, Tuple
+
+STORY_MARKER = "Story:"
+CHOICES_MARKER = "\nChoices:"
+
+
+def parse_choices(text: str) -> List[str]:
+    """'[선택지1, 선택지2]' 형태의 문자열을 목록으로 변환"""
+    return [choice.strip() for choice in text.strip("[] \n").split(",") if choice.strip()]
+
+
+class StoryStreamParser:
+    """LLM 토큰 스트림에서 Story / Choices 구간을 점진적으로 인식
+
+    feed()는 (event, data) 목록을 반환합니다.
+    - ("story", {"delta": ...}): 스토리 본문 증분
+    - ("choices", {"choices": [...]}): 선택지 목록이 완성되는 즉시 한 번
+    """
+
+    def __init__(self):
+        self.buffer = ""
+        self.story_start: Optional[int] = None
+        self.choices_start: Optional[int] = None
+        self.emitted = 0  # story_start 기준으로 이미 내보낸 길이
+        self.choices: Optional[List[str]] = None
+
+    def _find_story_start(self) -> Optional[int]:
+        stripped = self.buffer.lstrip()
+        offset = len(self.buffer) - len(stripped)
+        if stripped.startswith(STORY_MARKER):
+            return offset + len(STORY_MARKER)
+        if STORY_MARKER.startswith(stripped):
+            return None  # 아직 'Story:' 일부만 도착
+        return offset  # 'Story:' 없이 바로 본문이 시작되는 응답
+
+    def _story_events(self, end: int) -> List[Tuple[str, dict]]:
+        if self.emitted == 0:
+            # 본문 앞 공백 건너뛰기
+            while self.story_start < end and self.buffer[self.story_start].isspace():
+                self.story_start += 1
+        # 뒤쪽 공백은 다음 글자가 올 때까지 보류 (최종 본문도 strip 기준)
+        text = self.buffer[self.story_start:end].rstrip()
+        delta = text[self.emitted:]
+        if not delta:
+            return []
+        self.emitted += len(delta)
+        return [("story", {"delta": delta})]
+
+    def _choices_events(self, final: bool) -> List[Tuple[str, dict]]:
+        if self.choices is not None:
+            return []
+        text = self.buffer[self.choices_start:]
+        closing = text.find("]")
+        if closing != -1 and "[" in text[:closing]:
+            self.choices = parse_choices(text[:closing + 1])
+        elif final:
+            self.choices = parse_choices(text)
+        else:
+            return []
+        return [("choices", {"choices": self.choices})]
+
+    def feed(self, token: str) -> List[Tuple[str, dict]]:
+        self.buffer += token
+        return self._process(final=False)
+
+    def close(self) -> List[Tuple[str, dict]]:
+        """스트림 종료 시 남은 본문/선택지 처리"""
+        return self._process(final=True)
+
+    def _process(self, final: bool) -> List[Tuple[str, dict]]:
+        events = []
+        if self.story_start is None:
+            self.story_start = self._find_story_start()
+            if self.story_start is None:
+                return events
+
+        if self.choices_start is None:
+            marker = self.buffer.find(CHOICES_MARKER, self.story_start)
+            if marker != -1:
+                events += self._story_events(marker)
+                self.choices_start = marker + len(CHOICES_MARKER)
+            else:
+                # 'Choices:' 표식 일부가 잘려 들어온 경우를 대비해 끝부분을 보류
+                hold = 0 if final else len(CHOICES_MARKER) - 1
+                events += self._story_events(max(self.story_start, len(self.buffer) - hold))
+
+        if self.choices_start is not None:
+            events += self._choices_events(final)
+        return events
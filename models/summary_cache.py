@@ -0,0 +1,118 @@
+# models/summary_cache.py
+
+import asyncio
+import hashlib
+import json
+import os
+import re
+import tempfile
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from core.config import config
+from core.log import get_logger
+
+log = get_logger("summary_cache")
+
+
+def make_cache_key(prompt: str, genre: Optional[str]) -> str:
+    """공백/대소문자를 정규화한 프롬프트 해시 + 장르"""
+    normalized = re.sub(r"\s+", " ", prompt or "").strip().casefold()
+    digest = hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+    return f"{genre or '-'}:{digest}"
+
+
+class SummaryCache:
+    """프롬프트 요약 결과 캐시 (메모리 LRU + 선택적 디스크 계층, TTL 적용)"""
+
+    def __init__(
+        self,
+        max_entries: int = config.PROMPT_CACHE_SIZE,
+        ttl_seconds: float = config.PROMPT_CACHE_TTL_SECONDS,
+        disk_dir: Optional[str] = config.PROMPT_CACHE_DIR,
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.disk_dir = disk_dir or None
+        self._entries: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        if self.disk_dir:
+            os.makedirs(self.disk_dir, exist_ok=True)
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.expired = 0
+
+    def _is_fresh(self, created_at: float) -> bool:
+        return self.ttl_seconds <= 0 or time.time() - created_at < self.ttl_seconds
+
+    def _disk_path(self, key: str) -> str:
+        # 키에 요청 본문의 장르가 그대로 들어가므로 파일 이름은 키 전체의 해시로 (키는 본문에만 저장)
+        return os.path.join(self.disk_dir, hashlib.sha256(key.encode("utf-8")).hexdigest() + ".json")
+
+    def _read_disk(self, key: str) -> Optional[Tuple[str, float]]:
+        try:
+            with open(self._disk_path(key), encoding="utf-8") as f:
+                data = json.load(f)
+            if data["key"] != key:
+                return None
+            return data["value"], data["created_at"]
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def _write_disk(self, key: str, value: str, created_at: float) -> None:
+        # 임시 파일에 쓴 뒤 교체하여 다른 워커가 반쯤 쓰인 파일을 읽지 않도록 함
+        fd, tmp_path = tempfile.mkstemp(dir=self.disk_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({"key": key, "value": value, "created_at": created_at}, f, ensure_ascii=False)
+            os.replace(tmp_path, self._disk_path(key))
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def _remember(self, key: str, value: str, created_at: float) -> None:
+        self._entries[key] = (value, created_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def get(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            if self._is_fresh(entry[1]):
+                self._entries.move_to_end(key)
+                self.memory_hits += 1
+                return entry[0]
+            del self._entries[key]
+            self.expired += 1
+
+        if self.disk_dir:
+            entry = await asyncio.to_thread(self._read_disk, key)
+            if entry is not None and self._is_fresh(entry[1]):
+                self._remember(key, *entry)
+                self.disk_hits += 1
+                return entry[0]
+
+        self.misses += 1
+        return None
+
+    async def set(self, key: str, value: str) -> None:
+        created_at = time.time()
+        self._remember(key, value, created_at)
+        if self.disk_dir:
+            try:
+                await asyncio.to_thread(self._write_disk, key, value, created_at)
+            except OSError as e:
+                log.warning("Failed to write disk entry", error=str(e))
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "entries": len(self._entries),
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "expired": self.expired,
+        }
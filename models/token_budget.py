@@ -0,0 +1,196 @@
+# models/token_budget.py
+
+import asyncio
+import time
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from core.config import config
+from core.log import get_logger
+
+log = get_logger("token_budget")
+
+# tiktoken을 쓸 수 없을 때 사용하는 대략적인 문자/토큰 비율
+_CHARS_PER_TOKEN = 3
+# 인코더 로드 실패 후 다시 시도하기까지의 간격(초)
+_RETRY_SECONDS = 60
+
+_encodings: Dict[str, object] = {}  # 모델별 tiktoken 인코더 (로드에 성공한 것만 보관)
+_loading: Dict[str, asyncio.Task] = {}
+_failed_at: Dict[str, float] = {}
+
+
+def _load_encoding(model: str):
+    """인코더 로드 (첫 사용 시 BPE 파일을 내려받을 수 있으므로 이벤트 루프 밖에서 호출)"""
+    import tiktoken
+    try:
+        encoding = tiktoken.encoding_for_model(model)
+    except KeyError:
+        encoding = tiktoken.get_encoding("o200k_base")
+    _encodings[model] = encoding
+    _failed_at.pop(model, None)
+    return encoding
+
+
+def _on_load_failed(model: str, error: BaseException) -> None:
+    # 인코더 파일을 받을 수 없는 환경 등 - 근사치로 대체하고 잠시 뒤 다시 시도
+    _failed_at[model] = time.monotonic()
+    log.warning("tiktoken unavailable, using approximation", model=model, error=str(error))
+
+
+async def preload_encoding(model: str) -> None:
+    """인코더를 스레드에서 미리 로드 (기동 워밍업에서 호출, 실패는 예외로 전달)"""
+    if model in _encodings:
+        return
+    try:
+        await asyncio.to_thread(_load_encoding, model)
+    except Exception as e:
+        _on_load_failed(model, e)
+        raise
+
+
+def get_encoding(model: str):
+    """모델별 tiktoken 인코더 (아직 로드되지 않았으면 None → 근사치)
+
+    이벤트 루프 안에서는 직접 로드하지 않고 백그라운드 로드만 시작합니다.
+    """
+    encoding = _encodings.get(model)
+    if encoding is not None or model in _loading:
+        return encoding
+    failed_at = _failed_at.get(model)
+    if failed_at is not None and time.monotonic() - failed_at < _RETRY_SECONDS:
+        return None
+
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        # 이벤트 루프 밖(스크립트 등)에서는 바로 로드
+        try:
+            return _load_encoding(model)
+        except Exception as e:
+            _on_load_failed(model, e)
+            return None
+
+    task = loop.create_task(preload_encoding(model))
+    _loading[model] = task
+
+    def _done(done: asyncio.Task) -> None:
+        _loading.pop(model, None)
+        if not done.cancelled():
+            done.exception()  # preload_encoding에서 이미 기록
+
+    task.add_done_callback(_done)
+    return None
+
+
+class TokenBudget:
+    """프롬프트 종류별 토큰 예산 안에 들어오도록 히스토리를 우선순위대로 자름
+
+    fit()의 sections는 중요한 순서대로 (이름, 텍스트, 남길 쪽) 형태이며,
+    남길 쪽은 "head"(앞부분 유지) 또는 "tail"(최근 내용 유지)입니다.
+    """
+
+    def __init__(self, model: str = "gpt-4o-mini", budgets: Optional[Dict[str, int]] = None):
+        self.model = model
+        self.budgets = budgets or {
+            "continue": config.TOKEN_BUDGET_CONTINUE,
+            "npc_advice": config.TOKEN_BUDGET_NPC_ADVICE,
+            "ending": config.TOKEN_BUDGET_ENDING,
+        }
+        self.last_counts: Dict[str, Dict[str, int]] = {}
+        self.calls: Dict[str, int] = {}
+        self.tokens: Dict[str, int] = {}
+        self.trimmed_calls: Dict[str, int] = {}
+
+    @property
+    def encoding(self):
+        return get_encoding(self.model)
+
+    def count(self, text: str) -> int:
+        if not text:
+            return 0
+        encoding = self.encoding
+        if encoding is None:
+            return -(-len(text) // _CHARS_PER_TOKEN)
+        return len(encoding.encode(text, disallowed_special=()))
+
+    def count_variables(self, variables: Dict) -> int:
+        """체인 입력 변수 전체의 토큰 수 (템플릿 본문 제외, 메트릭용)"""
+        total = 0
+        for value in variables.values():
+            if isinstance(value, str):
+                total += self.count(value)
+            elif isinstance(value, list):
+                # 요약 체인의 Document 목록
+                total += sum(self.count(getattr(item, "page_content", "")) for item in value)
+        return total
+
+    def truncate(self, text: str, max_tokens: int, keep: str = "tail") -> str:
+        """max_tokens 이하로 자르기 (keep="tail"이면 뒷부분 유지)"""
+        if max_tokens <= 0 or not text:
+            return ""
+        encoding = self.encoding
+        if encoding is None:
+            limit = max_tokens * _CHARS_PER_TOKEN
+            return text[-limit:] if keep == "tail" else text[:limit]
+
+        tokens = encoding.encode(text, disallowed_special=())
+        if len(tokens) <= max_tokens:
+            return text
+        kept = tokens[-max_tokens:] if keep == "tail" else tokens[:max_tokens]
+        return encoding.decode(kept)
+
+    def fit(
+        self,
+        prompt_type: str,
+        sections: List[Tuple[str, str, str]],
+        reserved: Iterable[str] = (),
+    ) -> Dict[str, str]:
+        """예산 안에 들어오도록 섹션을 우선순위 순으로 배분
+
+        reserved: 자르지 않는 고정 입력 (선택지, 사용자 선택 등) - 예산에서 먼저 차감
+        """
+        budget = self.budgets.get(prompt_type, 0)
+        reserved_tokens = sum(self.count(text) for text in reserved)
+        remaining = max(0, budget - reserved_tokens) if budget else None
+        counts: Dict[str, int] = {}
+        trimmed = False
+
+        fitted = {}
+        for name, text, keep in sections:
+            tokens = self.count(text)
+            if remaining is not None and tokens > remaining:
+                text = self.truncate(text, remaining, keep=keep)
+                tokens = self.count(text)
+                trimmed = True
+            fitted[name] = text
+            counts[name] = tokens
+            if remaining is not None:
+                remaining = max(0, remaining - tokens)
+
+        counts["reserved"] = reserved_tokens
+        counts["total"] = reserved_tokens + sum(counts[name] for name, _, _ in sections)
+        counts["budget"] = budget
+        self._record(prompt_type, counts, trimmed)
+        return fitted
+
+    def _record(self, prompt_type: str, counts: Dict[str, int], trimmed: bool) -> None:
+        self.last_counts[prompt_type] = counts
+        self.calls[prompt_type] = self.calls.get(prompt_type, 0) + 1
+        self.tokens[prompt_type] = self.tokens.get(prompt_type, 0) + counts["total"]
+        if trimmed:
+            self.trimmed_calls[prompt_type] = self.trimmed_calls.get(prompt_type, 0) + 1
+
+    def stats(self) -> Dict[str, Dict]:
+        return {
+            "last": self.last_counts,
+            "calls": self.calls,
+            "tokens": self.tokens,
+            "trimmed_calls": self.trimmed_calls,
+        }
+
+
+@lru_cache()
+def get_token_budget() -> TokenBudget:
+    """프로세스 공용 TokenBudget"""
+    return TokenBudget()
@@ -1,4 +1,5 @@
-from pydantic import BaseModel
+from typing import List
+from pydantic import BaseModel, Field
 
 class ImageRequest(BaseModel):
     gameId: int
@@ -6,4 +7,7 @@ class ImageRequest(BaseModel):
     prompt: str  # 사용자가 입력할 프롬프트
     size: str = "9x16"  # 이미지 크기 (기본값 제공)
     n: int = 1  # 생성할 이미지 수 (기본값 제공)
-    genre: str  # 이미지 장르
\ No newline at end of file
+    genre: str  # 이미지 장르
+
+class ImageBatchRequest(BaseModel):
+    items: List[ImageRequest] = Field(..., min_length=1)  # 스테이지별 요청 (각 항목의 n만큼 생성)
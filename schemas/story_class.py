@@ -10,6 +10,7 @@ class ChoiceAdvice(BaseModel):
 class StoryGenerationStartRequest(BaseModel):
     genre: str = Field(..., description="Story genre")
     tags: List[str] = Field(default=list(), description="Story tags")
+    game_id: Optional[str] = Field(None, description="Story session ID (생략 시 새로 발급)")
 
 class StoryGenerationChatRequest(BaseModel):
     genre: str = Field(..., description="Story genre")
@@ -24,6 +25,7 @@ class StoryResponse(BaseModel):
     story: str = Field(..., description="Generated story text")
     choices: List[str] = Field(..., description="Available choices")
     file_name: Optional[str] = Field(None, description="File name")
+    game_id: Optional[str] = Field(None, description="Story session ID")
 
 class NPCResponse(BaseModel):
     response: Dict[str, ChoiceAdvice]
@@ -0,0 +1,224 @@
+# service/image_jobs.py
+
+import asyncio
+import time
+import uuid
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+from core.config import config
+from core.log import get_logger
+from core.tracing import span
+from models.image_generator import generate_image_with_api, open_image_stream
+from models.image_store import StoredImage, game_alias, get_image_store, prompt_alias
+from models.prompt_summarizer import summarize_prompt
+from schemas.image_class import ImageRequest
+
+log = get_logger("image_jobs")
+
+JOB_FAILED_MESSAGE = "이미지 생성에 실패했습니다."
+
+
+async def render_to_store(request: ImageRequest, summarized_prompt: str, variant: int = 0) -> StoredImage:
+    """이미지 생성 후 청크 단위로 디스크 저장소에 기록"""
+    store = get_image_store()
+    image_url = await generate_image_with_api(prompt=summarized_prompt, size=request.size)
+    upstream = await open_image_stream(image_url)
+    writer = store.open_writer(upstream.media_type)
+    try:
+        async for chunk in upstream.iter_chunks():
+            await writer.write(chunk)
+    except BaseException:
+        await writer.abort()
+        raise
+    stored = await writer.commit([
+        game_alias(request.gameId, request.stageNumber, variant),
+        prompt_alias(summarized_prompt, request.size, variant),
+    ])
+    if stored is None:
+        raise RuntimeError("이미지를 저장하지 못했습니다.")
+    return stored
+
+
+async def resolve_image(request: ImageRequest, variant: int = 0) -> StoredImage:
+    """저장된 이미지 재사용 → 요약 프롬프트 기준 재사용 → 새로 생성 순서로 이미지 확보"""
+    store = get_image_store()
+    game_key = game_alias(request.gameId, request.stageNumber, variant)
+    cached = await store.lookup(game_key)
+    if cached is not None:
+        return cached
+
+    summarized_prompt = await summarize_prompt(request.prompt, genre=request.genre)
+    cached = await store.lookup(prompt_alias(summarized_prompt, request.size, variant))
+    if cached is not None:
+        await store.link(cached, game_key)
+        return cached
+
+    return await render_to_store(request, summarized_prompt, variant)
+
+
+@dataclass
+class ImageJob:
+    job_id: str
+    request: ImageRequest
+    status: str = "queued"  # queued | running | done | failed
+    image: Optional[StoredImage] = None
+    error: Optional[str] = None
+    created_at: float = field(default_factory=time.monotonic)
+    finished_at: Optional[float] = None
+    done: asyncio.Event = field(default_factory=asyncio.Event)
+
+    def to_dict(self) -> Dict:
+        return {
+            "job_id": self.job_id,
+            "status": self.status,
+            "gameId": self.request.gameId,
+            "stageNumber": self.request.stageNumber,
+            # 내부 오류 내용은 로그에만 남김
+            "error": JOB_FAILED_MESSAGE if self.status == "failed" else None,
+        }
+
+
+class ImageJobQueue:
+    """이미지 생성 작업 큐
+
+    제출 즉시 job_id를 돌려주고, 고정 크기 워커 풀이 순서대로 처리합니다.
+    같은 (gameId, stageNumber)로 진행 중이거나 완료된 작업이 있으면 그 작업을 그대로 반환하며,
+    끝난 작업은 result_ttl 이후 정리됩니다.
+    """
+
+    def __init__(
+        self,
+        workers: int = config.IMAGE_JOB_WORKERS,
+        max_queued: int = config.IMAGE_JOB_QUEUE_MAX,
+        result_ttl: float = config.IMAGE_JOB_RESULT_TTL_SECONDS,
+    ):
+        self.workers = workers
+        self.result_ttl = result_ttl
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queued)
+        self._jobs: Dict[str, ImageJob] = {}
+        self._by_stage: Dict[str, str] = {}
+        self._tasks: List[asyncio.Task] = []
+
+        self.submitted = 0
+        self.deduplicated = 0
+        self.completed = 0
+        self.failed = 0
+        self.expired = 0
+        self.rejected = 0
+        self.requeued = 0
+
+    def start(self) -> None:
+        """워커 시작 (lifespan에서 호출)"""
+        if not self._tasks:
+            self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def submit(self, request: ImageRequest) -> ImageJob:
+        """작업 제출 (큐가 가득 차면 asyncio.QueueFull)"""
+        self._purge_expired()
+        stage_key = game_alias(request.gameId, request.stageNumber)
+        existing = self._jobs.get(self._by_stage.get(stage_key, ""))
+        if existing is not None and existing.status != "failed":
+            self.deduplicated += 1
+            return existing
+
+        job = ImageJob(job_id=uuid.uuid4().hex, request=request)
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            self.rejected += 1
+            raise
+        self._jobs[job.job_id] = job
+        self._by_stage[stage_key] = job.job_id
+        self.submitted += 1
+        self.start()
+        return job
+
+    def requeue(self, job: ImageJob) -> ImageJob:
+        """결과 이미지가 저장소 용량 정리로 삭제된 완료 작업을 다시 생성 (큐가 가득 차면 asyncio.QueueFull)"""
+        if job.status != "done":
+            return job  # 이미 다른 요청이 다시 넣음
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            self.rejected += 1
+            raise
+        job.status = "queued"
+        job.image = None
+        job.finished_at = None
+        job.done = asyncio.Event()
+        self.requeued += 1
+        self.start()
+        return job
+
+    def get(self, job_id: str) -> Optional[ImageJob]:
+        self._purge_expired()
+        return self._jobs.get(job_id)
+
+    async def wait(self, job: ImageJob, timeout: float) -> ImageJob:
+        """long-poll: 작업이 끝나거나 timeout이 지날 때까지 대기"""
+        if timeout > 0 and not job.done.is_set():
+            try:
+                await asyncio.wait_for(job.done.wait(), timeout=min(timeout, config.IMAGE_JOB_MAX_WAIT_SECONDS))
+            except asyncio.TimeoutError:
+                pass
+        return job
+
+    async def _worker(self) -> None:
+        while True:
+            job = await self._queue.get()
+            try:
+                job.status = "running"
+                with span("image_jobs.job", job_id=job.job_id, game_id=job.request.gameId):
+                    job.image = await resolve_image(job.request)
+                job.status = "done"
+                self.completed += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                job.status = "failed"
+                job.error = str(e)
+                self.failed += 1
+                log.warning("Image job failed", job_id=job.job_id, error=str(e))
+            finally:
+                job.finished_at = time.monotonic()
+                job.done.set()
+                self._queue.task_done()
+
+    def _purge_expired(self) -> None:
+        now = time.monotonic()
+        for job_id, job in list(self._jobs.items()):
+            if job.finished_at is not None and now - job.finished_at > self.result_ttl:
+                del self._jobs[job_id]
+                stage_key = game_alias(job.request.gameId, job.request.stageNumber)
+                if self._by_stage.get(stage_key) == job_id:
+                    del self._by_stage[stage_key]
+                self.expired += 1
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "workers": self.workers,
+            "queued": self._queue.qsize(),
+            "running": sum(1 for job in self._jobs.values() if job.status == "running"),
+            "jobs": len(self._jobs),
+            "submitted": self.submitted,
+            "deduplicated": self.deduplicated,
+            "completed": self.completed,
+            "failed": self.failed,
+            "expired": self.expired,
+            "rejected": self.rejected,
+            "requeued": self.requeued,
+        }
+
+
+@lru_cache()
+def get_image_job_queue() -> ImageJobQueue:
+    """프로세스 공용 ImageJobQueue"""
+    return ImageJobQueue()
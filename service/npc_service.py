@@ -1,37 +1,128 @@
 # service/npc_service.py
 
-from typing import Dict
+import asyncio
+from typing import Dict, Optional, Tuple
+from core.config import config
+from core.log import get_logger
+from core.tracing import traced
 from models.story_generator import StoryGenerator
 from models.npc_handler import NPCHandler
 from schemas.story_class import NPCResponse, NPCChatRequest
+from service.session_backend import SessionBackend, SessionNotFoundError
+from service.session_store import GameSession
+
+log = get_logger("npc_service")
 
 class NPCService:
-    def __init__(self, story_generator: StoryGenerator, npc_handler: NPCHandler):
+    def __init__(self, story_generator: StoryGenerator, npc_handler: NPCHandler, session_backend: SessionBackend):
         self.story_generator = story_generator
         self.npc_handler = npc_handler  # NPCHandler 인스턴스를 직접 받음
+        self.session_backend = session_backend
+        self.precompute_enabled = config.NPC_PRECOMPUTE_ENABLED
+        self._advice_tasks: Dict[str, Tuple[int, int, asyncio.Task]] = {}  # game_id별 (turn_count, NPC 대화 수, 조언 미리 계산 작업)
+
+        self.precomputed = 0
+        self.precompute_errors = 0
+        self.stored_hits = 0
+        self.joined_hits = 0
+        self.misses = 0
+
+    async def _get_session(self, game_id: str) -> GameSession:
+        """게임 세션에서 현재 스토리와 선택지 확인"""
+        session = await self.session_backend.get(game_id)
+        if session is None or not session.turns:
+            raise ValueError(f"No story context found for game_id: {game_id}")
+
+        if not session.story or not session.choices:
+            raise ValueError("Invalid story format in context")
+
+        return session
+
+    def precompute_advice(self, session: GameSession) -> None:
+        """스테이지가 저장되면 해당 스테이지의 NPC 조언을 백그라운드에서 미리 계산"""
+        if not self.precompute_enabled or not session.story or not session.choices:
+            return
+        self.discard(session.game_id)
+        task = asyncio.create_task(self._precompute(
+            session.game_id, session.turn_count, session.story,
+            list(session.choices), list(session.npc_history)
+        ))
+        self._advice_tasks[session.game_id] = (session.turn_count, len(session.npc_history), task)
+
+        def _cleanup(done: asyncio.Task) -> None:
+            if self._advice_tasks.get(session.game_id, (0, 0, None))[2] is done:
+                del self._advice_tasks[session.game_id]
+            if not done.cancelled() and done.exception() is not None:
+                self.precompute_errors += 1
+                log.warning("Failed to precompute advice", game_id=session.game_id, error=str(done.exception()))
+
+        task.add_done_callback(_cleanup)
+
+    @traced("npc_service.precompute")
+    async def _precompute(self, game_id: str, turn_count: int, story: str, choices, npc_history) -> Dict:
+        advice = await self.npc_handler.provide_advice(story, choices, npc_history)
+
+        # 계산하는 동안 스테이지와 NPC 대화 기록이 바뀌지 않았을 때만 세션에 저장
+        def store(latest: GameSession) -> Optional[bool]:
+            if latest.turn_count != turn_count or len(latest.npc_history) != len(npc_history):
+                return False
+            latest.npc_advice = advice
+            latest.npc_advice_turn = turn_count
 
+        await self.session_backend.update(game_id, store)
+        self.precomputed += 1
+        return advice
+
+    def discard(self, game_id: str) -> None:
+        """진행 중인 미리 계산 작업 취소 (새 스테이지, 엔딩)"""
+        _, _, task = self._advice_tasks.pop(game_id, (0, 0, None))
+        if task is not None and not task.done():
+            task.cancel()
+
+    async def _take_advice(self, session: GameSession) -> Optional[Dict]:
+        """현재 스테이지용으로 저장된 조언 또는 진행 중인 계산 결과 (한 번만 사용)"""
+        if session.npc_advice and session.npc_advice_turn == session.turn_count:
+            self.stored_hits += 1
+            return session.npc_advice
+
+        turn_count, history_length, task = self._advice_tasks.get(session.game_id, (0, 0, None))
+        if task is not None and turn_count == session.turn_count and history_length == len(session.npc_history):
+            try:
+                advice = await asyncio.shield(task)
+            except asyncio.CancelledError:
+                if not task.cancelled():
+                    raise
+            except Exception:
+                pass
+            else:
+                self.joined_hits += 1
+                return advice
+
+        # 조언을 직접 생성하므로 맞지 않거나 실패한 미리 계산 작업은 버림 (늦게 끝나도 저장하지 않음)
+        if task is not None and self._advice_tasks.get(session.game_id, (0, 0, None))[2] is task:
+            self.discard(session.game_id)
+        self.misses += 1
+        return None
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "precompute_enabled": self.precompute_enabled,
+            "running": len(self._advice_tasks),
+            "precomputed": self.precomputed,
+            "precompute_errors": self.precompute_errors,
+            "stored_hits": self.stored_hits,
+            "joined_hits": self.joined_hits,
+            "misses": self.misses,
+        }
+
+    @traced("npc_service.advice")
     async def get_npc_advice(self, game_id: str) -> str:
         """NPC 조언 얻기"""
         try:
-            # 스토리 컨텍스트 가져오기
-            story_context = self.story_generator.story_memory.load_memory_variables({})
-            history = story_context.get("history", [])
-            
-            if not history:
-                raise ValueError(f"No story context found for game_id: {game_id}")
-
-            # 마지막 컨텍스트에서 스토리와 선택지 추출
-            last_message = history[-1].content if hasattr(history[-1], "content") else str(history[-1])
-            
-            if "Story:" not in last_message or "Choices:" not in last_message:
-                raise ValueError("Invalid story format in context")
-
-            story_part = last_message.split("Story:")[1].split("Choices:")[0].strip()
-            choices_part = last_message.split("Choices:")[1].strip("[] \n").split(",")
-            choices = [choice.strip() for choice in choices_part]
+            session = await self._get_session(game_id)
 
             # NPC 인사말 생성
-            npc_message = await self.npc_handler.generate_greeting(story_part, choices)
+            npc_message = await self.npc_handler.generate_greeting(session.story, session.choices)
         
             return {
                 "npc_message": npc_message,
@@ -39,31 +130,31 @@ class NPCService:
             }
 
         except Exception as e:
-            print(f"[NPC Service] Error in get_npc_advice: {str(e)}")
+            log.error("Failed to get NPC advice", game_id=game_id, error=str(e))
             raise Exception(f"Error getting NPC advice: {str(e)}")
 
+    @traced("npc_service.chat")
     async def chat_with_npc(self, game_id: str) -> NPCResponse:
         """NPC가 선택지에 대한 조언과 생존율 제공"""
         try:
-            # 스토리 컨텍스트 가져오기
-            story_context = self.story_generator.story_memory.load_memory_variables({})
-            history = story_context.get("history", [])
-            
-            if not history:
-                raise ValueError(f"No story context found for game_id: {game_id}")
-
-            # 마지막 컨텍스트에서 스토리와 선택지 추출
-            last_message = history[-1].content if hasattr(history[-1], "content") else str(history[-1])
-            
-            if "Story:" not in last_message or "Choices:" not in last_message:
-                raise ValueError("Invalid story format in context")
-
-            story_part = last_message.split("Story:")[1].split("Choices:")[0].strip()
-            choices_part = last_message.split("Choices:")[1].strip("[] \n").split(",")
-            choices = [choice.strip() for choice in choices_part]
-
-            # NPC 핸들러를 통해 직접 조언 얻기
-            advice = await self.npc_handler.provide_advice(story_part, choices)
+            session = await self._get_session(game_id)
+
+            # 미리 계산된 조언이 있으면 사용, 없으면 NPC 핸들러를 통해 게임별 대화 기록과 함께 조언 얻기
+            advice = await self._take_advice(session)
+            if advice is None:
+                advice = await self.npc_handler.provide_advice(
+                    session.story, session.choices, session.npc_history
+                )
+
+            # 미리 계산된 조언은 한 번만 사용 (같은 스테이지에서 다시 물으면 새 대화 기록으로 생성)
+            memory = advice["memory"]
+
+            def record(latest: GameSession) -> None:
+                latest.npc_advice = None
+                latest.add_npc_turn(memory["input"], memory["output"])
+
+            if await self.session_backend.update(game_id, record) is None:
+                raise SessionNotFoundError(f"Session not found or expired for game_id: {game_id}")
         
             return NPCResponse(
                 response=advice["response"],
@@ -72,5 +163,5 @@ class NPCService:
             )
 
         except Exception as e:
-            print(f"[NPC Service] Error in chat_with_npc: {str(e)}")
-            raise Exception(f"Error in NPC chat: {str(e)}")
\ No newline at end of file
+            log.error("Failed to chat with NPC", game_id=game_id, error=str(e))
+            raise Exception(f"Error in NPC chat: {str(e)}")
@@ -0,0 +1,438 @@
+# service/session_backend.py
+
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+from core.config import config
+from service.session_store import GameSession, SessionStore
+
+
+class SessionNotFoundError(LookupError):
+    """세션이 없거나 만료됨 (세션은 /start에서만 생성)"""
+
+
+class SessionConflictError(RuntimeError):
+    """동시 갱신 충돌 (재시도 한도 초과, 또는 다른 요청이 이미 스테이지를 진행함)"""
+
+
+class _Batcher:
+    """같은 이벤트 루프 틱(또는 max_delay) 안에 들어온 요청을 한 번의 백엔드 호출로 묶음"""
+
+    def __init__(
+        self,
+        flush: Callable[[Dict[str, Any]], Awaitable[Optional[Dict[str, Any]]]],
+        max_batch: int,
+        max_delay: float,
+    ):
+        self._flush = flush
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self._items: Dict[str, Any] = {}
+        self._waiters: Dict[str, List[asyncio.Future]] = {}
+        self._handle: Optional[asyncio.TimerHandle] = None
+        self._tasks = set()
+
+        self.batches = 0
+        self.items = 0
+
+    async def submit(self, key: str, item: Any = None) -> Any:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._items[key] = item  # 같은 키는 마지막 값만 반영
+        self._waiters.setdefault(key, []).append(future)
+
+        if len(self._items) >= self.max_batch:
+            self._start_flush()
+        elif self._handle is None:
+            self._handle = loop.call_later(self.max_delay, self._start_flush)
+
+        return await future
+
+    def _start_flush(self) -> None:
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+        if not self._items:
+            return
+
+        items, waiters = self._items, self._waiters
+        self._items, self._waiters = {}, {}
+        task = asyncio.ensure_future(self._run(items, waiters))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, items: Dict[str, Any], waiters: Dict[str, List[asyncio.Future]]) -> None:
+        self.batches += 1
+        self.items += len(items)
+        try:
+            results = await self._flush(items) or {}
+        except Exception as e:
+            for futures in waiters.values():
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(e)
+            return
+
+        for key, futures in waiters.items():
+            for future in futures:
+                if not future.done():
+                    future.set_result(results.get(key))
+
+
+class SessionBackend(ABC):
+    """게임 세션 저장소 인터페이스
+
+    get/put은 동시에 들어온 요청을 모아 get_many/put_many 한 번으로 처리합니다.
+    이미 있는 세션의 변경은 update로 (put은 세션 전체를 덮어쓰므로 새 세션 생성에만 사용)
+    """
+
+    def __init__(
+        self,
+        batch_max: int = config.SESSION_BATCH_MAX,
+        batch_delay: float = config.SESSION_BATCH_DELAY_MS / 1000,
+        update_retries: int = config.SESSION_UPDATE_RETRIES,
+    ):
+        self._read_batcher = _Batcher(self._flush_reads, batch_max, batch_delay)
+        self._write_batcher = _Batcher(self._flush_writes, batch_max, batch_delay)
+        self.update_retries = max(update_retries, 1)
+        self._update_locks: Dict[str, list] = {}  # game_id -> [asyncio.Lock, 대기 중인 update 수]
+        self.updates = 0
+        self.update_conflicts = 0
+
+    @abstractmethod
+    async def get_many(self, game_ids: Iterable[str]) -> Dict[str, GameSession]:
+        """여러 세션을 한 번에 조회 (없는 세션은 결과에서 제외)"""
+
+    @abstractmethod
+    async def put_many(self, sessions: Iterable[GameSession]) -> None:
+        """여러 세션을 한 번에 저장"""
+
+    @abstractmethod
+    async def delete(self, game_id: str) -> None:
+        """세션 삭제"""
+
+    @abstractmethod
+    async def _read_for_update(self, game_id: str) -> Tuple[Optional[GameSession], Any]:
+        """(세션, 변경 확인용 토큰) - 세션이 없으면 (None, None)"""
+
+    @abstractmethod
+    async def _write_if_unchanged(self, session: GameSession, token: Any) -> bool:
+        """읽은 뒤 다른 쓰기가 없었을 때만 저장 (저장했으면 True)"""
+
+    async def close(self) -> None:
+        """리소스 정리"""
+
+    async def _flush_reads(self, items: Dict[str, Any]) -> Dict[str, GameSession]:
+        return await self.get_many(list(items))
+
+    async def _flush_writes(self, items: Dict[str, Any]) -> None:
+        await self.put_many(list(items.values()))
+
+    async def get(self, game_id: str) -> Optional[GameSession]:
+        return await self._read_batcher.submit(game_id)
+
+    async def put(self, session: GameSession) -> None:
+        await self._write_batcher.submit(session.game_id, session)
+
+    @asynccontextmanager
+    async def _update_lock(self, game_id: str):
+        entry = self._update_locks.setdefault(game_id, [asyncio.Lock(), 0])
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                yield
+        finally:
+            entry[1] -= 1
+            if entry[1] == 0:
+                del self._update_locks[game_id]
+
+    async def update(self, game_id: str, mutate: Callable[[GameSession], Optional[bool]]) -> Optional[GameSession]:
+        """최신 세션에 mutate를 적용해 저장 (세션이 없으면 None)
+
+        같은 프로세스에서는 게임별 잠금으로 순서대로 실행하고, 다른 워커/컨테이너와의 충돌은
+        저장 시점에 확인해 다시 읽고 mutate를 재적용합니다 (update_retries회까지).
+        mutate는 여러 번 호출될 수 있으므로 세션 변경만 하고, False를 반환하면 저장하지 않습니다.
+        """
+        async with self._update_lock(game_id):
+            for _ in range(self.update_retries):
+                session, token = await self._read_for_update(game_id)
+                if session is None:
+                    return None
+                if mutate(session) is False:
+                    return session
+                if await self._write_if_unchanged(session, token):
+                    self.updates += 1
+                    return session
+                self.update_conflicts += 1
+        raise SessionConflictError(f"Concurrent updates kept conflicting for game_id: {game_id}")
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "read_batches": self._read_batcher.batches,
+            "read_items": self._read_batcher.items,
+            "write_batches": self._write_batcher.batches,
+            "write_items": self._write_batcher.items,
+            "updates": self.updates,
+            "update_conflicts": self.update_conflicts,
+        }
+
+
+class InMemorySessionBackend(SessionBackend):
+    """프로세스 메모리 백엔드 (단일 워커 전용, 배치 없이 바로 처리)"""
+
+    def __init__(self, store: Optional[SessionStore] = None):
+        super().__init__()
+        self.store = store or SessionStore()
+
+    async def get_many(self, game_ids: Iterable[str]) -> Dict[str, GameSession]:
+        sessions = {}
+        for game_id in game_ids:
+            session = self.store.get(game_id)
+            if session is not None:
+                sessions[game_id] = session
+        return sessions
+
+    async def put_many(self, sessions: Iterable[GameSession]) -> None:
+        for session in sessions:
+            self.store.put(session)
+
+    async def delete(self, game_id: str) -> None:
+        self.store.delete(game_id)
+
+    async def get(self, game_id: str) -> Optional[GameSession]:
+        return self.store.get(game_id)
+
+    async def put(self, session: GameSession) -> None:
+        self.store.put(session)
+
+    async def _read_for_update(self, game_id: str) -> Tuple[Optional[GameSession], Any]:
+        # 저장된 객체를 그대로 바꾸고, mutate와 저장 사이에 await가 없으므로 충돌이 없음
+        return self.store.get(game_id), None
+
+    async def _write_if_unchanged(self, session: GameSession, token: Any) -> bool:
+        self.store.put(session)
+        return True
+
+    def stats(self) -> Dict[str, int]:
+        return {**self.store.stats(), "updates": self.updates}
+
+
+class SQLiteSessionBackend(SessionBackend):
+    """로컬 SQLite(WAL) 백엔드 - 같은 호스트의 여러 uvicorn 워커가 세션을 공유"""
+
+    def __init__(self, path: str = config.SESSION_SQLITE_PATH, ttl_seconds: float = config.SESSION_TTL_SECONDS):
+        super().__init__()
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        # sqlite 호출은 전용 스레드 하나에서만 실행
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="session-sqlite")
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            "game_id TEXT PRIMARY KEY, data TEXT NOT NULL, last_access REAL NOT NULL, "
+            "version INTEGER NOT NULL DEFAULT 0)"
+        )
+        try:
+            # version 컬럼이 없던 기존 파일
+            self._conn.execute("ALTER TABLE sessions ADD COLUMN version INTEGER NOT NULL DEFAULT 0")
+        except sqlite3.OperationalError:
+            pass
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_sessions_last_access ON sessions(last_access)")
+        self._last_purge = time.time()
+
+    async def _run(self, fn, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, fn, *args)
+
+    def _get_many_sync(self, game_ids: List[str]) -> Dict[str, GameSession]:
+        if not game_ids:
+            return {}
+        cutoff = time.time() - self.ttl_seconds if self.ttl_seconds > 0 else 0
+        placeholders = ",".join("?" * len(game_ids))
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT game_id, data FROM sessions WHERE game_id IN ({placeholders}) AND last_access >= ?",
+                (*game_ids, cutoff),
+            ).fetchall()
+        return {game_id: GameSession.from_dict(json.loads(data)) for game_id, data in rows}
+
+    def _put_many_sync(self, rows: List[tuple]) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                # 덮어쓸 때도 version을 올려 진행 중인 update가 충돌을 감지하도록 함
+                self._conn.executemany(
+                    "INSERT INTO sessions (game_id, data, last_access) VALUES (?, ?, ?) "
+                    "ON CONFLICT(game_id) DO UPDATE SET "
+                    "data = excluded.data, last_access = excluded.last_access, version = version + 1",
+                    rows,
+                )
+                # 만료 세션 정리는 주기적으로만 수행
+                if self.ttl_seconds > 0 and now - self._last_purge > self.ttl_seconds / 10:
+                    self._conn.execute("DELETE FROM sessions WHERE last_access < ?", (now - self.ttl_seconds,))
+                    self._last_purge = now
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def _read_for_update_sync(self, game_id: str) -> Tuple[Optional[GameSession], Any]:
+        cutoff = time.time() - self.ttl_seconds if self.ttl_seconds > 0 else 0
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data, version FROM sessions WHERE game_id = ? AND last_access >= ?",
+                (game_id, cutoff),
+            ).fetchone()
+        if row is None:
+            return None, None
+        return GameSession.from_dict(json.loads(row[0])), row[1]
+
+    def _write_if_unchanged_sync(self, game_id: str, data: str, last_access: float, version: int) -> bool:
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE sessions SET data = ?, last_access = ?, version = version + 1 "
+                "WHERE game_id = ? AND version = ?",
+                (data, last_access, game_id, version),
+            )
+        return cursor.rowcount == 1
+
+    def _delete_sync(self, game_id: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM sessions WHERE game_id = ?", (game_id,))
+
+    async def get_many(self, game_ids: Iterable[str]) -> Dict[str, GameSession]:
+        return await self._run(self._get_many_sync, list(game_ids))
+
+    async def put_many(self, sessions: Iterable[GameSession]) -> None:
+        rows = []
+        for session in sessions:
+            session.last_access = time.time()
+            rows.append((session.game_id, json.dumps(session.to_dict(), ensure_ascii=False), session.last_access))
+        await self._run(self._put_many_sync, rows)
+
+    async def delete(self, game_id: str) -> None:
+        await self._run(self._delete_sync, game_id)
+
+    async def _read_for_update(self, game_id: str) -> Tuple[Optional[GameSession], Any]:
+        return await self._run(self._read_for_update_sync, game_id)
+
+    async def _write_if_unchanged(self, session: GameSession, token: Any) -> bool:
+        session.last_access = time.time()
+        data = json.dumps(session.to_dict(), ensure_ascii=False)
+        return await self._run(self._write_if_unchanged_sync, session.game_id, data, session.last_access, token)
+
+    async def close(self) -> None:
+        await self._run(self._conn.close)
+        self._executor.shutdown(wait=False)
+
+
+class InMemoryKVClient:
+    """외부 KV 저장소(Redis 등) 대용 - mget/mset/compare_and_set/delete 인터페이스만 흉내냄"""
+
+    def __init__(self):
+        self._data: Dict[str, tuple] = {}
+
+    async def mget(self, keys: List[str]) -> List[Optional[bytes]]:
+        now = time.time()
+        values = []
+        for key in keys:
+            entry = self._data.get(key)
+            if entry is None or (entry[1] and entry[1] < now):
+                self._data.pop(key, None)
+                values.append(None)
+            else:
+                values.append(entry[0])
+        return values
+
+    async def mset(self, mapping: Dict[str, bytes], ttl: Optional[float] = None) -> None:
+        expires_at = time.time() + ttl if ttl else 0
+        for key, value in mapping.items():
+            self._data[key] = (value, expires_at)
+
+    async def compare_and_set(self, key: str, expected: bytes, value: bytes, ttl: Optional[float] = None) -> bool:
+        entry = self._data.get(key)
+        if entry is None or entry[0] != expected or (entry[1] and entry[1] < time.time()):
+            return False
+        self._data[key] = (value, time.time() + ttl if ttl else 0)
+        return True
+
+    async def delete(self, key: str) -> None:
+        self._data.pop(key, None)
+
+    async def close(self) -> None:
+        self._data.clear()
+
+
+class KVSessionBackend(SessionBackend):
+    """외부 KV 저장소 백엔드 - 여러 컨테이너가 세션을 공유
+
+    client는 async mget(keys) / mset(mapping, ttl) / compare_and_set(key, expected, value, ttl) / delete(key)를
+    제공해야 합니다. compare_and_set은 현재 값이 expected와 같을 때만 쓰고 True를 반환합니다
+    (Redis라면 WATCH/MULTI 또는 Lua 스크립트).
+    """
+
+    def __init__(self, client=None, prefix: str = "session:", ttl_seconds: float = config.SESSION_TTL_SECONDS):
+        super().__init__()
+        self.client = client or InMemoryKVClient()
+        self.prefix = prefix
+        self.ttl_seconds = ttl_seconds
+
+    async def get_many(self, game_ids: Iterable[str]) -> Dict[str, GameSession]:
+        game_ids = list(game_ids)
+        values = await self.client.mget([self.prefix + game_id for game_id in game_ids])
+        return {
+            game_id: GameSession.from_dict(json.loads(value))
+            for game_id, value in zip(game_ids, values)
+            if value is not None
+        }
+
+    async def put_many(self, sessions: Iterable[GameSession]) -> None:
+        mapping = {}
+        for session in sessions:
+            session.last_access = time.time()
+            mapping[self.prefix + session.game_id] = json.dumps(session.to_dict(), ensure_ascii=False).encode()
+        if mapping:
+            await self.client.mset(mapping, ttl=self.ttl_seconds or None)
+
+    async def delete(self, game_id: str) -> None:
+        await self.client.delete(self.prefix + game_id)
+
+    async def _read_for_update(self, game_id: str) -> Tuple[Optional[GameSession], Any]:
+        value = (await self.client.mget([self.prefix + game_id]))[0]
+        if value is None:
+            return None, None
+        return GameSession.from_dict(json.loads(value)), value
+
+    async def _write_if_unchanged(self, session: GameSession, token: Any) -> bool:
+        session.last_access = time.time()
+        value = json.dumps(session.to_dict(), ensure_ascii=False).encode()
+        return await self.client.compare_and_set(
+            self.prefix + session.game_id, token, value, ttl=self.ttl_seconds or None
+        )
+
+    async def close(self) -> None:
+        await self.client.close()
+
+
+def create_session_backend(kind: str = config.SESSION_BACKEND) -> SessionBackend:
+    """설정값(SESSION_BACKEND)에 맞는 세션 백엔드 생성"""
+    kind = (kind or "memory").lower()
+    if kind == "memory":
+        return InMemorySessionBackend()
+    if kind == "sqlite":
+        return SQLiteSessionBackend()
+    if kind == "kv":
+        return KVSessionBackend()
+    raise ValueError(f"Unknown session backend: {kind}")
@@ -0,0 +1,229 @@
+# service/session_store.py
+
+import copy
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import ClassVar, Dict, List, Optional
+
+from core.config import config
+
+
+@dataclass
+class GameSession:
+    """게임(game_id) 단위의 압축된 세션 상태"""
+    max_turns: ClassVar[int] = config.SESSION_HISTORY_TURNS
+    max_pending_turns: ClassVar[int] = config.SESSION_MAX_PENDING_TURNS
+
+    game_id: str
+    genre: str = "Survival"
+    stage: int = 1
+    story: str = ""
+    choices: List[str] = field(default_factory=list)
+    turns: List[Dict[str, str]] = field(default_factory=list)
+    npc_history: List[Dict[str, str]] = field(default_factory=list)
+    npc_advice: Optional[Dict] = None  # 미리 계산된 NPC 조언 (provide_advice 결과)
+    npc_advice_turn: int = 0  # npc_advice가 계산된 시점의 turn_count
+    summary: str = ""
+    summarized_turns: int = 0  # summary에 반영된 누적 턴 수
+    turn_count: int = 0  # 지금까지 저장된 누적 턴 수
+    last_access: float = field(default_factory=time.time)
+
+    def add_turn(self, user_input: str, output: str) -> None:
+        """스토리 턴 저장 (최근 max_turns개만 유지, 요약 전 턴은 trim_turns 참고)"""
+        self.turns.append({"input": user_input, "output": output})
+        self.turn_count += 1
+        self.trim_turns()
+
+    def trim_turns(self) -> None:
+        """최근 max_turns개만 남기고 정리
+
+        누적 요약에 아직 반영되지 않은 턴은 요약이 늦어져도 빠지지 않도록
+        max_pending_turns까지 남겨 두었다가 요약 반영 후 정리합니다.
+        """
+        pending = min(self.turn_count - self.summarized_turns, self.max_pending_turns)
+        keep = max(self.max_turns, pending)
+        if len(self.turns) > keep:
+            del self.turns[:-keep]
+
+    def add_npc_turn(self, user_input: str, output: str) -> None:
+        """NPC 대화 기록 저장 (최근 max_turns개만 유지)"""
+        self.npc_history.append({"input": user_input, "output": output})
+        if len(self.npc_history) > self.max_turns:
+            del self.npc_history[:-self.max_turns]
+
+    def copy(self) -> "GameSession":
+        """생성 작업용 사본 (메모리 백엔드의 저장 객체를 LLM 호출 중에 직접 바꾸지 않도록)"""
+        return copy.deepcopy(self)
+
+    def apply_stage(self, other: "GameSession") -> None:
+        """other에서 생성된 스테이지 필드만 반영 (NPC 대화, 조언, 요약은 그대로 유지)"""
+        self.genre = other.genre
+        self.stage = other.stage
+        self.story = other.story
+        self.choices = list(other.choices)
+        self.turns = [dict(turn) for turn in other.turns]
+        self.turn_count = other.turn_count
+        self.trim_turns()  # 생성 중 반영된 요약 기준으로 정리
+
+    def history_messages(self, last_n: Optional[int] = None) -> List[str]:
+        """입력/출력을 순서대로 펼친 대화 기록 (last_n: 최근 n턴만)"""
+        turns = self.turns[-last_n:] if last_n else self.turns
+        messages = []
+        for turn in turns:
+            messages.append(turn["input"])
+            messages.append(turn["output"])
+        return messages
+
+    def to_dict(self) -> Dict:
+        """직렬화용 dict 변환"""
+        return {
+            "game_id": self.game_id,
+            "genre": self.genre,
+            "stage": self.stage,
+            "story": self.story,
+            "choices": self.choices,
+            "turns": self.turns,
+            "npc_history": self.npc_history,
+            "npc_advice": self.npc_advice,
+            "npc_advice_turn": self.npc_advice_turn,
+            "summary": self.summary,
+            "summarized_turns": self.summarized_turns,
+            "turn_count": self.turn_count,
+            "last_access": self.last_access,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "GameSession":
+        """to_dict 결과로부터 세션 복원 (모르는 키는 무시)"""
+        known = {name: data[name] for name in cls.__dataclass_fields__ if name in data}
+        return cls(**known)
+
+    def size_bytes(self) -> int:
+        """메모리 사용량 추정치 (문자열 길이 기준)"""
+        size = len(self.game_id) + len(self.genre) + len(self.story) + len(self.summary)
+        size += sum(len(choice) for choice in self.choices)
+        for turn in self.turns:
+            size += len(turn["input"]) + len(turn["output"])
+        for turn in self.npc_history:
+            size += len(turn["input"]) + len(turn["output"])
+        if self.npc_advice:
+            size += len(self.npc_advice["memory"]["output"])
+        return size
+
+
+class SessionStore:
+    """LRU + 유휴 TTL 기반으로 메모리 사용량이 제한된 게임 세션 저장소"""
+
+    def __init__(
+        self,
+        max_sessions: int = config.SESSION_MAX_GAMES,
+        ttl_seconds: float = config.SESSION_TTL_SECONDS,
+        max_bytes: int = config.SESSION_MAX_BYTES,
+    ):
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._sessions: "OrderedDict[str, GameSession]" = OrderedDict()
+        self._sizes: Dict[str, int] = {}
+        self._total_bytes = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions_lru = 0
+        self.evictions_ttl = 0
+        self.evictions_bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def _is_expired(self, session: GameSession, now: float) -> bool:
+        return self.ttl_seconds > 0 and now - session.last_access > self.ttl_seconds
+
+    def _remove(self, game_id: str) -> None:
+        self._sessions.pop(game_id, None)
+        self._total_bytes -= self._sizes.pop(game_id, 0)
+
+    def get(self, game_id: str) -> Optional[GameSession]:
+        """세션 조회 (만료된 세션은 제거 후 None 반환)"""
+        session = self._sessions.get(game_id)
+        if session is None:
+            self.misses += 1
+            return None
+
+        now = time.time()
+        if self._is_expired(session, now):
+            self._remove(game_id)
+            self.evictions_ttl += 1
+            self.misses += 1
+            return None
+
+        session.last_access = now
+        self._sessions.move_to_end(game_id)
+        self.hits += 1
+        return session
+
+    def get_or_create(self, game_id: str, genre: str = "Survival") -> GameSession:
+        """세션이 없으면 새로 생성"""
+        session = self.get(game_id)
+        if session is None:
+            session = GameSession(game_id=game_id, genre=genre)
+            self.put(session)
+        return session
+
+    def put(self, session: GameSession) -> None:
+        """세션 저장 후 용량 초과 시 오래된 세션부터 제거"""
+        game_id = session.game_id
+        session.last_access = time.time()
+
+        self._total_bytes -= self._sizes.get(game_id, 0)
+        size = session.size_bytes()
+        self._sizes[game_id] = size
+        self._total_bytes += size
+        self._sessions[game_id] = session
+        self._sessions.move_to_end(game_id)
+
+        self._evict()
+
+    def delete(self, game_id: str) -> None:
+        self._remove(game_id)
+
+    def _evict(self) -> None:
+        now = time.time()
+
+        # 1) 유휴 TTL 만료 세션 (LRU 순서이므로 앞쪽부터 확인)
+        while self._sessions:
+            oldest_id, oldest = next(iter(self._sessions.items()))
+            if not self._is_expired(oldest, now):
+                break
+            self._remove(oldest_id)
+            self.evictions_ttl += 1
+
+        # 2) 세션 수 제한
+        while len(self._sessions) > self.max_sessions:
+            oldest_id = next(iter(self._sessions))
+            self._remove(oldest_id)
+            self.evictions_lru += 1
+
+        # 3) 메모리 제한 (가장 최근 세션 하나는 유지)
+        while self._total_bytes > self.max_bytes and len(self._sessions) > 1:
+            oldest_id = next(iter(self._sessions))
+            self._remove(oldest_id)
+            self.evictions_bytes += 1
+
+    def purge_expired(self) -> int:
+        """만료된 세션 일괄 정리"""
+        before = self.evictions_ttl
+        self._evict()
+        return self.evictions_ttl - before
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "sessions": len(self._sessions),
+            "bytes": self._total_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions_lru": self.evictions_lru,
+            "evictions_ttl": self.evictions_ttl,
+            "evictions_bytes": self.evictions_bytes,
+        }
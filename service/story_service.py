@@ -1,33 +1,127 @@
 # service/story_service.py
-from typing import List, Dict, Optional, Union
+import asyncio
+import uuid
+from typing import AsyncIterator, List, Dict, Optional, Tuple, Union
+from core.config import config
+from core.log import get_logger
+from core.tracing import traced
 from models.story_generator import StoryGenerator
 from models.npc_handler import NPCHandler  # NPCHandler import 추가
 from service.npc_service import NPCService
+from service.session_backend import SessionBackend, SessionConflictError, SessionNotFoundError, create_session_backend
+from service.session_store import GameSession
 from schemas.story_class import (
     StoryGenerationChatRequest,
     NPCChatRequest,
     NPCResponse
 )
 
+log = get_logger("story_service")
+
 class StoryService:
-    def __init__(self, story_generator: StoryGenerator):
+    def __init__(self, story_generator: StoryGenerator, session_backend: Optional[SessionBackend] = None):
         self.story_generator = story_generator
-        self.active_stories: Dict[str, StoryGenerator] = {}
+        self.session_backend = session_backend or create_session_backend()  # game_id별 세션 저장소
         self.npc_handler = NPCHandler(api_key=story_generator.api_key)  # NPCHandler를 직접 초기화
-        self.npc_service = NPCService(story_generator=story_generator, npc_handler=self.npc_handler)  # npc_handler 전달
+        self.npc_service = NPCService(
+            story_generator=story_generator,
+            npc_handler=self.npc_handler,
+            session_backend=self.session_backend
+        )  # npc_handler 전달
+        self._summary_tasks: Dict[str, asyncio.Task] = {}  # game_id별 누적 요약 갱신 작업
+
+    def _after_stage(self, session: GameSession) -> None:
+        """스테이지 저장 직후 백그라운드 작업 시작 (누적 요약, 다음 스테이지 미리 생성, NPC 조언)"""
+        self._schedule_summary(session.game_id)
+        self.story_generator.speculator.speculate(session)
+        self.npc_service.precompute_advice(session)
+
+    def _schedule_summary(self, game_id: str) -> None:
+        """턴 저장 후 누적 요약을 백그라운드에서 갱신 (같은 게임은 순서대로)"""
+        previous = self._summary_tasks.get(game_id)
+        task = asyncio.create_task(self._update_summary(game_id, previous))
+        self._summary_tasks[game_id] = task
+
+        def _cleanup(done: asyncio.Task) -> None:
+            if self._summary_tasks.get(game_id) is done:
+                del self._summary_tasks[game_id]
+
+        task.add_done_callback(_cleanup)
+
+    @traced("story_service.update_summary")
+    async def _update_summary(self, game_id: str, previous: Optional[asyncio.Task] = None) -> None:
+        if previous is not None:
+            await asyncio.wait([previous])
 
-    async def generate_initial_story(self, genre: str) -> dict:
+        memory = self.story_generator.summary_memory
         try:
-            result = await self.story_generator.generate_initial_story(genre)
+            session = await self.session_backend.get(game_id)
+            if session is None or not memory.pending_turns(session):
+                return
+            upto_turn = session.turn_count
+            summary = await memory.summarize(session)
+
+            # LLM 호출 중 다른 요청이 세션을 갱신했을 수 있으므로 최신 세션에 요약만 반영
+            await self.session_backend.update(game_id, lambda latest: memory.apply(latest, summary, upto_turn))
+        except Exception as e:
+            memory.update_errors += 1
+            log.warning("Failed to update summary", game_id=game_id, error=str(e))
+
+    async def _require_session(self, game_id: str) -> GameSession:
+        """/continue, /end용 세션 조회 (없거나 만료됐으면 빈 세션으로 이어가지 않고 SessionNotFoundError)"""
+        session = await self.session_backend.get(game_id)
+        if session is None:
+            raise SessionNotFoundError(f"Session not found or expired for game_id: {game_id}")
+        return session
+
+    async def _save_stage(self, stage: GameSession, base_turn: int) -> GameSession:
+        """생성된 스테이지 필드만 최신 세션에 반영 (생성 중 쌓인 NPC 대화, 요약 갱신은 유지)"""
+        def mutate(latest: GameSession) -> None:
+            if latest.turn_count != base_turn:
+                raise SessionConflictError(f"Stage already advanced for game_id: {stage.game_id}")
+            latest.apply_stage(stage)
+
+        latest = await self.session_backend.update(stage.game_id, mutate)
+        if latest is None:
+            raise SessionNotFoundError(f"Session not found or expired for game_id: {stage.game_id}")
+        self._after_stage(latest)
+        return latest
+
+    async def _wait_for_summary(self, game_id: str, timeout: float) -> None:
+        """진행 중인 요약 갱신이 있으면 최대 timeout초 대기 (보통 이미 끝나 있음)"""
+        task = self._summary_tasks.get(game_id)
+        if task is not None:
+            await asyncio.wait([task], timeout=timeout)
+
+    @traced("story_service.initial")
+    async def generate_initial_story(self, genre: str, game_id: Optional[str] = None) -> dict:
+        try:
+            # game_id가 없으면 새로 발급하여 응답으로 돌려줌
+            session = GameSession(game_id=game_id or uuid.uuid4().hex, genre=genre)
+            result = await self.story_generator.generate_initial_story(genre, session)
+            await self.session_backend.put(session)
+            self._after_stage(session)
             return {
                 "story": result["story"],
                 "choices": result["choices"],
-                "file_name": result["file_name"]
+                "file_name": result["file_name"],
+                "game_id": session.game_id
             }
         except Exception as e:
-            print(f"[Story Service] Error in generate_initial_story: {str(e)}")
+            log.error("Failed to generate initial story", genre=genre, error=str(e))
             raise Exception(f"Error generating initial story: {str(e)}")
 
+    async def stream_initial_story(self, genre: str, game_id: Optional[str] = None) -> AsyncIterator[Tuple[str, dict]]:
+        """첫 스토리 스트리밍 (done 이벤트 시점에 세션 저장)"""
+        session = GameSession(game_id=game_id or uuid.uuid4().hex, genre=genre)
+        async for event, data in self.story_generator.stream_initial_story(genre, session):
+            if event == "done":
+                await self.session_backend.put(session)
+                self._after_stage(session)
+                data = {**data, "game_id": session.game_id}
+            yield event, data
+
+    @traced("story_service.continue")
     async def continue_story(self, request: StoryGenerationChatRequest) -> dict:
         try:
             request_dict = {
@@ -36,9 +130,12 @@ class StoryService:
                 "game_id": request.game_id,
                 "stage": request.stage
             }
-            print(f"[Story Service] Received continue story request: {request_dict}")
+            log.info("Continue story", game_id=request.game_id, stage=request.stage, genre=request.genre)
 
-            result = await self.story_generator.continue_story(request_dict)
+            session = (await self._require_session(request.game_id)).copy()
+            base_turn = session.turn_count
+            result = await self.story_generator.continue_story(request_dict, session)
+            await self._save_stage(session, base_turn)
 
             response = {
                 "story": result.get("story", ""),
@@ -46,35 +143,78 @@ class StoryService:
                 "game_id": result.get("game_id", request.game_id),
                 "stage": result.get("stage", request.stage)
             }
-            print(f"[Story Service] Generated story continuation: {response}")
+            log.info(
+                "Generated story continuation",
+                game_id=response["game_id"], stage=response["stage"],
+                story_chars=len(response["story"]), choices=len(response["choices"])
+            )
             return response
 
+        except (SessionNotFoundError, SessionConflictError) as e:
+            log.warning("Continue rejected", game_id=request.game_id, error=str(e))
+            raise
         except KeyError as e:
-            print(f"[Story Service] Missing key in response: {str(e)}")
+            log.error("Missing key in continue story response", game_id=request.game_id, error=str(e))
             raise Exception(f"Missing key in story continuation response: {str(e)}")
         except Exception as e:
-            print(f"[Story Service] Error in continue_story: {str(e)}")
+            log.error("Failed to continue story", game_id=request.game_id, error=str(e))
             raise Exception(f"Error continuing story: {str(e)}")
 
+    async def stream_continue_story(self, request: StoryGenerationChatRequest) -> AsyncIterator[Tuple[str, dict]]:
+        """스토리 이어가기 스트림 준비 (세션이 없으면 스트림을 열기 전에 SessionNotFoundError)"""
+        session = (await self._require_session(request.game_id)).copy()
+        return self._stream_continue_story(request, session)
+
+    async def _stream_continue_story(
+        self, request: StoryGenerationChatRequest, session: GameSession
+    ) -> AsyncIterator[Tuple[str, dict]]:
+        """스토리 이어가기 스트리밍 (done 이벤트 시점에 세션 저장)"""
+        request_dict = {
+            "genre": request.genre,
+            "user_choice": request.user_choice,
+            "game_id": request.game_id,
+            "stage": request.stage
+        }
+        base_turn = session.turn_count
+        async for event, data in self.story_generator.stream_continue_story(request_dict, session):
+            if event == "done":
+                await self._save_stage(session, base_turn)
+                data = {**data, "game_id": request.game_id}
+            yield event, data
+
     async def chat_with_npc(self, game_id: str) -> NPCResponse:
         """NPC 서비스를 통한 NPC 응답 얻기"""
         return await self.npc_service.chat_with_npc(game_id)
 
+    @traced("story_service.ending")
     async def generate_ending_story(self, game_id: str, user_choice: str) -> dict:
         """엔딩 스토리 생성"""
         try:
-            story_history = self.story_generator.story_memory.load_memory_variables({}).get("history", [])
-            if not story_history:
+            # 진행 중인 요약 갱신은 잠시만 기다림 (늦으면 기존 요약 + 대화 원문으로 진행)
+            await self._wait_for_summary(game_id, config.SUMMARY_END_WAIT_SECONDS)
+            session = await self._require_session(game_id)
+            if not session.turns:
                 raise ValueError(f"No story history found for game_id: {game_id}")
+            story_history = session.history_messages()
 
-            print(f"[Story Service] Generating ending for game_id: {game_id} with user_choice: {user_choice}")
+            # 누적 요약이 있으면 재사용 (엔딩에서 전체 재요약 생략, 미반영 턴은 대화 원문에 포함)
+            memory = self.story_generator.summary_memory
+            summary = session.summary or None
 
-            self.story_generator.story_memory.save_context(
-                {"input": user_choice},
-                {"output": f"User's final choice was: {user_choice}"}
+            log.info(
+                "Generating ending", game_id=game_id, turns=len(session.turns),
+                summary_reused=summary is not None, summary_current=memory.is_current(session)
             )
 
-            result = await self.story_generator.generate_ending_story(story_history)
+            self.story_generator.speculator.discard(game_id)
+            self.npc_service.discard(game_id)
+            await self.session_backend.update(
+                game_id, lambda latest: latest.add_turn(user_choice, f"User's final choice was: {user_choice}")
+            )
+
+            result = await self.story_generator.generate_ending_story(
+                story_history, genre=session.genre, summary=summary
+            )
 
             response = {
                 "story": result.get("ending_story", "No ending story generated."),
@@ -85,9 +225,12 @@ class StoryService:
 
             return response
 
+        except SessionNotFoundError:
+            log.warning("Ending requested for unknown session", game_id=game_id)
+            raise
         except ValueError as e:
-            print(f"[Story Service] Validation error: {str(e)}")
+            log.warning("Invalid ending request", game_id=game_id, error=str(e))
             raise Exception(f"Validation error in generate_ending_story: {str(e)}")
         except Exception as e:
-            print(f"[Story Service] Error in generate_ending_story: {str(e)}")
-            raise Exception(f"Error generating ending story: {str(e)}")
\ No newline at end of file
+            log.error("Failed to generate ending", game_id=game_id, error=str(e))
+            raise Exception(f"Error generating ending story: {str(e)}")
@@ -0,0 +1,145 @@
+# service/warmup.py
+
+import asyncio
+import importlib
+import time
+from functools import lru_cache
+from typing import Awaitable, Callable, Dict, List, Tuple
+
+from core.config import config
+from core.log import get_logger
+from core.metrics import STARTUP_SECONDS, observe_llm
+from core.outbound import OPENAI, Priority, get_outbound_scheduler
+from models.image_generator import get_http_session
+from models.token_budget import get_token_budget, preload_encoding
+from templates.story_templates import warm_templates
+
+log = get_logger("warmup")
+
+
+class WarmUp:
+    """배포 직후 첫 요청이 치르던 비용을 lifespan 백그라운드에서 미리 처리
+
+    단계는 순서대로 실행합니다. 선택 단계(tokenizer, connections, llm_ping)는 실패하거나 시간 안에 끝나지 않으면
+    기록만 하고 넘어가지만(해당 비용은 첫 요청이 그대로 부담), 필수 단계(story_pipeline, templates)가
+    실패하면 /ready는 503을 유지하고 성공할 때까지 백오프하며 다시 시도합니다.
+    필수 단계가 모두 성공하면 /ready가 200을 반환합니다.
+    """
+
+    REQUIRED_STEPS = ("story_pipeline", "templates")
+
+    def __init__(
+        self,
+        timeout: float = config.WARMUP_TIMEOUT_SECONDS,
+        llm_ping: bool = config.WARMUP_LLM_PING,
+        retry_backoff: float = config.WARMUP_RETRY_BACKOFF_SECONDS,
+        retry_backoff_max: float = config.WARMUP_RETRY_BACKOFF_MAX_SECONDS,
+    ):
+        self.timeout = timeout
+        self.llm_ping = llm_ping
+        self.retry_backoff = retry_backoff
+        self.retry_backoff_max = retry_backoff_max
+        self.ready = asyncio.Event()
+        self.started_at = None
+        self.elapsed = 0.0
+        self.retries = 0
+        self.durations: Dict[str, float] = {}
+        self.errors: Dict[str, str] = {}
+
+    def _steps(self, container) -> List[Tuple[str, Callable[[], Awaitable[None]]]]:
+        steps = [
+            ("story_pipeline", lambda: self._load_story_pipeline(container)),
+            ("templates", warm_templates),
+            ("tokenizer", lambda: preload_encoding(get_token_budget().model)),
+            ("connections", self._open_connections),
+        ]
+        if self.llm_ping:
+            steps.append(("llm_ping", lambda: self._ping_llm(container)))
+        return steps
+
+    async def _load_story_pipeline(self, container) -> None:
+        # langchain 모듈 import는 스레드에서 (그동안에도 /health 응답), 객체 생성은 이벤트 루프에서
+        await asyncio.to_thread(importlib.import_module, "service.story_service")
+        _ = container.story_service  # StoryGenerator, NPCHandler까지 생성
+
+    async def _open_connections(self) -> None:
+        # 백엔드 커넥션은 템플릿 병렬 요청으로 keep-alive 풀에 남아 있음
+        # 이미지 다운로드 세션을 만들고 OpenAI/Replicate 클라이언트 패키지를 미리 import
+        await get_http_session()
+        for module in ("openai", "replicate"):
+            await asyncio.to_thread(importlib.import_module, module)
+
+    async def _ping_llm(self, container) -> None:
+        """1토큰 호출로 OpenAI 커넥션(TLS)을 미리 맺음"""
+        model = container.story_generator.model.bind(max_tokens=1)
+
+        async def call():
+            async with observe_llm("warmup"):
+                return await model.ainvoke("ping")
+
+        await get_outbound_scheduler().run(OPENAI, Priority.STORY, call)
+
+    async def _run_step(self, name: str, step: Callable[[], Awaitable[None]], timeout: float) -> bool:
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(step(), timeout=max(timeout, 0.001))
+        except asyncio.TimeoutError:
+            self.errors[name] = "timeout"
+            log.warning("Warm-up step timed out", step=name, timeout=timeout)
+            succeeded = False
+        except Exception as e:
+            self.errors[name] = str(e)
+            log.warning("Warm-up step failed", step=name, error=str(e))
+            succeeded = False
+        else:
+            self.errors.pop(name, None)
+            succeeded = True
+        self.durations[name] = time.perf_counter() - started
+        STARTUP_SECONDS.set(self.durations[name], phase=name)
+        return succeeded
+
+    async def run(self, container) -> None:
+        """필수 단계가 모두 성공하면 반환 (그 전에는 재시도하며 대기, 종료 시 취소)"""
+        self.started_at = time.perf_counter()
+        deadline = self.started_at + self.timeout
+        failed = []
+        for name, step in self._steps(container):
+            if not await self._run_step(name, step, deadline - time.perf_counter()) and name in self.REQUIRED_STEPS:
+                failed.append((name, step))
+
+        delay = self.retry_backoff
+        while failed:
+            log.warning("Required warm-up steps failed, retrying", steps=[name for name, _ in failed], retry_in=delay)
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.retry_backoff_max)
+            self.retries += 1
+            failed = [(name, step) for name, step in failed if not await self._run_step(name, step, self.timeout)]
+
+        self.elapsed = time.perf_counter() - self.started_at
+        STARTUP_SECONDS.set(self.elapsed, phase="warmup")
+        self.ready.set()
+        log.info("Warm-up finished", seconds=round(self.elapsed, 3), retries=self.retries, failed=sorted(self.errors))
+
+    def status(self) -> Dict:
+        """/ready 응답 본문"""
+        return {
+            "ready": self.ready.is_set(),
+            "elapsed_ms": round(self.elapsed * 1000, 1),
+            "retries": self.retries,
+            "steps": {name: round(seconds * 1000, 1) for name, seconds in self.durations.items()},
+            "errors": self.errors,
+        }
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "ready": self.ready.is_set(),
+            "elapsed_seconds": self.elapsed,
+            "failed_steps": len(self.errors),
+            "retries": self.retries,
+        }
+
+
+@lru_cache()
+def get_warmup() -> WarmUp:
+    """프로세스 공용 WarmUp"""
+    return WarmUp()
@@ -1,33 +1,252 @@
-from typing import Dict, Optional
-from models.s3_manager import S3Manager
+import asyncio
+import hashlib
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Dict, Optional, Set, Tuple
+from core.config import config
+from core.log import get_logger
+from core.tracing import span
+from core.singleflight import SingleFlight
+from models.s3_manager import get_s3_manager
+
+if TYPE_CHECKING:
+    from langchain.prompts import ChatPromptTemplate
+
+log = get_logger("templates")
+
+
+@dataclass
+class CachedTemplate:
+    content: str
+    version: str
+    etag: Optional[str]
+    fetched_at: float
+
 
 class StoryTemplates:
+    """백엔드 템플릿 캐시
+
+    - TTL 안: 캐시에서 바로 반환
+    - TTL 경과 후 stale 구간: 기존 값을 반환하고 백그라운드에서 갱신 (stale-while-revalidate)
+    - stale 구간도 지나면 요청 경로에서 다시 가져옴 (실패 시 기존 값 사용)
+    컴파일된 ChatPromptTemplate은 (genre, type, version) 단위로 캐시합니다.
+    """
     _instance = None
-    
+
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super().__new__(cls)
-            cls._instance.s3_manager = S3Manager()
+            cls._instance.s3_manager = get_s3_manager()
+            cls._instance.ttl = config.TEMPLATE_CACHE_TTL_SECONDS
+            cls._instance.stale_ttl = config.TEMPLATE_CACHE_STALE_SECONDS
+            cls._instance._cache: Dict[Tuple[str, str], CachedTemplate] = {}
+            cls._instance._prompts: Dict[Tuple[str, str, str, bool], "ChatPromptTemplate"] = {}
+            cls._instance._flight = SingleFlight("template_refresh")
+            cls._instance._background: Set[asyncio.Task] = set()
+            cls._instance.hits = 0
+            cls._instance.stale_hits = 0
+            cls._instance.misses = 0
+            cls._instance.refreshes = 0
+            cls._instance.not_modified = 0
+            cls._instance.refresh_errors = 0
         return cls._instance
 
+    async def _fetch(self, key: Tuple[str, str]) -> CachedTemplate:
+        """백엔드에서 템플릿을 가져와 캐시 갱신 (ETag 조건부 요청)"""
+        genre, type_ = key
+        current = self._cache.get(key)
+        try:
+            with span("templates.fetch", genre=genre, type=type_, conditional=current is not None):
+                data = await self.s3_manager.get_genre_type_template(
+                    genre, type_, etag=current.etag if current else None
+                )
+        except Exception as e:
+            self.refresh_errors += 1
+            log.warning("Failed to refresh template", genre=genre, type=type_, error=str(e))
+            raise
+        self.refreshes += 1
+
+        if data is None and current is not None:
+            # 304 Not Modified - 내용은 그대로, 유효 시간만 연장
+            self.not_modified += 1
+            current.fetched_at = time.monotonic()
+            return current
+
+        data = data or {}
+        content = data.get("content", "")
+        version = str(
+            data.get("version")
+            or data.get("updatedAt")
+            or data.get("etag")
+            or hashlib.sha1(content.encode("utf-8")).hexdigest()
+        )
+        entry = CachedTemplate(
+            content=content,
+            version=version,
+            etag=data.get("etag"),
+            fetched_at=time.monotonic()
+        )
+
+        if current is not None and current.version != version:
+            self._drop_prompts(key)
+        self._cache[key] = entry
+        return entry
+
+    async def _refresh(self, key: Tuple[str, str]) -> CachedTemplate:
+        """키당 하나의 갱신만 실행 (동시에 들어온 요청은 결과를 공유)"""
+        return await self._flight.do(key, lambda: self._fetch(key))
+
+    def _refresh_in_background(self, key: Tuple[str, str]) -> None:
+        """stale 응답 후 백그라운드 갱신 (이미 진행 중이면 생략)"""
+        if self._flight.in_flight(key):
+            return
+        task = asyncio.create_task(self._refresh(key))
+        self._background.add(task)
+        task.add_done_callback(self._on_background_done)
+
+    def _on_background_done(self, task: asyncio.Task) -> None:
+        self._background.discard(task)
+        if not task.cancelled():
+            task.exception()  # 오류는 _fetch에서 기록됨
+
+    async def _get_entry(self, genre: str, type_: str) -> CachedTemplate:
+        key = (genre, type_)
+        entry = self._cache.get(key)
+        if entry is not None:
+            age = time.monotonic() - entry.fetched_at
+            if age < self.ttl:
+                self.hits += 1
+                return entry
+            if age < self.ttl + self.stale_ttl:
+                self.stale_hits += 1
+                self._refresh_in_background(key)
+                return entry
+
+        self.misses += 1
+        try:
+            return await self._refresh(key)
+        except Exception:
+            if entry is not None:
+                return entry
+            raise
+
+    def _drop_prompts(self, key: Tuple[str, str]) -> None:
+        for prompt_key in [k for k in self._prompts if k[:2] == key]:
+            del self._prompts[prompt_key]
+
+    def invalidate(self, genre: Optional[str] = None, type_: Optional[str] = None) -> None:
+        """캐시 무효화 (인자를 생략하면 해당 범위 전체)"""
+        for key in list(self._cache):
+            if (genre is None or key[0] == genre) and (type_ is None or key[1] == type_):
+                del self._cache[key]
+                self._drop_prompts(key)
+
+    async def prefetch(self, keys) -> None:
+        """(genre, type) 목록을 미리 캐시에 적재"""
+        await asyncio.gather(*(self._refresh(tuple(key)) for key in keys))
+
     async def get_template(self, genre: str, type_: str, base_prompt: str = None) -> str:
         """통합된 템플릿 가져오기 메서드"""
-        template = await self.s3_manager.get_genre_type_template(genre, type_)
-        content = template.get("content", "")
-        
+        content = (await self._get_entry(genre, type_)).content
+
         if base_prompt and type_ in ["initial", "continue"]:
             return f"{content}\n{base_prompt}"
         return content
 
-# 싱글톤 인스턴스 생성
-_templates = StoryTemplates()
+    async def get_prompt(self, genre: str, type_: str, with_base_prompt: bool = False) -> "ChatPromptTemplate":
+        """컴파일된 프롬프트 반환 (with_base_prompt면 끝에 {base_prompt} 변수를 붙임)"""
+        entry = await self._get_entry(genre, type_)
+        prompt_key = (genre, type_, entry.version, with_base_prompt)
+        prompt = self._prompts.get(prompt_key)
+        if prompt is None:
+            from langchain.prompts import ChatPromptTemplate
+
+            content = f"{entry.content}\n{{base_prompt}}" if with_base_prompt else entry.content
+            prompt = ChatPromptTemplate.from_template(content)
+            self._prompts[prompt_key] = prompt
+        return prompt
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "templates": len(self._cache),
+            "prompts": len(self._prompts),
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "refreshes": self.refreshes,
+            "not_modified": self.not_modified,
+            "refresh_errors": self.refresh_errors,
+            "collapsed": self._flight.collapsed,
+        }
+
+
+def get_story_templates() -> StoryTemplates:
+    """싱글톤 인스턴스 (S3Manager 생성을 import 시점이 아니라 첫 사용 시점으로 미룸)"""
+    return StoryTemplates()
+
+
+# 아래 함수들이 사용하는 (genre, type) 전체 (기동 워밍업에서 미리 적재)
+TEMPLATE_KEYS = [
+    (genre, type_)
+    for genre in ("survival", "romance")
+    for type_ in ("initial", "continue", "ending", "rate")
+] + [("default", "npc"), ("default", "advice")]
+
+
+def _genre_key(genre: str) -> str:
+    return "romance" if genre == "Romance" else "survival"
+
+
+def template_stats() -> Dict[str, int]:
+    """템플릿 캐시 적중/갱신 현황"""
+    return get_story_templates().stats()
+
+
+def invalidate_templates(genre: Optional[str] = None, type_: Optional[str] = None) -> None:
+    """템플릿/프롬프트 캐시 무효화 훅"""
+    get_story_templates().invalidate(genre, type_)
+
+
+async def warm_templates() -> None:
+    """TEMPLATE_KEYS 전체를 한 번에 가져오고 프롬프트까지 컴파일해 둠"""
+    templates = get_story_templates()
+    await templates.prefetch(TEMPLATE_KEYS)
+    for genre, type_ in TEMPLATE_KEYS:
+        await templates.get_prompt(genre, type_, with_base_prompt=type_ == "initial")
+
+
+# 컴파일된 프롬프트 (변수는 chain.ainvoke에서 채움)
+async def get_npc_prompt() -> "ChatPromptTemplate":
+    """변수: story_context"""
+    return await get_story_templates().get_prompt("default", "npc")
+
+async def get_advice_prompt() -> "ChatPromptTemplate":
+    """변수: story_context, conversation_history, choices"""
+    return await get_story_templates().get_prompt("default", "advice")
+
+async def get_initial_prompt(genre: str) -> "ChatPromptTemplate":
+    """변수: base_prompt"""
+    return await get_story_templates().get_prompt(_genre_key(genre), "initial", with_base_prompt=True)
+
+async def get_continue_prompt(genre: str) -> "ChatPromptTemplate":
+    """변수: stage_template, previous_story, user_choice"""
+    return await get_story_templates().get_prompt(_genre_key(genre), "continue")
+
+async def get_ending_prompt(genre: str) -> "ChatPromptTemplate":
+    """변수: conversation_text, summary"""
+    return await get_story_templates().get_prompt(_genre_key(genre), "ending")
+
+async def get_rate_prompt(genre: str) -> "ChatPromptTemplate":
+    """변수: summary"""
+    return await get_story_templates().get_prompt(_genre_key(genre), "rate")
+
 
 # 외부에서 사용할 비동기 함수들
 async def get_default_npc_template(story_context: str) -> str:
     """
     기본 NPC 템플릿을 story_context로 포맷하여 반환
     """
-    template = await _templates.get_template("default", "npc")
+    template = await get_story_templates().get_template("default", "npc")
     return template.format(story_context=story_context)
 
 
@@ -35,7 +254,7 @@ async def get_default_advice_template(story_context: str, conversation_history:
     """
     기본 Advice 템플릿을 story_context, conversation_history, choices로 포맷하여 반환
     """
-    template = await _templates.get_template("default", "advice")
+    template = await get_story_templates().get_template("default", "advice")
     return template.format(
         story_context=story_context,
         conversation_history=conversation_history,
@@ -43,13 +262,13 @@ async def get_default_advice_template(story_context: str, conversation_history:
     )
 
 async def get_romance_initial_template(base_prompt: str) -> str:
-    return await _templates.get_template("romance", "initial", base_prompt)
+    return await get_story_templates().get_template("romance", "initial", base_prompt)
 
 async def get_survival_initial_template(base_prompt: str) -> str:
-    return await _templates.get_template("survival", "initial", base_prompt)
+    return await get_story_templates().get_template("survival", "initial", base_prompt)
 
 async def get_romance_continue_template(stage_template: str, previous_story: str, user_choice: str) -> str:
-    template = await _templates.get_template("romance", "continue")
+    template = await get_story_templates().get_template("romance", "continue")
     return template.format(
         stage_template=stage_template,
         previous_story=previous_story,
@@ -57,7 +276,7 @@ async def get_romance_continue_template(stage_template: str, previous_story: str
     )
 
 async def get_survival_continue_template(stage_template: str, previous_story: str, user_choice: str) -> str:
-    template = await _templates.get_template("survival", "continue")
+    template = await get_story_templates().get_template("survival", "continue")
     return template.format(
         stage_template=stage_template,
         previous_story=previous_story,
@@ -66,14 +285,14 @@ async def get_survival_continue_template(stage_template: str, previous_story: st
 
 # 엔딩 템플릿 수정
 async def get_romance_ending_template(conversation_text: str, summary: str) -> str:
-    template = await _templates.get_template("romance", "ending")
+    template = await get_story_templates().get_template("romance", "ending")
     return template.format(
         conversation_text=conversation_text,
         summary=summary
     )
 
 async def get_survival_ending_template(conversation_text: str, summary: str) -> str:
-    template = await _templates.get_template("survival", "ending")
+    template = await get_story_templates().get_template("survival", "ending")
     return template.format(
         conversation_text=conversation_text,
         summary=summary
@@ -81,9 +300,9 @@ async def get_survival_ending_template(conversation_text: str, summary: str) ->
 
 # 생존율 템플릿 수정
 async def get_survival_rate_template(summary: str) -> str:
-    template = await _templates.get_template("survival", "rate")
+    template = await get_story_templates().get_template("survival", "rate")
     return template.format(summary=summary)
 
 async def get_romance_rate_template(summary: str) -> str:
-    template = await _templates.get_template("romance", "rate")
-    return template.format(summary=summary)
\ No newline at end of file
+    template = await get_story_templates().get_template("romance", "rate")
+    return template.format(summary=summary)